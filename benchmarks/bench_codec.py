@@ -0,0 +1,95 @@
+"""
+Compares MWSE TCP event codecs: frame size and encode/decode time per frame.
+
+    python benchmarks/bench_codec.py
+    python benchmarks/bench_codec.py --traffic session.jsonl.gz --output codec.json
+
+`--traffic` takes a session recorded with `event_bus.system.mwse_tcp.record_path`.
+Without it a synthetic session from `sample_traffic.py` is used.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "server"))
+
+from eventbus.backend.mwse_tcp_codec import AbstractEventCodec, JsonEventCodec, MsgpackEventCodec  # noqa: E402
+from eventbus.backend.mwse_tcp_recorder import MwseTcpRecorder  # noqa: E402
+from eventbus.event import Event  # noqa: E402
+from sample_traffic import sample_events  # noqa: E402
+
+
+def load_events(path: str | None, count: int) -> list[Event]:
+    if path is None:
+        return sample_events(count)
+
+    return [frame.event for frame in MwseTcpRecorder.read(path)]
+
+
+def bench_codec(codec: AbstractEventCodec, events: list[Event], rounds: int):
+    frames = [codec.encode(e) for e in events]
+
+    t0 = time.perf_counter()
+    for _ in range(0, rounds):
+        for e in events:
+            codec.encode(e)
+    encode_sec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(0, rounds):
+        for frame in frames:
+            codec.decode(frame)
+    decode_sec = time.perf_counter() - t0
+
+    # Cost of an event nobody subscribed to: only the header is decoded.
+    t0 = time.perf_counter()
+    for _ in range(0, rounds):
+        for frame in frames:
+            codec.decode_header(frame)
+    decode_header_sec = time.perf_counter() - t0
+
+    type_to_bytes: dict[str, list[int]] = {}
+    for (e, frame) in zip(events, frames):
+        type_to_bytes.setdefault(e.data.type, []).append(len(frame))
+
+    total_frames = len(events) * rounds
+    return {
+        "codec": codec.name,
+        "frames": len(frames),
+        "total_bytes": sum(map(len, frames)),
+        "avg_frame_bytes": sum(map(len, frames)) / max(1, len(frames)),
+        "encode_us_per_frame": encode_sec / max(1, total_frames) * 1e6,
+        "decode_us_per_frame": decode_sec / max(1, total_frames) * 1e6,
+        "decode_header_us_per_frame": decode_header_sec / max(1, total_frames) * 1e6,
+        "avg_frame_bytes_by_type": {t: sum(v) / len(v) for (t, v) in sorted(type_to_bytes.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--traffic', type=str, default=None, help='recorded session')
+    parser.add_argument('--count', type=int, default=2000, help='synthetic events count when no traffic given')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--encoding', type=str, default='cp1251')
+    parser.add_argument('--output', type=str, default=None, help='write JSON report to this path')
+    args = parser.parse_args()
+
+    events = load_events(args.traffic, args.count)
+    codecs: list[AbstractEventCodec] = [JsonEventCodec(args.encoding), MsgpackEventCodec()]
+    results = [bench_codec(codec, events, args.rounds) for codec in codecs]
+
+    print(f"{'codec':<10}{'frames':>8}{'avg bytes':>12}{'encode us':>12}{'decode us':>12}{'header us':>12}")
+    for r in results:
+        print(f"{r['codec']:<10}{r['frames']:>8}{r['avg_frame_bytes']:>12.1f}"
+              f"{r['encode_us_per_frame']:>12.1f}{r['decode_us_per_frame']:>12.1f}{r['decode_header_us_per_frame']:>12.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"benchmark": "codec", "results": results}, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
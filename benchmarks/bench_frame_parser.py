@@ -0,0 +1,126 @@
+"""
+Throughput of the MWSE TCP reader: the former `StreamReader.readexactly()` loop (header, then body as a fresh
+bytes object) against `MwseTcpFrameParser` (many frames per `data_received()` chunk, bodies as memoryviews).
+
+    python benchmarks/bench_frame_parser.py
+    python benchmarks/bench_frame_parser.py --frames 20000 --chunk-bytes 65536 --codec msgpack --output frames.json
+
+Reported for small (`show_tooltip_for_ref`) and large (`get_npcs_response` with 10 NPCs) events,
+framing only and framing with decoding, in frames/s and MB/s.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "server"))
+
+from eventbus.backend.mwse_tcp_codec import AbstractEventCodec, CodecName, create_event_codec  # noqa: E402
+from eventbus.backend.mwse_tcp_frame_parser import MwseTcpFrameParser  # noqa: E402
+from eventbus.data.position import Position  # noqa: E402
+from eventbus.event import Event  # noqa: E402
+from eventbus.event_data.event_data_from_game import EventDataFromGame  # noqa: E402
+from eventbus.event_data.event_data_rpc import EventDataRpc  # noqa: E402
+from sample_traffic import sample_npc_data  # noqa: E402
+
+
+def small_event() -> Event:
+    return Event(event_id=1, data=EventDataFromGame.ShowTooltipForRef(
+        type='show_tooltip_for_ref', ref_id="ref_1", object_type=1, name="Дверь", position=Position(x=1, y=2, z=3)))
+
+
+def large_event() -> Event:
+    rnd = random.Random(1)
+    return Event(event_id=1, response_to_event_id=1, data=EventDataRpc.GetNpcsResponse(
+        type='get_npcs_response', npcs_data=[sample_npc_data(i, rnd) for i in range(0, 10)]))
+
+
+def make_chunks(msg_bytes: bytes, frames: int, chunk_bytes: int) -> list[bytes]:
+    stream = (struct.pack('>I', len(msg_bytes)) + msg_bytes) * frames
+    return [stream[i:i + chunk_bytes] for i in range(0, len(stream), chunk_bytes)]
+
+
+async def read_with_stream_reader(chunks: list[bytes], frames: int, on_frame: Callable[[Any], None]):
+    reader = asyncio.StreamReader(limit=2 ** 30)
+    for chunk in chunks:
+        reader.feed_data(chunk)
+    reader.feed_eof()
+
+    for _ in range(0, frames):
+        msg_size: int = struct.unpack('>I', await reader.readexactly(4))[0]
+        on_frame(await reader.readexactly(msg_size))
+
+
+def read_with_frame_parser(chunks: list[bytes], on_frame: Callable[[Any], None]):
+    parser = MwseTcpFrameParser(on_frame, max_frame_size=2 ** 30)
+    for chunk in chunks:
+        parser.feed(chunk)
+
+
+def bench(name: str, event: Event, codec: AbstractEventCodec, args: argparse.Namespace) -> list[dict[str, Any]]:
+    msg_bytes = codec.encode(event)
+    chunks = make_chunks(msg_bytes, args.frames, args.chunk_bytes)
+    total_bytes = sum(map(len, chunks))
+
+    def skip(frame: Any):
+        pass
+
+    def decode(frame: Any):
+        codec.decode(frame)
+
+    results: list[dict[str, Any]] = []
+    for (mode, on_frame) in [('framing', skip), ('decode', decode)]:
+        for reader in ['stream_reader', 'frame_parser']:
+            best_sec = float('inf')
+            for _ in range(0, args.rounds):
+                t0 = time.perf_counter()
+                if reader == 'stream_reader':
+                    asyncio.run(read_with_stream_reader(chunks, args.frames, on_frame))
+                else:
+                    read_with_frame_parser(chunks, on_frame)
+                best_sec = min(best_sec, time.perf_counter() - t0)
+
+            results.append({
+                "event": name,
+                "frame_bytes": len(msg_bytes),
+                "mode": mode,
+                "reader": reader,
+                "frames_per_sec": args.frames / best_sec,
+                "mb_per_sec": total_bytes / best_sec / 1e6,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=20000)
+    parser.add_argument('--chunk-bytes', type=int, default=64 * 1024, help='size of each data_received() chunk')
+    parser.add_argument('--rounds', type=int, default=3, help='best of N')
+    parser.add_argument('--codec', type=str, default='json', choices=['json', 'msgpack'])
+    parser.add_argument('--encoding', type=str, default='cp1251')
+    parser.add_argument('--output', type=str, default=None, help='write JSON report to this path')
+    args = parser.parse_args()
+
+    codec_name: CodecName = args.codec
+    codec = create_event_codec(codec_name, args.encoding)
+
+    results = bench('small', small_event(), codec, args) + bench('large', large_event(), codec, args)
+
+    print(f"{'event':<8}{'bytes':>8}{'mode':>10}{'reader':>16}{'frames/s':>14}{'MB/s':>10}")
+    for r in results:
+        print(f"{r['event']:<8}{r['frame_bytes']:>8}{r['mode']:>10}{r['reader']:>16}"
+              f"{r['frames_per_sec']:>14.0f}{r['mb_per_sec']:>10.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"benchmark": "frame_parser", "params": vars(args), "results": results}, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Evaluates the local player intention classifier (`player_intention.local_classifier`) on a labeled set of utterances.
+
+    python benchmarks/bench_intent_classifier.py
+    python benchmarks/bench_intent_classifier.py --dataset my_intents.jsonl --output intents.json --verbose
+
+Each dataset line is {"text": ..., "expected": [...], "target": true, "topics": [...]} where `expected` holds lines
+in the LLM answer format ('npc_shut_up', 'trigger_dialog_topic:задания', ...), empty for no intention.
+
+Reported:
+    per intent   precision and recall of confident local answers; 'unsure' answers go to the LLM and count
+                 against recall only
+    skipped_llm  share of utterances answered locally, i.e. LLM calls saved
+    missed       utterances with an intention which were confidently classified as having none
+    latency      classify() time per utterance
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "server"))
+
+from eventbus.data.actor_ref import ActorRef  # noqa: E402
+from game.service.player_services.player_intention_classifier import PlayerIntentionClassifier  # noqa: E402
+
+_TARGET = ActorRef(ref_id='fargoth00000000', type='npc', name='Fargoth', female=False)
+
+
+def _intent_name(line: str):
+    return line.split(':')[0]
+
+
+def _percentile(sorted_samples: list[float], p: float) -> float:
+    index = min(len(sorted_samples) - 1, max(0, round(p / 100.0 * len(sorted_samples) + 0.5) - 1))
+    return sorted_samples[index]
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    with open(args.dataset, 'r', encoding='utf-8') as f:
+        samples = [json.loads(line) for line in f if len(line.strip()) > 0]
+
+    classifier = PlayerIntentionClassifier()
+
+    true_positives: dict[str, int] = {}
+    false_positives: dict[str, int] = {}
+    labeled: dict[str, int] = {}
+    decisions: dict[str, int] = {}
+    missed: list[str] = []
+    durations: list[float] = []
+
+    for sample in samples:
+        expected = set(sample['expected'])
+        topics = sample.get('topics', [])
+        target = _TARGET if sample.get('target', True) else None
+
+        t0 = time.perf_counter()
+        for _ in range(0, args.repeat):
+            result = classifier.classify(sample['text'], topics, target)
+        durations.append((time.perf_counter() - t0) / args.repeat)
+
+        decisions[result.decision] = decisions.get(result.decision, 0) + 1
+        predicted = set(filter(lambda l: l != 'none', result.lines))
+
+        for line in expected:
+            labeled[_intent_name(line)] = labeled.get(_intent_name(line), 0) + 1
+        for line in predicted:
+            name = _intent_name(line)
+            if line in expected:
+                true_positives[name] = true_positives.get(name, 0) + 1
+            else:
+                false_positives[name] = false_positives.get(name, 0) + 1
+
+        if result.decision == 'none' and len(expected) > 0:
+            missed.append(sample['text'])
+
+        if args.verbose and (predicted != expected and result.decision != 'unsure'):
+            print(f"{result.decision:<7} {sorted(predicted)} expected {sorted(expected)}: {sample['text']}")
+
+    intents: dict[str, dict[str, float]] = {}
+    for name in sorted(set(labeled) | set(false_positives)):
+        tp = true_positives.get(name, 0)
+        fp = false_positives.get(name, 0)
+        intents[name] = {
+            "labeled": labeled.get(name, 0),
+            "precision": tp / (tp + fp) if tp + fp > 0 else 1.0,
+            "recall": tp / labeled[name] if labeled.get(name, 0) > 0 else 1.0,
+        }
+
+    durations.sort()
+    return {
+        "benchmark": "intent_classifier",
+        "params": {"dataset": args.dataset, "samples": len(samples)},
+        "decisions": decisions,
+        "skipped_llm": (len(samples) - decisions.get('unsure', 0)) / len(samples),
+        "missed": missed,
+        "intents": intents,
+        "latency": {
+            "p50_us": _percentile(durations, 50) * 1e6,
+            "p99_us": _percentile(durations, 99) * 1e6,
+            "max_us": durations[-1] * 1e6,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dataset', type=str, default=str(Path(__file__).resolve().parent / "player_intents.jsonl"))
+    parser.add_argument('--repeat', type=int, default=100, help='classify each utterance this many times for timing')
+    parser.add_argument('--verbose', action='store_true', help='print wrong confident answers')
+    parser.add_argument('--output', type=str, default=None, help='write JSON report to this path')
+    args = parser.parse_args()
+
+    result = run(args)
+
+    print(f"{'intent':<32}{'labeled':>8}{'precision':>11}{'recall':>8}")
+    for (name, s) in result["intents"].items():
+        print(f"{name:<32}{s['labeled']:>8}{s['precision']:>11.2f}{s['recall']:>8.2f}")
+    print(f"decisions: {result['decisions']}, LLM calls skipped: {result['skipped_llm'] * 100:.0f}%")
+    print(f"missed intentions: {len(result['missed'])}")
+    latency = result["latency"]
+    print(f"latency: p50 {latency['p50_us']:.1f} us, p99 {latency['p99_us']:.1f} us")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
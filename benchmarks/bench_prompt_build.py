@@ -0,0 +1,146 @@
+"""
+Measures `NpcLlmSystemInstructionsBuilder.build()` over a conversation in groups of NPCs, with and without
+the section cache (`npc_system_instructions.section_cache_size`).
+
+    python benchmarks/bench_prompt_build.py
+    python benchmarks/bench_prompt_build.py --npcs 1 5 15 --turns 500 --output prompt_build.json
+
+Each turn the next NPC of the group speaks to the others: the game time goes on, the story grows and
+every `--move-every` turns one NPC steps aside, which changes how far it is from the others and the player.
+
+Reported per group size (hearing NPCs) and cache size:
+    build us     mean, p50 and p95 time of build()
+    hit rate     share of memoized sections taken from the cache
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "server"))
+
+from eventbus.data.actor_ref import ActorRef  # noqa: E402
+from game.data.npc import Npc  # noqa: E402
+from game.data.npc_behavior import NpcBehavior  # noqa: E402
+from game.data.npc_personality import NpcPersonality  # noqa: E402
+from game.data.story import Story  # noqa: E402
+from game.i18n.i18n import I18n  # noqa: E402
+from game.service.npc_services.npc_llm_system_instructions_builder import NpcLlmSystemInstructionsBuilder  # noqa: E402
+from llm.message import LlmMessage  # noqa: E402
+from sample_traffic import sample_env_data, sample_npc_data, sample_player_data  # noqa: E402
+from tts.voice import Voice  # noqa: E402
+
+_BACKGROUND = ("Родился в Сейда Нин в семье рыбака и с детства помогал отцу. "
+               "Недолюбливает имперцев, но ценит порядок, который они принесли. ") * 4
+
+_LINES = ["Привет, чужеземец. Что привело тебя в наши края?", "Говорят, в Балморе опять неспокойно.",
+          "Не доверяй тем, кто торгует у причала.", "[кивает] Пожалуй, ты прав."]
+
+
+def sample_npc(index: int, rnd: random.Random) -> Npc:
+    npc_data = sample_npc_data(index, rnd)
+    return Npc(
+        actor_ref=ActorRef(ref_id=npc_data.ref_id, type='npc', name=npc_data.name, female=npc_data.female),
+        npc_data=npc_data,
+        personality=NpcPersonality(
+            background=_BACKGROUND,
+            voice=Voice(female=npc_data.female, accent='none', elevenlabs=Voice.Elevenlabs())
+        ),
+        personal_story=Story(),
+        behavior=NpcBehavior(last_processed_story_item_id=None, relation_to_other_npc={})
+    )
+
+
+def bench_build(hearing_npcs: int, section_cache_size: int, turns: int, warmup: int, move_every: int, seed: int):
+    rnd = random.Random(seed)
+    env = SimpleNamespace(env=sample_env_data(rnd))
+    builder = NpcLlmSystemInstructionsBuilder(
+        NpcLlmSystemInstructionsBuilder.Config(section_cache_size=section_cache_size),
+        SimpleNamespace(local_player=SimpleNamespace(player_data=sample_player_data(rnd))),  # type: ignore
+        env,  # type: ignore
+        SimpleNamespace(dropped_items=[]),  # type: ignore
+        SimpleNamespace(get_cell_name=lambda name: name),  # type: ignore
+        I18n(),
+        SimpleNamespace(pois=[])  # type: ignore
+    )
+
+    # NPCs of one scene stand within a few meters from each other.
+    group = [sample_npc(i, rnd) for i in range(0, hearing_npcs + 1)]
+    for npc in group:
+        npc.npc_data.position = group[0].npc_data.position.model_copy(
+            update={'x': group[0].npc_data.position.x + rnd.uniform(-300, 300)})
+        npc.npc_data.player_distance = rnd.uniform(64, 600)
+
+    messages: list[LlmMessage] = []
+    timings: list[float] = []
+    hits_before = 0
+    misses_before = 0
+    for turn in range(0, warmup + turns):
+        if turn == warmup:
+            stats = builder.get_stats()
+            (hits_before, misses_before) = (stats.section_hits, stats.section_misses)
+
+        env.env = env.env.model_copy(update={'current_hour': (env.env.current_hour + 1 / 60) % 24})
+        messages = (messages + [LlmMessage(role='user', text=f"{group[turn % len(group)].npc_data.name}: {_LINES[turn % len(_LINES)]}")])[-20:]
+        if move_every > 0 and turn % move_every == 0:
+            moving = rnd.choice(group)
+            moving.npc_data.position = moving.npc_data.position.model_copy(
+                update={'y': moving.npc_data.position.y + rnd.uniform(-200, 200)})
+            moving.npc_data.player_distance = rnd.uniform(64, 600)
+
+        npc = group[turn % len(group)]
+        other_npcs = [other for other in group if other is not npc]
+
+        t0 = time.perf_counter()
+        builder.build(npc, other_npcs, messages)
+        if turn >= warmup:
+            timings.append(time.perf_counter() - t0)
+
+    stats = builder.get_stats()
+    hits = stats.section_hits - hits_before
+    misses = stats.section_misses - misses_before
+    timings.sort()
+    return {
+        "hearing_npcs": hearing_npcs,
+        "section_cache_size": section_cache_size,
+        "builds": len(timings),
+        "mean_us": sum(timings) / len(timings) * 1e6,
+        "p50_us": timings[len(timings) // 2] * 1e6,
+        "p95_us": timings[int(len(timings) * 0.95)] * 1e6,
+        "section_hit_rate": hits / max(1, hits + misses),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--npcs', type=int, nargs='+', default=[1, 5, 15], help='hearing NPCs besides the speaker')
+    parser.add_argument('--turns', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--move-every', type=int, default=3, help='turns between NPC moves, 0 for a still scene')
+    parser.add_argument('--section-cache-size', type=int, default=NpcLlmSystemInstructionsBuilder.Config().section_cache_size)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', type=str, default=None, help='write JSON report to this path')
+    args = parser.parse_args()
+
+    results = [
+        bench_build(hearing_npcs, section_cache_size, args.turns, args.warmup, args.move_every, args.seed)
+        for hearing_npcs in args.npcs
+        for section_cache_size in [0, args.section_cache_size]
+    ]
+
+    print(f"{'npcs':>6}{'cache':>8}{'mean us':>10}{'p50 us':>10}{'p95 us':>10}{'hit rate':>10}")
+    for r in results:
+        print(f"{r['hearing_npcs']:>6}{r['section_cache_size']:>8}{r['mean_us']:>10.1f}{r['p50_us']:>10.1f}"
+              f"{r['p95_us']:>10.1f}{r['section_hit_rate']:>10.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"benchmark": "prompt_build", "params": vars(args), "results": results}, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
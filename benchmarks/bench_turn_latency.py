@@ -0,0 +1,386 @@
+"""
+End-to-end latency of a conversation turn: the server runs in-process with dummy LLM, STT and TTS backends,
+`fake_mwse_client.py` plays the game, and the player says N lines to NPCs via `dialog_text_submit`,
+or with `--input voice` through the speech-to-text events (`stt_recognition_update`, then `stt_recognition_complete`).
+
+    python benchmarks/bench_turn_latency.py
+    python benchmarks/bench_turn_latency.py --input voice
+    python benchmarks/bench_turn_latency.py --input voice --llm-latency-ms 800 --speculative-stt
+    python benchmarks/bench_turn_latency.py --llm-latency-ms 800 --parallel-intention
+    python benchmarks/bench_turn_latency.py --npc-lines 3 --llm-latency-ms 800 --tts-latency-ms 300 --pipeline
+    python benchmarks/bench_turn_latency.py --npc-sentences 3 --llm-latency-ms 1500 --tts-latency-ms 300 --stream
+    python benchmarks/bench_turn_latency.py --turns 50 --npcs 10 --story-items 50 \\
+        --llm-latency-ms 800 --tts-latency-ms 300 --rpc-latency-ms 5 --output turn_latency.json
+
+Reported stages (p50/p95/p99, ms):
+    player_intention          PlayerIntentionAnalyzer.analyze_player_intention
+    pick_actor_wait           from the player's line until the story loop starts picking an actor
+    decide_who_should_act     NpcBehaviorService.decide_who_should_act
+    decide_how_npc_should_act NpcBehaviorService.decide_how_npc_should_act
+    npc_intention             NpcIntentionAnalyzer.process_story_item_data
+    tts                       TtsSystem.convert
+    npc_say_mp3               from the end of TTS until the game receives npc_say_mp3
+    speech_end_to_npc_start   from the end of the player's line until the game receives npc_say_mp3,
+                              i.e. the time to first audio of the turn
+    npc_first_audio           from the start of decide_how_npc_should_act until the game receives the first
+                              npc_say_mp3 of the line (ahead of time with --pipeline)
+    npc_gap                   with --npc-lines > 1, from the scene unlock near the end of an NPC line
+                              until the game receives the next NPC line
+
+With --stream a line is said in parts, one npc_say_mp3 per sentence; a line starts with the first part.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "server"))
+
+# Keyboard hooks of the game master need a display otherwise.
+os.environ.setdefault('PYNPUT_BACKEND', 'dummy')
+
+from app.app_config import AppConfig  # noqa: E402
+from eventbus.bus import EventBus  # noqa: E402
+from eventbus.data.actor_ref import ActorRef  # noqa: E402
+from eventbus.event import Event  # noqa: E402
+from eventbus.event_data.event_data_from_game import EventDataFromGame  # noqa: E402
+from eventbus.rpc import Rpc  # noqa: E402
+from fake_mwse_client import FakeMwseClient, ScriptedWorld  # noqa: E402
+from game.game_master import GameMaster  # noqa: E402
+from game.game_setup import GameSetup  # noqa: E402
+from game.i18n.i18n import I18n  # noqa: E402
+from llm.backend.dummy import DummyLlmBackend  # noqa: E402
+from llm.system import LlmSystem  # noqa: E402
+from stt.system import SttSystem  # noqa: E402
+from tts.backend.dummy import DummyTtsBackend  # noqa: E402
+from tts.system import TtsSystem  # noqa: E402
+from util.logger import Logger  # noqa: E402
+
+_NPC_SENTENCES = [
+    "Добрый день, чужеземец.",
+    "В городе сейчас неспокойно, стража ищет какого-то вора.",
+    "Говорят, он обчистил лавку Аррилла прошлой ночью.",
+    "Если хочешь узнать больше, загляни в таверну.",
+    "Там всегда кто-нибудь болтает лишнее.",
+]
+
+_LINES = [
+    "Привет, что нового в городе?",
+    "Расскажи мне о себе.",
+    "Как пройти к гильдии магов?",
+    "Ты слышал что-нибудь о Кай Косадесе?",
+    "Какая сегодня погода?",
+]
+
+
+class StageTimings:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = {}
+
+    def add(self, stage: str, duration_sec: float):
+        self.samples.setdefault(stage, []).append(duration_sec)
+
+    def clear(self):
+        self.samples.clear()
+
+    def wrap(self, obj: Any, method_name: str, stage: str,
+             on_start: Optional[Callable[[float], None]] = None, on_end: Optional[Callable[[float], None]] = None):
+        method = getattr(obj, method_name)
+
+        async def timed(*args: Any, **kwargs: Any):
+            t0 = time.perf_counter()
+            if on_start:
+                on_start(t0)
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                t1 = time.perf_counter()
+                self.add(stage, t1 - t0)
+                if on_end:
+                    on_end(t1)
+
+        setattr(obj, method_name, timed)
+
+    def report(self) -> dict[str, dict[str, float]]:
+        return {stage: _summarize(samples) for (stage, samples) in self.samples.items()}
+
+
+def _percentile(sorted_samples: list[float], p: float) -> float:
+    index = min(len(sorted_samples) - 1, max(0, round(p / 100.0 * len(sorted_samples) + 0.5) - 1))
+    return sorted_samples[index]
+
+
+def _summarize(samples: list[float]) -> dict[str, float]:
+    s = sorted(samples)
+    return {
+        "count": len(s),
+        "mean_ms": sum(s) / len(s) * 1000,
+        "p50_ms": _percentile(s, 50) * 1000,
+        "p95_ms": _percentile(s, 95) * 1000,
+        "p99_ms": _percentile(s, 99) * 1000,
+        "max_ms": s[-1] * 1000,
+    }
+
+
+def _get_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
+
+
+def _create_config(args: argparse.Namespace, work_dir: str) -> AppConfig:
+    config = AppConfig.get_default()
+    config.morrowind_data_files_dir = work_dir
+    config.database.directory = os.path.join(work_dir, "db")
+    config.log.log_to_file = False
+    config.event_bus.system.mwse_tcp.port = _get_free_port()
+
+    config.llm.system = LlmSystem.Config.Dummy(
+        type='dummy', dummy=DummyLlmBackend.Config(latency_sec=args.llm_latency_ms / 1000.0,
+                                            max_concurrent_requests=args.llm_max_concurrent_requests,
+                                            response_text=' '.join(_NPC_SENTENCES[:args.npc_sentences])))
+    config.text_to_speech.system = TtsSystem.Config.Dummy(
+        type='dummy', dummy=DummyTtsBackend.Config(latency_sec=args.tts_latency_ms / 1000.0, audio_duration_sec=1.0))
+    config.speech_to_text.system = SttSystem.Config.Dummy(type='dummy')
+
+    config.npc_database.max_used_in_llm_story_items = args.story_items
+
+    # Exactly --npc-lines NPC lines per player line, no random comments.
+    config.npc_director.strategy_random.npc_phrases_after_player_min = args.npc_lines
+    config.npc_director.strategy_random.npc_phrases_after_player_max = args.npc_lines
+    config.npc_director.npc_max_phrases_after_player_hard_limit = args.npc_lines
+    config.npc_director.random_comment_proba = 0.0
+
+    config.npc_turn_pipeline.enabled = args.pipeline
+    config.speculative_stt.enabled = args.speculative_stt
+    config.player_intention.parallel = args.parallel_intention
+    config.npc_speech_stream.enabled = args.stream
+
+    return config
+
+
+async def _setup(config: AppConfig, client: FakeMwseClient) -> tuple[GameMaster, SttSystem]:
+    event_bus = EventBus(config.event_bus)
+    rpc = Rpc(config.rpc, event_bus)
+    stt = SttSystem(config.speech_to_text, event_bus)
+    llm = LlmSystem(config.llm)
+    tts = TtsSystem(config.morrowind_data_files_dir, config.text_to_speech)
+    event_bus.start()
+
+    for _ in range(0, 50):
+        try:
+            await client.connect('localhost', config.event_bus.system.mwse_tcp.port)
+            break
+        except OSError:
+            await asyncio.sleep(0.1)
+
+    gm = await GameSetup.setup_game_master(config, event_bus, rpc, stt, llm, tts, I18n())
+    gm.start()
+    return (gm, stt)
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as work_dir:
+        config = _create_config(args, work_dir)
+        world = ScriptedWorld.sample(args.npcs)
+        client = FakeMwseClient(world, rpc_latency_sec=args.rpc_latency_ms / 1000.0)
+
+        (gm, stt) = await _setup(config, client)
+
+        timings = StageTimings()
+        turn_started_at: Optional[float] = None
+        tts_ended_at: Optional[float] = None
+        scene_unlocked_at: Optional[float] = None
+        npc_line_started_at: Optional[float] = None
+        is_new_line = True
+        npc_lines_said = 0
+        npc_said = asyncio.Event()
+        npc_said_all = asyncio.Event()
+
+        def on_event(event: Event, received_at: float):
+            nonlocal tts_ended_at, npc_lines_said, npc_line_started_at, is_new_line
+            if event.data.type == 'npc_say_mp3':
+                if tts_ended_at is not None:
+                    timings.add('npc_say_mp3', received_at - tts_ended_at)
+                    tts_ended_at = None
+
+                # Further parts of a streamed line.
+                if not is_new_line:
+                    return
+                is_new_line = False
+
+                if npc_line_started_at is not None:
+                    timings.add('npc_first_audio', received_at - npc_line_started_at)
+                    npc_line_started_at = None
+                if npc_lines_said > 0 and scene_unlocked_at is not None:
+                    timings.add('npc_gap', received_at - scene_unlocked_at)
+
+                npc_lines_said = npc_lines_said + 1
+                npc_said.set()
+                if npc_lines_said >= args.npc_lines:
+                    npc_said_all.set()
+
+        def on_scene_unlocked():
+            nonlocal scene_unlocked_at, is_new_line
+            scene_unlocked_at = time.perf_counter()
+            is_new_line = True
+
+        def on_npc_line_start(t: float):
+            nonlocal npc_line_started_at
+            if npc_line_started_at is None:
+                npc_line_started_at = t
+
+        def on_tts_end(t: float):
+            nonlocal tts_ended_at
+            tts_ended_at = t
+
+        def on_pick_actor_start(t: float):
+            nonlocal turn_started_at
+            if turn_started_at is not None:
+                timings.add('pick_actor_wait', t - turn_started_at)
+                turn_started_at = None
+
+        timings.wrap(gm._player_intention_analyzer, 'analyze_player_intention', 'player_intention')
+        timings.wrap(gm._npc_behavior_service, 'decide_who_should_act', 'decide_who_should_act', on_pick_actor_start)
+        timings.wrap(gm._npc_behavior_service, 'decide_how_npc_should_act', 'decide_how_npc_should_act', on_npc_line_start)
+        timings.wrap(gm._npc_intention_analyzer, 'process_story_item_data', 'npc_intention')
+        timings.wrap(gm._npc_speaker_service._tts, 'convert', 'tts', on_end=on_tts_end)
+        client.on_event = on_event
+        gm._npc_speaker_service.add_scene_unlock_listener(on_scene_unlocked)
+
+        timeouts = 0
+        for i in range(0, args.warmup + args.turns):
+            if i == args.warmup:
+                timings.clear()
+
+            # The previous NPC line holds the scene until its audio is almost over.
+            while gm._npc_speaker_service.is_scene_locked():
+                await asyncio.sleep(0.01)
+
+            npc = world.npcs[i % len(world.npcs)]
+            npc_said.clear()
+            npc_said_all.clear()
+            npc_lines_said = 0
+            is_new_line = True
+
+            line = _LINES[i % len(_LINES)]
+            if args.input == 'voice':
+                # Partial results while the player is speaking, the scene is held by the player meanwhile.
+                # The recognizer gives the final result only after some silence.
+                words = line.split(' ')
+                for n in range(1, len(words) + 1):
+                    stt._handle_recognizing(' '.join(words[:n]))
+                    await asyncio.sleep(0.05)
+                await asyncio.sleep(args.stt_endpoint_ms / 1000.0)
+
+            t0 = time.perf_counter()
+            turn_started_at = t0
+            if args.input == 'voice':
+                stt._handle_recognized(line)
+            else:
+                await client.send(Event(data=EventDataFromGame.DialogTextSubmit(
+                    type='dialog_text_submit',
+                    actor_ref=ActorRef(ref_id=npc.ref_id, type='npc', name=npc.name, female=npc.female),
+                    text=line
+                )))
+
+            try:
+                await asyncio.wait_for(npc_said.wait(), args.turn_timeout_sec)
+                timings.add('speech_end_to_npc_start', time.perf_counter() - t0)
+                await asyncio.wait_for(npc_said_all.wait(), args.turn_timeout_sec)
+            except TimeoutError:
+                timeouts = timeouts + 1
+
+        await client.close()
+        # Let the server notice the disconnect before the loop goes away.
+        await asyncio.sleep(0.1)
+
+        return {
+            "benchmark": "turn_latency",
+            "params": {
+                "turns": args.turns,
+                "input": args.input,
+                "warmup": args.warmup,
+                "npcs": args.npcs,
+                "npc_lines": args.npc_lines,
+                "pipeline": args.pipeline,
+                "speculative_stt": args.speculative_stt,
+                "parallel_intention": args.parallel_intention,
+                "stream": args.stream,
+                "npc_sentences": args.npc_sentences,
+                "stt_endpoint_ms": args.stt_endpoint_ms,
+                "story_items": args.story_items,
+                "llm_latency_ms": args.llm_latency_ms,
+                "llm_max_concurrent_requests": args.llm_max_concurrent_requests,
+                "tts_latency_ms": args.tts_latency_ms,
+                "rpc_latency_ms": args.rpc_latency_ms,
+            },
+            "timeouts": timeouts,
+            "pipeline": gm._npc_turn_pipeline.get_stats().model_dump(),
+            "speculative_stt": gm._player_speech_speculator.get_stats().model_dump(),
+            "parallel_intention": {
+                "lines": gm._parallel_intention_lines,
+                "rollbacks": gm._parallel_intention_rollbacks,
+            },
+            "stages": timings.report(),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--turns', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2, help='turns not counted, e.g. NPC creation')
+    parser.add_argument('--npcs', type=int, default=5)
+    parser.add_argument('--npc-lines', type=int, default=1, help='NPC lines said in a row after each player line')
+    parser.add_argument('--pipeline', action='store_true', help='prepare the next NPC line while the current one plays')
+    parser.add_argument('--input', choices=['dialog', 'voice'], default='dialog',
+                        help="how the player speaks: typed in the dialog window or via speech-to-text")
+    parser.add_argument('--stt-endpoint-ms', type=float, default=500.0,
+                        help='with --input voice, silence between the last partial and the final result')
+    parser.add_argument('--speculative-stt', action='store_true', help='analyze player intention on stable partial results')
+    parser.add_argument('--parallel-intention', action='store_true', help='let NPCs react while player intention is analyzed')
+    parser.add_argument('--stream', action='store_true', help='say NPC lines sentence by sentence while they are generated')
+    parser.add_argument('--npc-sentences', type=int, default=1, choices=range(1, len(_NPC_SENTENCES) + 1),
+                        help='sentences in a generated NPC line, used with --stream')
+    parser.add_argument('--story-items', type=int, default=25, help='npc_database.max_used_in_llm_story_items')
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0)
+    parser.add_argument('--llm-max-concurrent-requests', type=int, default=4, help='1 sends LLM requests one at a time')
+    parser.add_argument('--tts-latency-ms', type=float, default=0.0)
+    parser.add_argument('--rpc-latency-ms', type=float, default=0.0, help='fake game delay for each RPC answer')
+    parser.add_argument('--turn-timeout-sec', type=float, default=30.0)
+    parser.add_argument('--verbose', action='store_true', help='show server logs')
+    parser.add_argument('--output', type=str, default=None, help='write JSON report to this path')
+    args = parser.parse_args()
+
+    if args.verbose:
+        Logger.setup_logs(Logger.Config(
+            log_to_console=True, log_to_console_level='info', log_to_file=False, log_to_file_level='info'))
+
+    result = asyncio.run(run(args))
+
+    print(f"{'stage':<28}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for (stage, s) in result["stages"].items():
+        print(f"{stage:<28}{s['count']:>7}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}")
+    if args.pipeline:
+        print(f"pipeline hits: {result['pipeline']['hits']}, misses: {result['pipeline']['misses']}")
+    if args.speculative_stt:
+        print(f"speculative stt hits: {result['speculative_stt']['hits']}, misses: {result['speculative_stt']['misses']}")
+    if args.parallel_intention:
+        print(f"parallel intention rollbacks: {result['parallel_intention']['rollbacks']}/{result['parallel_intention']['lines']}")
+    if result["timeouts"] > 0:
+        print(f"timed out turns: {result['timeouts']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
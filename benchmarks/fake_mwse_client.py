@@ -0,0 +1,294 @@
+"""
+Headless stand-in for the MWSE mod: connects to the server like the game does, answers RPC requests
+from a scripted world and optionally replays a session recorded with `event_bus.system.mwse_tcp.record_path`.
+
+    python benchmarks/fake_mwse_client.py --port 18080
+    python benchmarks/fake_mwse_client.py --replay session.jsonl.gz --speed 0 --world world.json
+    python benchmarks/fake_mwse_client.py --role observer --subscribe 'npc_*' --subscribe dialog_text_submit
+
+`--speed 1` keeps the recorded timing, `--speed 0` sends events as fast as possible.
+`--role observer` connects next to the game: it only gets subscribed event types and never answers RPC.
+`--world` takes a JSON-serialized `ScriptedWorld`; without it a sample world is generated.
+Recorded RPC responses are not replayed, live requests are answered from the world instead.
+"""
+
+import argparse
+import asyncio
+import random
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "server"))
+
+from pydantic import BaseModel  # noqa: E402
+
+from eventbus.backend.mwse_tcp_codec import AbstractEventCodec, ClientRole, CodecName, HandshakeRequest, \
+    HandshakeResponse, JsonEventCodec, create_event_codec  # noqa: E402
+from eventbus.backend.mwse_tcp_recorder import MwseTcpRecorder, RecordedFrame  # noqa: E402
+from eventbus.data.actor_ref import ActorRef  # noqa: E402
+from eventbus.data.env_data import EnvData  # noqa: E402
+from eventbus.data.npc_data import NpcData  # noqa: E402
+from eventbus.data.player_data import PlayerData  # noqa: E402
+from eventbus.data.player_data_fast import PlayerDataFast  # noqa: E402
+from eventbus.data.position import Position  # noqa: E402
+from eventbus.event import Event  # noqa: E402
+from eventbus.event_data.event_data_rpc import EventDataRpc  # noqa: E402
+from sample_traffic import sample_env_data, sample_npc_data, sample_player_data  # noqa: E402
+
+
+class ScriptedWorld(BaseModel):
+    player: PlayerData
+    env: EnvData
+    npcs: list[NpcData]
+
+    @staticmethod
+    def sample(npcs_count: int, seed: int = 1) -> 'ScriptedWorld':
+        rnd = random.Random(seed)
+        player = sample_player_data(rnd)
+
+        npcs: list[NpcData] = []
+        for i in range(0, npcs_count):
+            npc = sample_npc_data(i, rnd)
+            # Keep everybody around the player, as in a town.
+            npc.position = Position(
+                x=player.position.x + rnd.uniform(-1500, 1500),
+                y=player.position.y + rnd.uniform(-1500, 1500),
+                z=player.position.z
+            )
+            npc.player_distance = npc.position.distance(player.position)
+            npcs.append(npc)
+
+        return ScriptedWorld(player=player, env=sample_env_data(rnd), npcs=npcs)
+
+    @staticmethod
+    def load(path: str) -> 'ScriptedWorld':
+        with open(path, 'r', encoding='utf-8') as f:
+            return ScriptedWorld.model_validate_json(f.read())
+
+    def get_npc(self, ref_id: str) -> Optional[NpcData]:
+        return next(filter(lambda npc: npc.ref_id == ref_id, self.npcs), None)
+
+    def answer(self, request: Event) -> Optional[Event]:
+        data = request.data
+        match data.type:
+            case 'get_local_player_request':
+                return Event(data=EventDataRpc.GetLocalPlayerResponse(
+                    type='get_local_player_response', player_data=self.player))
+            case 'get_local_player_fast_request':
+                return Event(data=EventDataRpc.GetLocalPlayerFastResponse(
+                    type='get_local_player_fast_response',
+                    player_data_fast=PlayerDataFast.model_validate(self.player.model_dump())
+                ))
+            case 'get_env_request':
+                return Event(data=EventDataRpc.GetEnvResponse(type='get_env_response', env_data=self.env))
+            case 'get_npc_request':
+                npc = self.get_npc(data.npc_ref_id)
+                if npc is None:
+                    return None
+                return Event(data=EventDataRpc.GetNpcResponse(type='get_npc_response', npc_data=npc))
+            case 'get_npcs_request':
+                npcs = list(filter(None, map(self.get_npc, data.npc_ref_ids)))
+                return Event(data=EventDataRpc.GetNpcsResponse(type='get_npcs_response', npcs_data=npcs))
+            case 'get_actors_nearby_request':
+                return Event(data=EventDataRpc.GetActorsNearbyResponse(
+                    type='get_actors_nearby_response',
+                    actors=self._get_actors_nearby(data.actor_ref_id, data.radius_ingame, data.test_line_of_sight)
+                ))
+            case 'is_ref_valid_request':
+                is_valid = data.ref_id == self.player.ref_id or self.get_npc(data.ref_id) is not None
+                return Event(data=EventDataRpc.IsRefValidResponse(type='is_ref_valid_response', is_valid=is_valid))
+            case 'line_of_sight_request':
+                return Event(data=EventDataRpc.LineOfSightResponse(type='line_of_sight_response', can_see=True))
+            case 'get_item_count_request':
+                return Event(data=EventDataRpc.GetItemCountResponse(type='get_item_count_response', count=0))
+            case _:
+                return None
+
+    def _get_actors_nearby(self, actor_ref_id: Optional[str], radius: Optional[float], test_line_of_sight: Optional[bool]):
+        center = self.player.position
+        if actor_ref_id and actor_ref_id != self.player.ref_id:
+            npc = self.get_npc(actor_ref_id)
+            if npc is not None:
+                center = npc.position
+
+        actors: list[EventDataRpc.GetActorsNearbyResponse.ActorNearby] = []
+        for npc in self.npcs:
+            if npc.ref_id == actor_ref_id or npc.is_dead:
+                continue
+
+            distance = npc.position.distance(center)
+            if radius is not None and distance > radius:
+                continue
+
+            actors.append(EventDataRpc.GetActorsNearbyResponse.ActorNearby(
+                actor_ref=ActorRef(ref_id=npc.ref_id, type='npc', name=npc.name, female=npc.female),
+                distance_ingame=distance,
+                can_see=True if test_line_of_sight else None
+            ))
+        return actors
+
+
+class FakeMwseClient:
+    def __init__(self, world: ScriptedWorld, encoding: str = 'cp1251', codec: CodecName = 'json',
+                 rpc_latency_sec: float = 0.0, role: ClientRole = 'game', client_name: Optional[str] = None,
+                 subscribe: list[str] = []) -> None:
+        self._world = world
+        self._role: ClientRole = role
+        self._client_name = client_name
+        self._subscribe = subscribe
+        self._rpc_latency_sec = rpc_latency_sec
+        self._encoding = encoding
+        self._requested_codec: CodecName = codec
+        self._codec: AbstractEventCodec = JsonEventCodec(encoding)
+
+        self._reader: asyncio.StreamReader
+        self._writer: asyncio.StreamWriter
+        self._read_task: Optional[asyncio.Task[None]] = None
+        self._next_event_id = 1
+        self._answer_tasks: set[asyncio.Task[None]] = set()
+
+        self.received_by_type: dict[str, int] = {}
+        self.rpc_answered = 0
+        self.rpc_unanswered = 0
+
+        # Called for every event from the server, with the receive time (time.perf_counter()).
+        self.on_event: Optional[Callable[[Event, float], None]] = None
+
+    async def connect(self, host: str, port: int):
+        self._reader, self._writer = await asyncio.open_connection(host, port)
+
+        if self._requested_codec != 'json' or self._role != 'game' or self._client_name is not None:
+            handshake = HandshakeRequest(type='handshake_request', codecs=[self._requested_codec],
+                                         client_name=self._client_name, role=self._role, subscribe=self._subscribe)
+            self._write_frame(handshake.model_dump_json().encode(encoding=self._encoding))
+
+            response = HandshakeResponse.model_validate_json(
+                (await self._read_frame()).decode(encoding=self._encoding))
+            self._codec = create_event_codec(response.codec, self._encoding)
+
+        self._read_task = asyncio.get_event_loop().create_task(self._read_loop())
+
+    async def close(self):
+        if self._read_task:
+            self._read_task.cancel()
+        self._writer.close()
+
+    async def send(self, event: Event):
+        event.event_id = self._next_event_id
+        self._next_event_id = self._next_event_id + 1
+
+        self._write_frame(self._codec.encode(event))
+        await self._writer.drain()
+
+    async def replay(self, frames: Iterable[RecordedFrame], speed: float) -> int:
+        sent = 0
+        first_t: Optional[float] = None
+        started_at = time.perf_counter()
+
+        for frame in frames:
+            # Only what the game originated: responses belong to requests of the recorded server run.
+            if frame.dir != 'in' or frame.event.response_to_event_id is not None:
+                continue
+
+            if speed > 0:
+                first_t = frame.t if first_t is None else first_t
+                delay = (frame.t - first_t) / speed - (time.perf_counter() - started_at)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            await self.send(frame.event)
+            sent = sent + 1
+        return sent
+
+    def _write_frame(self, msg_bytes: bytes):
+        self._writer.write(struct.pack('>I', len(msg_bytes)) + msg_bytes)
+
+    async def _read_frame(self) -> bytes:
+        msg_size: int = struct.unpack('>I', await self._reader.readexactly(4))[0]
+        return await self._reader.readexactly(msg_size)
+
+    async def _read_loop(self):
+        while True:
+            event = self._codec.decode(await self._read_frame())
+            received_at = time.perf_counter()
+
+            self.received_by_type[event.data.type] = self.received_by_type.get(event.data.type, 0) + 1
+            if self.on_event:
+                self.on_event(event, received_at)
+
+            # Observers may see requests they subscribed to, but the game client is the one to answer.
+            if event.data.type.endswith('_request') and self._role == 'game':
+                if self._rpc_latency_sec > 0:
+                    # Emulated game latency must not hold back reading of other frames.
+                    task = asyncio.get_event_loop().create_task(self._answer(event))
+                    self._answer_tasks.add(task)
+                    task.add_done_callback(self._answer_tasks.discard)
+                else:
+                    await self._answer(event)
+
+    async def _answer(self, request: Event):
+        if self._rpc_latency_sec > 0:
+            await asyncio.sleep(self._rpc_latency_sec)
+
+        response = self._world.answer(request)
+        if response is None:
+            self.rpc_unanswered = self.rpc_unanswered + 1
+            print(f"No scripted answer for {request.data}", file=sys.stderr)
+            return
+
+        response.response_to_event_id = request.event_id
+        self.rpc_answered = self.rpc_answered + 1
+        await self.send(response)
+
+
+async def run(args: argparse.Namespace):
+    world = ScriptedWorld.load(args.world) if args.world else ScriptedWorld.sample(args.npcs)
+    client = FakeMwseClient(world, args.encoding, args.codec, args.rpc_latency_ms / 1000.0,
+                            args.role, args.client_name, args.subscribe)
+    await client.connect(args.host, args.port)
+
+    started_at = time.perf_counter()
+    try:
+        if args.replay:
+            sent = await client.replay(MwseTcpRecorder.read(args.replay), args.speed)
+            print(f"Replayed {sent} events in {time.perf_counter() - started_at:.2f}s")
+            await asyncio.sleep(args.linger)
+        else:
+            while True:
+                await asyncio.sleep(3600)
+    finally:
+        await client.close()
+        print(f"RPC answered={client.rpc_answered} unanswered={client.rpc_unanswered}")
+        for (event_type, count) in sorted(client.received_by_type.items()):
+            print(f"  {event_type:<40}{count:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', type=str, default='localhost')
+    parser.add_argument('--port', type=int, default=18080)
+    parser.add_argument('--encoding', type=str, default='cp1251')
+    parser.add_argument('--codec', type=str, default='json', choices=['json', 'msgpack'])
+    parser.add_argument('--role', type=str, default='game', choices=['game', 'observer'])
+    parser.add_argument('--client-name', type=str, default=None)
+    parser.add_argument('--subscribe', type=str, action='append', default=[],
+                        help='event type pattern an observer gets, e.g. "npc_*", may be repeated')
+    parser.add_argument('--world', type=str, default=None, help='JSON file with a ScriptedWorld')
+    parser.add_argument('--npcs', type=int, default=10, help='NPCs in the sample world when no --world given')
+    parser.add_argument('--rpc-latency-ms', type=float, default=0.0, help='delay before answering each RPC request')
+    parser.add_argument('--replay', type=str, default=None, help='recorded session to replay')
+    parser.add_argument('--speed', type=float, default=1.0, help='replay speed, 0 is as fast as possible')
+    parser.add_argument('--linger', type=float, default=5.0, help='seconds to keep answering RPC after replay')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
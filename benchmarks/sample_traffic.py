@@ -0,0 +1,171 @@
+"""
+Synthetic but realistic MWSE traffic used by the benchmarks when no recorded session is given.
+"""
+
+import random
+
+from eventbus.data.actor_ref import ActorRef
+from eventbus.data.actor_stats import ActorAttributes, ActorEffectAttributes, ActorOtherStats, ActorSkills, ActorStats
+from eventbus.data.env_data import EnvData
+from eventbus.data.id_with_name import IdWithName
+from eventbus.data.nakedness import Nakedness
+from eventbus.data.npc_data import NpcAiConfig, NpcCellData, NpcData, NpcFactionData
+from eventbus.data.player_data import PlayerData, PlayerFactionData
+from eventbus.data.position import Position
+from eventbus.data.topic_data import TopicData
+from eventbus.event import Event
+from eventbus.event_data.event_data_from_game import EventDataFromGame
+from eventbus.event_data.event_data_from_server import EventDataFromServer
+from eventbus.event_data.event_data_rpc import EventDataRpc
+
+_NAMES = ["Фаргот", "Арилль", "Элоне", "Селлус Гравиус", "Ганциэль Дуар", "Хрисскар Плоскоступ", "Вадусса Сетт"]
+
+
+def _rand_position(rnd: random.Random) -> Position:
+    return Position(x=rnd.uniform(-120000, 120000), y=rnd.uniform(-120000, 120000), z=rnd.uniform(0, 2000))
+
+
+def _actor_ref(index: int) -> ActorRef:
+    return ActorRef(ref_id=f"npc_{index}00000000", type='npc', name=_NAMES[index % len(_NAMES)], female=index % 2 == 0)
+
+
+def _actor_stats(rnd: random.Random) -> ActorStats:
+    def r():
+        return rnd.randint(5, 100)
+
+    return ActorStats(
+        attributes=ActorAttributes(**{k: r() for k in ActorAttributes.model_fields}),
+        skills=ActorSkills(**{k: r() for k in ActorSkills.model_fields}),
+        effect_attributes=ActorEffectAttributes(**{k: 0 for k in ActorEffectAttributes.model_fields}),
+        other=ActorOtherStats(level=r(), encumbrance=rnd.uniform(0, 300), fight=r(), flee=r(), alarm=r())
+    )
+
+
+def sample_npc_data(index: int, rnd: random.Random | None = None) -> NpcData:
+    rnd = rnd or random.Random(index)
+    actor_ref = _actor_ref(index)
+    return NpcData(
+        ref_id=actor_ref.ref_id,
+        name=actor_ref.name,
+        has_mobile=True,
+        female=actor_ref.female,
+        class_id="Commoner",
+        class_name="Простолюдин",
+        cell=NpcCellData(id="Seyda Neen", name="Сейда Нин"),
+        npc_in_active_cell=True,
+        player_distance=rnd.uniform(0, 3000),
+        disposition=rnd.randint(0, 100),
+        is_diseased=False,
+        in_combat=False,
+        is_dead=False,
+        is_ashfall_innkeeper=False,
+        friendlies=[_actor_ref(index + i) for i in range(1, 3)],
+        hostiles=[],
+        equipped=[IdWithName(id=f"common_shirt_0{i}", name=f"Простая рубаха {i}") for i in range(1, 6)],
+        nakedness=Nakedness(head=True, torso=False, feet=False, legs=False),
+        health_normalized=1.0,
+        race=IdWithName(id="Dark Elf", name="Данмер"),
+        weapon_drawn=False,
+        position=_rand_position(rnd),
+        ai_config=NpcAiConfig(**{k: rnd.random() > 0.5 for k in NpcAiConfig.model_fields if k != 'travel_destinations'}),
+        faction=NpcFactionData(faction_id="Hlaalu", faction_name="Дом Хлаалу", npc_rank=3),
+        stats=_actor_stats(rnd),
+        gold=rnd.randint(0, 1000)
+    )
+
+
+def sample_player_data(rnd: random.Random | None = None) -> PlayerData:
+    rnd = rnd or random.Random(0)
+    return PlayerData(
+        ref_id="player",
+        name="Неревар",
+        female=False,
+        race=IdWithName(id="Dark Elf", name="Данмер"),
+        health_normalized=1.0,
+        position=_rand_position(rnd),
+        cell=IdWithName(id="Seyda Neen", name="Сейда Нин"),
+        equipped=[IdWithName(id="common_shirt_01", name="Простая рубаха")],
+        nakedness=Nakedness(head=True, torso=False, feet=False, legs=False),
+        in_dialog=False,
+        weapon_drawn=False,
+        factions=[PlayerFactionData(faction_id="Blades", name="Клинки", player_joined=True, player_expelled=False,
+                                    player_rank=0, player_reputation=1)],
+        gold=87,
+        stats=_actor_stats(rnd),
+        hostiles=[]
+    )
+
+
+def sample_env_data(rnd: random.Random | None = None) -> EnvData:
+    rnd = rnd or random.Random(0)
+    return EnvData(
+        sunrise_hour=6, current_weather="Clear", current_year=427, current_hour=rnd.uniform(0, 24),
+        current_month=7, sunset_hour=20, current_day=rnd.randint(1, 28)
+    )
+
+
+def sample_events(count: int = 1000, seed: int = 1) -> list[Event]:
+    rnd = random.Random(seed)
+
+    def get_npc_response(i: int):
+        return Event(data=EventDataRpc.GetNpcResponse(type='get_npc_response', npc_data=sample_npc_data(i, rnd)))
+
+    def get_actors_nearby_response(i: int):
+        return Event(data=EventDataRpc.GetActorsNearbyResponse(
+            type='get_actors_nearby_response',
+            actors=[
+                EventDataRpc.GetActorsNearbyResponse.ActorNearby(
+                    actor_ref=_actor_ref(i + n), distance_ingame=rnd.uniform(0, 3000), can_see=rnd.random() > 0.3)
+                for n in range(0, 8)
+            ]
+        ))
+
+    def get_env_response(i: int):
+        return Event(data=EventDataRpc.GetEnvResponse(type='get_env_response', env_data=sample_env_data(rnd)))
+
+    def dialog_update(i: int):
+        return Event(data=EventDataFromGame.DialogUpdate(
+            type='dialog_update',
+            npc_ref=_actor_ref(i),
+            topics=[TopicData(topic_text=f"тема {n}", topic_response="Длинный ответ на тему. " * 10) for n in range(0, 15)]
+        ))
+
+    def show_tooltip_for_ref(i: int):
+        return Event(data=EventDataFromGame.ShowTooltipForRef(
+            type='show_tooltip_for_ref', ref_id=f"ref_{i}", object_type=1, name="Дверь", position=_rand_position(rnd)))
+
+    def turn_actors_to(i: int):
+        return Event(data=EventDataFromServer.TurnActorsTo(
+            type='turn_actors_to', actor_ref_ids=[_actor_ref(i + n).ref_id for n in range(0, 5)],
+            target_ref_id=_actor_ref(i).ref_id))
+
+    def npc_say_mp3(i: int):
+        return Event(data=EventDataFromServer.NpcSayMp3(
+            type='npc_say_mp3', npc_ref_id=_actor_ref(i).ref_id, file_path=f"Vo\\AIV\\tts_{i % 15}.mp3",
+            pitch=1.0, target_ref_id=None, duration_sec=rnd.uniform(1, 10)))
+
+    def update_player_book(i: int):
+        return Event(data=EventDataFromServer.UpdatePlayerBook(
+            type='update_player_book', player_book_name="Книга Путей",
+            player_book_content="<p>Фаргот сказал что-то важное.</p>" * 40))
+
+    builders = [
+        (get_npc_response, 10),
+        (get_actors_nearby_response, 10),
+        (get_env_response, 5),
+        (dialog_update, 3),
+        (show_tooltip_for_ref, 30),
+        (turn_actors_to, 15),
+        (npc_say_mp3, 10),
+        (update_player_book, 2),
+    ]
+    population = [b for (b, _) in builders]
+    weights = [w for (_, w) in builders]
+
+    events: list[Event] = []
+    for i in range(0, count):
+        builder = rnd.choices(population, weights)[0]
+        event = builder(i)
+        event.event_id = i + 1
+        events.append(event)
+    return events
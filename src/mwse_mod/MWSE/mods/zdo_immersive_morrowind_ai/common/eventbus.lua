@@ -16,6 +16,10 @@ this.events_to_produce = {}
 this.next_event_id = 1
 this.connection_maintaining_loop_started = false
 
+function this.is_active()
+    return this.state == state_active
+end
+
 function this.produce_event_from_game(e)
     if this.state ~= state_active then
         util.debug("Skip producing event because not connected to the server")
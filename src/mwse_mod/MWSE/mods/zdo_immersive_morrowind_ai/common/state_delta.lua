@@ -0,0 +1,71 @@
+local eventbus = require("zdo_immersive_morrowind_ai.common.eventbus")
+
+local this = {}
+
+-- Values are compared by their JSON form, so tables like position or cell compare by content.
+-- Returns nil when nothing changed since the last call, otherwise only the changed keys.
+-- Keys which became nil are listed in `cleared` as nil values are not sent at all.
+function this.diff(last_sent, current, keys)
+    local delta = {}
+    local cleared = {}
+    local changed = false
+
+    for _, key in ipairs(keys) do
+        local value = current[key]
+        local encoded = nil
+        if value ~= nil then
+            encoded = json.encode(value)
+        end
+
+        if encoded ~= last_sent[key] then
+            if value == nil then
+                table.insert(cleared, key)
+            else
+                delta[key] = value
+            end
+            last_sent[key] = encoded
+            changed = true
+        end
+    end
+
+    if not changed then
+        return nil
+    end
+
+    if #cleared > 0 then
+        delta["cleared"] = cleared
+    end
+    return delta
+end
+
+-- Pushes `type` events with changed fields of get_state() every interval_sec while connected.
+-- When nothing changed an empty event is sent anyway, so the server knows the pusher is alive and polls less.
+-- After reconnecting everything is sent again, so a restarted server gets a full picture.
+function this.run_pusher(type, interval_sec, keys, get_state)
+    local last_sent = {}
+
+    timer.start({
+        duration = interval_sec,
+        type = timer.real,
+        iterations = -1,
+        persist = false,
+        callback = function(e)
+            if not eventbus.is_active() then
+                last_sent = {}
+                return
+            end
+
+            local delta = this.diff(last_sent, get_state(), keys) or {}
+            delta["type"] = type
+            eventbus.produce_event_from_game({
+                data = delta
+            })
+        end
+    })
+end
+
+function this.round(value, step)
+    return math.floor(value / step + 0.5) * step
+end
+
+return this
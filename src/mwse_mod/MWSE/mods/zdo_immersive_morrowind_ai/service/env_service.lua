@@ -1,9 +1,18 @@
 local eventbus = require("zdo_immersive_morrowind_ai.common.eventbus")
 local util = require("zdo_immersive_morrowind_ai.common.util")
+local state_delta = require("zdo_immersive_morrowind_ai.common.state_delta")
 
 local this = {}
 
+this.state_delta_interval_sec = 1
+-- Ashfall data changes all the time and is left to get_env_request polling.
+this.state_delta_keys = {"current_weather", "sunrise_hour", "sunset_hour", "masser_phase", "secunda_phase",
+                         "current_day", "current_month", "current_year", "current_hour"}
+
 function this.setup()
+    state_delta.run_pusher("env_state_delta", this.state_delta_interval_sec, this.state_delta_keys,
+        this.get_env_state_for_delta)
+
     event.register("zdo_ai_rpg:event_from_server", function(e)
         if e["data"]["type"] == "get_env_request" then
             eventbus.produce_response_event(e, {
@@ -49,4 +58,23 @@ function this.get_env_data()
     }
 end
 
+function this.get_env_state_for_delta()
+    local worldCtrl = tes3.worldController
+    local weatherCtrl = tes3.worldController.weatherController
+
+    return {
+        current_weather = tes3.getCurrentWeather() and tes3.getCurrentWeather().name or "Clear",
+        sunrise_hour = weatherCtrl.sunriseHour,
+        sunset_hour = weatherCtrl.sunsetHour,
+        masser_phase = weatherCtrl.masser.phase,
+        secunda_phase = weatherCtrl.secunda.phase,
+
+        current_day = worldCtrl.day.value,
+        current_month = worldCtrl.month.value,
+        current_year = worldCtrl.year.value,
+        -- Game minutes pass quickly, a tenth of an hour is fresh enough for the prompts.
+        current_hour = state_delta.round(worldCtrl.hour.value, 0.1)
+    }
+end
+
 return this
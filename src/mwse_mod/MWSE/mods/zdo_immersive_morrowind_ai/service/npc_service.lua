@@ -255,6 +255,18 @@ function this.setup(first_time_loaded)
                     npc_data = this.get_npc_data(e["data"]["npc_ref_id"])
                 }
             })
+        elseif e["data"]["type"] == "get_npcs_request" then
+            local npcs_data = {}
+            for _, npc_ref_id in ipairs(e["data"]["npc_ref_ids"]) do
+                table.insert(npcs_data, this.get_npc_data(npc_ref_id))
+            end
+
+            eventbus.produce_response_event(e, {
+                data = {
+                    type = "get_npcs_response",
+                    npcs_data = npcs_data
+                }
+            })
         elseif e["data"]["type"] == "npc_say_mp3" then
             local ref = tes3.getReference(e["data"]["npc_ref_id"])
             this.npc_ref_id_to_audio_pitch[ref.id] = e["data"]["pitch"]
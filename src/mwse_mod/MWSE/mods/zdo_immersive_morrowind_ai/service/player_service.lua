@@ -1,6 +1,7 @@
 local eventbus = require("zdo_immersive_morrowind_ai.common.eventbus")
 local util = require("zdo_immersive_morrowind_ai.common.util")
 local actor_stats = require("zdo_immersive_morrowind_ai.common.actor_stats")
+local state_delta = require("zdo_immersive_morrowind_ai.common.state_delta")
 local ashfall_common = nil
 
 local this = {}
@@ -10,7 +11,13 @@ this.player_book_content = ""
 this.last_tooltip_name = ''
 this.last_tooltip_show_ms = 0
 
+this.state_delta_interval_sec = 0.5
+this.state_delta_keys = {"health_normalized", "position", "cell", "in_dialog", "weapon_drawn", "weapon", "gold"}
+
 function this.setup()
+    state_delta.run_pusher("player_state_delta", this.state_delta_interval_sec, this.state_delta_keys,
+        this.get_player_state_for_delta)
+
     event.register("zdo_ai_rpg:event_from_server", function(e)
         if e["data"]["type"] == "get_local_player_request" then
             eventbus.produce_response_event(e, {
@@ -352,4 +359,17 @@ function this.get_player_data_fast()
     }
 end
 
+-- Same as get_player_data_fast, but rounded so walking around or health regeneration does not
+-- produce a delta every tick.
+function this.get_player_state_for_delta()
+    local state = this.get_player_data_fast()
+    state.health_normalized = state_delta.round(state.health_normalized, 1)
+    state.position = {
+        x = state_delta.round(state.position.x, 64),
+        y = state_delta.round(state.position.y, 64),
+        z = state_delta.round(state.position.z, 64)
+    }
+    return state
+end
+
 return this
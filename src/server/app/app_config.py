@@ -1,16 +1,23 @@
 from typing import Literal
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import yaml
 
 from database.database import Database
 from game.service.npc_services.npc_database import NpcDatabase
 from eventbus.backend.mwse_tcp import MwseTcpEventBusBackend
 from eventbus.bus import EventBus
+from eventbus.priority_event_queue import EventCoalesceRule, EventPriorityClass
 from eventbus.rpc import Rpc
 from game.service.npc_services.npc_llm_pick_actor_service import NpcLlmPickActorService
 from game.service.npc_services.npc_speaker_service import NpcSpeakerService
+from game.service.npc_services.npc_llm_system_instructions_builder import NpcLlmSystemInstructionsBuilder
+from game.service.npc_services.npc_speech_stream import NpcSpeechStream
 from game.service.player_services.player_database import PlayerDatabase
+from game.service.player_services.player_intention_analyzer import PlayerIntentionAnalyzer
+from game.service.player_services.player_speech_speculator import PlayerSpeechSpeculator
 from game.service.scene.scene_instructions import SceneInstructions
+from game.service.scene.npc_turn_pipeline import NpcTurnPipeline
+from game.service.scene.story_scheduler import StoryScheduler
 from llm.system import LlmSystem
 from stt.system import SttSystem
 from tts.file_list_rotation import FileListRotation
@@ -32,6 +39,12 @@ class AppConfig(BaseModel):
     npc_director: NpcLlmPickActorService.Config
     npc_speaker: NpcSpeakerService.Config
     scene_instructions: SceneInstructions.Config | None
+    story_scheduler: StoryScheduler.Config = Field(default=StoryScheduler.Config())
+    npc_turn_pipeline: NpcTurnPipeline.Config = Field(default=NpcTurnPipeline.Config())
+    speculative_stt: PlayerSpeechSpeculator.Config = Field(default=PlayerSpeechSpeculator.Config())
+    player_intention: PlayerIntentionAnalyzer.Config = Field(default=PlayerIntentionAnalyzer.Config())
+    npc_speech_stream: NpcSpeechStream.Config = Field(default=NpcSpeechStream.Config())
+    npc_system_instructions: NpcLlmSystemInstructionsBuilder.Config = Field(default=NpcLlmSystemInstructionsBuilder.Config())
 
     @staticmethod
     def load_from_file(path: str):
@@ -60,6 +73,37 @@ class AppConfig(BaseModel):
                 producers=10,
                 queue_max_size=1000,
                 queue_overflow="drop_oldest",
+                priority_classes=[
+                    EventPriorityClass(
+                        name='rpc',
+                        types=['*_request', '*_response'],
+                        queue_max_size=1000,
+                        queue_overflow='drop_oldest'
+                    ),
+                    EventPriorityClass(
+                        name='speech',
+                        types=['npc_say_mp3', 'npc_remove_sound', 'actor_says', 'dialog_text_submit',
+                               'stt_start_listening', 'stt_stop_listening', 'stt_recognition_complete'],
+                        queue_max_size=1000,
+                        queue_overflow='drop_oldest'
+                    ),
+                    EventPriorityClass(
+                        name='default',
+                        queue_max_size=1000,
+                        queue_overflow='drop_oldest'
+                    ),
+                    EventPriorityClass(
+                        name='cosmetic',
+                        types=['show_tooltip_for_ref', 'show_tooltip_for_inventory_item',
+                               'stt_recognition_update', 'turn_actors_to'],
+                        queue_max_size=100,
+                        queue_overflow='drop_oldest'
+                    )
+                ],
+                coalesce=[
+                    EventCoalesceRule(type='update_player_book', key_fields=['player_book_name']),
+                    EventCoalesceRule(type='stt_recognition_update')
+                ],
                 system=EventBus.Config.MwseTcp(
                     type='mwse_tcp',
                     mwse_tcp=MwseTcpEventBusBackend.Config(
@@ -69,7 +113,10 @@ class AppConfig(BaseModel):
                 )
             ),
             rpc=Rpc.Config(
-                max_wait_time_sec=5
+                max_wait_time_sec=5,
+                cache_ttl_sec={
+                    'get_actors_nearby_request': 0.25
+                }
             ),
             speech_to_text=SttSystem.Config(
                 system=SttSystem.Config.Dummy(type='dummy'),
@@ -110,5 +157,11 @@ class AppConfig(BaseModel):
                 random_comment_proba=0.1
             ),
             npc_speaker=NpcSpeakerService.Config(),
-            scene_instructions=None
+            scene_instructions=None,
+            story_scheduler=StoryScheduler.Config(),
+            npc_turn_pipeline=NpcTurnPipeline.Config(),
+            speculative_stt=PlayerSpeechSpeculator.Config(),
+            player_intention=PlayerIntentionAnalyzer.Config(),
+            npc_speech_stream=NpcSpeechStream.Config(),
+            npc_system_instructions=NpcLlmSystemInstructionsBuilder.Config()
         )
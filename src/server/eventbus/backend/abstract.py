@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Callable
+from typing import Callable, Optional
 from eventbus.event import Event
+from eventbus.event_decode_stats import EventDecodeStats
 
 
 class AbstractEventBusBackend(ABC):
+    # Events from the game are fully decoded only if is_event_type_needed(type) is true (or it is not given).
     @abstractmethod
-    def start(self, callback: Callable[[Event], None]):
+    def start(self, callback: Callable[[Event], None], is_event_type_needed: Optional[Callable[[str], bool]] = None):
         pass
 
     @abstractmethod
@@ -15,3 +17,7 @@ class AbstractEventBusBackend(ABC):
     @abstractmethod
     def is_connected_to_game(self) -> bool:
         pass
+
+    @abstractmethod
+    def get_decode_stats(self) -> list[EventDecodeStats]:
+        pass
@@ -1,92 +1,430 @@
 import asyncio
+from collections import deque
+from fnmatch import fnmatchcase
+import time
 from util.logger import Logger
 import struct
-from typing import Callable
+from typing import Callable, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from eventbus.backend.abstract import AbstractEventBusBackend
-from eventbus.event import Event
+from eventbus.backend.mwse_tcp_codec import AbstractEventCodec, ClientRole, CodecName, HandshakeRequest, \
+    HandshakeResponse, JsonEventCodec, create_event_codec, try_parse_handshake_request
+from eventbus.backend.mwse_tcp_frame_parser import MwseTcpFrameParser
+from eventbus.backend.mwse_tcp_recorder import MwseTcpRecorder
+from eventbus.event import Event, get_event_data_types
+from eventbus.event_data.event_data_rpc import EventDataRpcUnion
+from eventbus.event_decode_stats import EventDecodeStats, EventDecodeTimings
 
 logger = Logger(__name__)
 
+_RPC_REQUEST_TYPES = set(filter(lambda t: t.endswith('_request'), get_event_data_types(EventDataRpcUnion)))
+
+
+class MwseTcpClientStats(BaseModel):
+    peer_name: str
+    client_name: Optional[str]
+    role: str
+    codec: str
+
+    frames_sent: int
+    bytes_sent: int
+    writes: int
+    frames_dropped: int
+
+    frames_per_sec: float
+    bytes_per_sec: float
+
+    queued_frames: int
+    queued_bytes: int
+    transport_buffer_bytes: int
+
+
+class _ClientSendRate:
+    def __init__(self) -> None:
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.writes = 0
+        self.frames_dropped = 0
+
+        self.frames_per_sec = 0.0
+        self.bytes_per_sec = 0.0
+
+        self._window_started_at = time.monotonic()
+        self._window_frames = 0
+        self._window_bytes = 0
+
+    def add_write(self, frames: int, size: int):
+        self.frames_sent = self.frames_sent + frames
+        self.bytes_sent = self.bytes_sent + size
+        self.writes = self.writes + 1
+
+        self._window_frames = self._window_frames + frames
+        self._window_bytes = self._window_bytes + size
+        self.update_window()
+
+    def update_window(self):
+        now = time.monotonic()
+        dt = now - self._window_started_at
+        if dt < 1.0:
+            return
+
+        self.frames_per_sec = self._window_frames / dt
+        self.bytes_per_sec = self._window_bytes / dt
+
+        self._window_started_at = now
+        self._window_frames = 0
+        self._window_bytes = 0
+
 
 class _ActiveClient:
     peer_name: str
-    writer: asyncio.StreamWriter
+    transport: asyncio.WriteTransport
+    codec: AbstractEventCodec
 
-    def __init__(self, peer_name: str, writer: asyncio.StreamWriter):
+    def __init__(self, peer_name: str, transport: asyncio.WriteTransport, codec: AbstractEventCodec):
         self.peer_name = peer_name
-        self.writer = writer
+        self.transport = transport
+        self.codec = codec
+
+        # Only the very first frame may be a handshake request, without it the client is the game.
+        self.is_first_frame = True
+        self.client_name: Optional[str] = None
+        self.role: ClientRole = 'game'
+        self.subscribe: list[str] = []
+        self._event_type_to_is_subscribed: dict[str, bool] = {}
+
+        # Cleared while the transport buffer is above the high watermark (see pause_writing()).
+        self.can_write = asyncio.Event()
+        self.can_write.set()
+
+        # Complete frames (header + body) waiting to be written by the client's sender task.
+        self.pending_frames: deque[bytes] = deque()
+        self.pending_bytes = 0
+        self.has_pending_frames = asyncio.Event()
+
+        self.send_rate = _ClientSendRate()
+
+    def is_subscribed(self, event_type: str) -> bool:
+        if self.role == 'game':
+            return event_type not in _RPC_REQUEST_TYPES
+
+        is_subscribed = self._event_type_to_is_subscribed.get(event_type, None)
+        if is_subscribed is None:
+            is_subscribed = any(map(lambda pattern: fnmatchcase(event_type, pattern), self.subscribe))
+            self._event_type_to_is_subscribed[event_type] = is_subscribed
+        return is_subscribed
+
 
 class MwseTcpEventBusBackend(AbstractEventBusBackend):
     class Config(BaseModel):
         port: int
         encoding: str
 
+        # Codecs the server agrees to switch to if the client asks for it in the handshake.
+        # Clients which do not send a handshake always talk JSON.
+        codecs: list[CodecName] = Field(default=['msgpack', 'json'])
+
+        # Ready frames are coalesced into a single write up to this size.
+        max_write_batch_bytes: int = Field(default=64 * 1024)
+
+        # Sender waits for drain() once the transport buffer is above the high watermark,
+        # and resumes when it goes below the low one.
+        write_buffer_high_watermark: int = Field(default=256 * 1024)
+        write_buffer_low_watermark: int = Field(default=64 * 1024)
+
+        # Frames queued for a single client above this limit are dropped.
+        max_queued_frames_per_client: int = Field(default=5000)
+
+        stats_log_interval_sec: Optional[float] = Field(default=None)
+
+        # Frames above this size are treated as a broken stream and the client is disconnected.
+        max_frame_size: int = Field(default=16 * 1024 * 1024)
+
+        # Every event to and from the game is written to this file (JSON lines, gzip if it ends with '.gz').
+        record_path: Optional[str] = Field(default=None)
+
     def __init__(self, config: Config) -> None:
         super().__init__()
 
         self._config = config
         self._callback_for_event_from_game: Callable[[Event], None]
+        self._is_event_type_needed: Optional[Callable[[str], bool]] = None
+        self._decode_timings = EventDecodeTimings()
 
         self._active_clients: list[_ActiveClient] = []
 
+        self._recorder: Optional[MwseTcpRecorder] = None
+        if config.record_path:
+            self._recorder = MwseTcpRecorder(config.record_path)
+
     def is_connected_to_game(self) -> bool:
-        return len(self._active_clients) > 0
+        return self._get_authoritative_game_client() is not None
+
+    # RPC requests go only to this client, so every request gets exactly one response.
+    # The latest connected game wins: after a reconnect the previous connection may still be half-open.
+    # A client without any frame yet may still turn out to be an observer, it is picked only when no other game is known.
+    def _get_authoritative_game_client(self) -> Optional[_ActiveClient]:
+        pending_client: Optional[_ActiveClient] = None
+        for client in reversed(self._active_clients):
+            if client.role == 'game':
+                if not client.is_first_frame:
+                    return client
+                if pending_client is None:
+                    pending_client = client
+        return pending_client
 
-    def start(self, callback: Callable[[Event], None]):
+    def start(self, callback: Callable[[Event], None], is_event_type_needed: Optional[Callable[[str], bool]] = None):
         self._callback_for_event_from_game = callback
+        self._is_event_type_needed = is_event_type_needed
 
         asyncio.get_event_loop().create_task(self._run_server())
+        if self._config.stats_log_interval_sec:
+            asyncio.get_event_loop().create_task(self._log_stats_loop(self._config.stats_log_interval_sec))
 
-    def publish_event_to_game(self, event: Event):
+    def get_clients_stats(self) -> list[MwseTcpClientStats]:
+        stats: list[MwseTcpClientStats] = []
         for client in self._active_clients:
+            client.send_rate.update_window()
+
+            transport_buffer_bytes = client.transport.get_write_buffer_size()
+
+            stats.append(MwseTcpClientStats(
+                peer_name=client.peer_name,
+                client_name=client.client_name,
+                role=client.role,
+                codec=client.codec.name,
+                frames_sent=client.send_rate.frames_sent,
+                bytes_sent=client.send_rate.bytes_sent,
+                writes=client.send_rate.writes,
+                frames_dropped=client.send_rate.frames_dropped,
+                frames_per_sec=client.send_rate.frames_per_sec,
+                bytes_per_sec=client.send_rate.bytes_per_sec,
+                queued_frames=len(client.pending_frames),
+                queued_bytes=client.pending_bytes,
+                transport_buffer_bytes=transport_buffer_bytes
+            ))
+        return stats
+
+    def get_decode_stats(self) -> list[EventDecodeStats]:
+        return self._decode_timings.get_stats()
+
+    def publish_event_to_game(self, event: Event):
+        if self._recorder:
+            self._recorder.record('out', '*', event)
+
+        clients = list(filter(lambda c: c.is_subscribed(event.data.type), self._active_clients))
+        if event.data.type in _RPC_REQUEST_TYPES:
+            game_client = self._get_authoritative_game_client()
+            if game_client is None:
+                logger.warning(f"No game client to send RPC request to, dropping event={event}")
+            else:
+                clients.insert(0, game_client)
+
+        self._publish_event_to_clients(event, clients)
+
+    def _publish_event_to_clients(self, event: Event, clients: list[_ActiveClient]):
+        codec_name_to_msg_bytes: dict[CodecName, bytes] = {}
+
+        for client in clients:
             try:
-                self._publish_event_to_client(client, event)
+                msg_bytes = codec_name_to_msg_bytes.get(client.codec.name, None)
+                if msg_bytes is None:
+                    msg_bytes = client.codec.encode(event)
+                    codec_name_to_msg_bytes[client.codec.name] = msg_bytes
+
+                self._publish_frame_to_client(client, msg_bytes)
             except Exception as error:
                 logger.error(f"Falied to publish event to client {client.peer_name}: {error}")
 
-    def _publish_event_to_client(self, client: _ActiveClient, event: Event):
-        msg_json_str = event.model_dump_json()
-        msg_bytes = msg_json_str.encode(encoding=self._config.encoding)
+    def _publish_frame_to_client(self, client: _ActiveClient, msg_bytes: bytes):
+        if len(client.pending_frames) >= self._config.max_queued_frames_per_client:
+            client.send_rate.frames_dropped = client.send_rate.frames_dropped + 1
+            logger.warning(f"Client {client.peer_name} send queue is full, dropping frame of {len(msg_bytes)} bytes")
+            return
+
+        frame = struct.pack('>I', len(msg_bytes)) + msg_bytes
+        client.pending_frames.append(frame)
+        client.pending_bytes = client.pending_bytes + len(frame)
+        client.has_pending_frames.set()
+
+    async def _send_frames_to_client(self, client: _ActiveClient):
+        try:
+            while True:
+                await client.has_pending_frames.wait()
+
+                batch: list[bytes] = []
+                batch_size = 0
+                while len(client.pending_frames) > 0:
+                    frame_size = len(client.pending_frames[0])
+                    if len(batch) > 0 and batch_size + frame_size > self._config.max_write_batch_bytes:
+                        break
+
+                    batch.append(client.pending_frames.popleft())
+                    batch_size = batch_size + frame_size
+
+                client.pending_bytes = client.pending_bytes - batch_size
+                if len(client.pending_frames) == 0:
+                    client.has_pending_frames.clear()
+
+                client.transport.write(b''.join(batch))
+                client.send_rate.add_write(len(batch), batch_size)
+
+                await client.can_write.wait()
+        except Exception as error:
+            logger.error(f"Error happened during sending to the client {client.peer_name}: {error}")
+            # Without a sender the client would stay registered and silently drop everything published to it.
+            # Closing the transport makes connection_lost() unregister it.
+            client.transport.close()
 
-        header = struct.pack('>I', len(msg_bytes))
-        client.writer.write(header)
-        client.writer.write(msg_bytes)
+    def _handle_handshake(self, client: _ActiveClient, request: HandshakeRequest):
+        codec_name: CodecName = 'json'
+        for requested_codec_name in request.codecs:
+            if requested_codec_name in self._config.codecs:
+                codec_name = requested_codec_name  # type: ignore
+                break
 
-    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
-        peername = writer.get_extra_info("peername")
+        # Handshake response is the last JSON frame, everything after it uses the negotiated codec.
+        response = HandshakeResponse(type='handshake_response', codec=codec_name)
+        self._publish_frame_to_client(client, response.model_dump_json().encode(encoding=self._config.encoding))
+
+        client.codec = create_event_codec(codec_name, self._config.encoding)
+        client.client_name = request.client_name
+        client.role = request.role
+        client.subscribe = request.subscribe
+        logger.info(f"Client #{client.peer_name} '{request.client_name}' is {request.role}, negotiated codec '{codec_name}'"
+                    f"{f', subscribed to {request.subscribe}' if request.role == 'observer' else ''}")
+
+    def _handle_connection_made(self, transport: asyncio.Transport) -> _ActiveClient:
+        peername = transport.get_extra_info("peername")
         address = peername[0]
         port = peername[1]
 
-        client = _ActiveClient(peer_name=f"{address}:{port}", writer=writer)
+        client = _ActiveClient(
+            peer_name=f"{address}:{port}",
+            transport=transport,
+            codec=JsonEventCodec(self._config.encoding)
+        )
+
+        transport.set_write_buffer_limits(
+            high=self._config.write_buffer_high_watermark,
+            low=self._config.write_buffer_low_watermark
+        )
 
         logger.info(f"Client #{client.peer_name} connected")
         self._active_clients.append(client)
+        return client
+
+    def _handle_connection_lost(self, client: _ActiveClient, error: Optional[Exception]):
+        if error:
+            logger.error(f"Error happened during serving the client: {error}")
+        logger.info(f"Client #{client.peer_name} disconnected")
+        self._active_clients.remove(client)
+
+    def _handle_frame(self, client: _ActiveClient, msg_bytes: memoryview):
+        if client.is_first_frame:
+            client.is_first_frame = False
+            handshake_request = try_parse_handshake_request(msg_bytes, self._config.encoding)
+            if handshake_request:
+                self._handle_handshake(client, handshake_request)
+                return
 
         try:
-            while True:
-                msg_size_bytes = await reader.readexactly(4)
-                msg_size: int = struct.unpack('>I', msg_size_bytes)[0]
-
-                msg_bytes = await reader.readexactly(msg_size)
-                msg = msg_bytes.decode(encoding=self._config.encoding)
-
-                try:
-                    event = Event.model_validate_json(msg, strict=True)
-                    logger.debug(event)
-                    self._callback_for_event_from_game(event)
-                except Exception as error:
-                    logger.error(f"Error happened during event deserialization: {msg} {error}")
+            t0 = time.perf_counter()
+            (header, payload) = client.codec.decode_header(msg_bytes)
+
+            if client.role != 'game' and header.response_to_event_id is not None:
+                logger.warning(f"Client #{client.peer_name} is {client.role}, ignoring its response to event {header.response_to_event_id}")
+                return
+
+            observers = list(filter(
+                lambda c: c is not client and c.role == 'observer' and c.is_subscribed(header.type), self._active_clients))
+
+            # Recording needs every event, whether handled or not.
+            if self._recorder is None and len(observers) == 0 and \
+                    self._is_event_type_needed and not self._is_event_type_needed(header.type):
+                self._decode_timings.add_skipped(header.type, time.perf_counter() - t0)
+                return
+
+            event = client.codec.decode_payload(header.type, payload)
+            self._decode_timings.add_decoded(header.type, time.perf_counter() - t0)
+
+            logger.debug(event)
+            if self._recorder:
+                self._recorder.record('in', client.peer_name, event)
+            if len(observers) > 0:
+                self._publish_event_to_clients(event, observers)
+            self._callback_for_event_from_game(event)
         except Exception as error:
-            logger.error(f"Error happened during serving the client: {error}")
-        finally:
-            self._active_clients.remove(client)
-            writer.close()
+            logger.error(f"Error happened during event deserialization: {bytes(msg_bytes)} {error}")
+
+    async def _log_stats_loop(self, interval_sec: float):
+        while True:
+            await asyncio.sleep(interval_sec)
+
+            for stats in self.get_clients_stats():
+                logger.info(f"Client #{stats.peer_name} send stats: {stats.frames_per_sec:.1f} frames/s "
+                            f"{stats.bytes_per_sec:.0f} bytes/s queued={stats.queued_frames} ({stats.queued_bytes} bytes) "
+                            f"transport_buffer={stats.transport_buffer_bytes} dropped={stats.frames_dropped}")
+
+            for decode_stats in self.get_decode_stats():
+                logger.info(f"Decode stats for '{decode_stats.type}': decoded={decode_stats.decoded} "
+                            f"mean={decode_stats.mean_decode_us:.0f}us max={decode_stats.max_decode_us:.0f}us "
+                            f"skipped={decode_stats.skipped} mean={decode_stats.mean_skip_us:.0f}us")
 
     async def _run_server(self):
         Logger.set_ctx(f"mwse_tcp_server")
 
-        server = await asyncio.start_server(self._handle_client, 'localhost', self._config.port)
-        async with server:
-            await server.serve_forever()
+        try:
+            server = await asyncio.get_event_loop().create_server(
+                lambda: _MwseTcpServerProtocol(self), 'localhost', self._config.port)
+            async with server:
+                await server.serve_forever()
+        finally:
+            if self._recorder:
+                self._recorder.close()
+
+
+# Reads frames straight from the transport's data_received() chunks: one chunk may carry many frames
+# and they are all decoded in the same callback, without a readexactly() round trip per header and body.
+class _MwseTcpServerProtocol(asyncio.Protocol):
+    def __init__(self, backend: MwseTcpEventBusBackend) -> None:
+        self._backend = backend
+        self._client: Optional[_ActiveClient] = None
+        self._sender_task: Optional[asyncio.Task[None]] = None
+        self._parser = MwseTcpFrameParser(self._handle_frame, backend._config.max_frame_size)
+
+    def connection_made(self, transport: asyncio.BaseTransport):
+        self._client = self._backend._handle_connection_made(transport)  # type: ignore
+        self._sender_task = asyncio.get_event_loop().create_task(self._backend._send_frames_to_client(self._client))
+
+    def data_received(self, data: bytes):
+        if self._client is None:
+            return
+
+        try:
+            self._parser.feed(data)
+        except Exception as error:
+            logger.error(f"Error happened during reading from the client {self._client.peer_name}: {error}")
+            self._client.transport.close()
+
+    def connection_lost(self, exc: Optional[Exception]):
+        if self._sender_task:
+            self._sender_task.cancel()
+        if self._client:
+            self._backend._handle_connection_lost(self._client, exc)
+            # A sender waiting for the buffer to drain must not hang.
+            self._client.can_write.set()
+            self._client = None
+
+    def pause_writing(self):
+        if self._client:
+            self._client.can_write.clear()
+
+    def resume_writing(self):
+        if self._client:
+            self._client.can_write.set()
+
+    def _handle_frame(self, msg_bytes: memoryview):
+        if self._client:
+            self._backend._handle_frame(self._client, msg_bytes)
@@ -0,0 +1,159 @@
+from abc import ABC, abstractmethod
+import json
+import re
+from typing import Any, Literal, Optional
+
+import msgpack
+from pydantic import BaseModel, Field
+
+from eventbus.event import Event, EventHeader, EventHeaderModel, get_event_data_type_names, get_event_type_adapter, to_event
+
+CodecName = Literal['json', 'msgpack']
+
+# 'game' clients answer RPC requests and get every event; 'observer' clients (tooling, overlays, recorders)
+# only get event types they subscribed to and never get RPC requests unless subscribed explicitly.
+ClientRole = Literal['game', 'observer']
+
+
+class HandshakeRequest(BaseModel):
+    type: Literal['handshake_request']
+
+    # Codecs supported by the client, most preferred first.
+    codecs: list[str] = Field(default=['json'])
+
+    client_name: Optional[str] = Field(default=None)
+    role: ClientRole = Field(default='game')
+
+    # Event types (fnmatch patterns allowed) an observer gets, both from the server and from the game.
+    subscribe: list[str] = Field(default=[])
+
+
+class HandshakeResponse(BaseModel):
+    type: Literal['handshake_response']
+    codec: CodecName
+
+
+class AbstractEventCodec(ABC):
+    @property
+    @abstractmethod
+    def name(self) -> CodecName:
+        pass
+
+    @abstractmethod
+    def encode(self, event: Event) -> bytes:
+        pass
+
+    # Takes a memoryview straight from the frame parser as well, it must not be kept after return.
+    @abstractmethod
+    def decode(self, data: bytes | memoryview) -> Event:
+        pass
+
+    # Two-phase decoding: the header is enough to decide whether anybody needs the event at all,
+    # and the returned payload (decoded text or unpacked dict) is passed to decode_payload() for the full event.
+    @abstractmethod
+    def decode_header(self, data: bytes | memoryview) -> tuple[EventHeader, Any]:
+        pass
+
+    @abstractmethod
+    def decode_payload(self, event_type: str, payload: Any) -> Event:
+        pass
+
+
+class JsonEventCodec(AbstractEventCodec):
+    def __init__(self, encoding: str) -> None:
+        self._encoding = encoding
+
+    @property
+    def name(self) -> CodecName:
+        return 'json'
+
+    def encode(self, event: Event) -> bytes:
+        return event.model_dump_json().encode(encoding=self._encoding)
+
+    def decode(self, data: bytes | memoryview) -> Event:
+        return Event.model_validate_json(str(data, encoding=self._encoding), strict=True)
+
+    def decode_header(self, data: bytes | memoryview) -> tuple[EventHeader, Any]:
+        text = str(data, encoding=self._encoding)
+        return (_peek_json_event_header(text), text)
+
+    def decode_payload(self, event_type: str, payload: Any) -> Event:
+        return to_event(get_event_type_adapter(event_type).validate_json(payload, strict=True))
+
+
+class MsgpackEventCodec(AbstractEventCodec):
+    @property
+    def name(self) -> CodecName:
+        return 'msgpack'
+
+    def encode(self, event: Event) -> bytes:
+        return msgpack.packb(event.model_dump(mode='json'))  # type: ignore
+
+    def decode(self, data: bytes | memoryview) -> Event:
+        # Not strict: msgpack has a single array type, and strict python-mode validation
+        # would refuse lists for tuple fields (JSON-mode validation accepts them).
+        return Event.model_validate(msgpack.unpackb(data))
+
+    def decode_header(self, data: bytes | memoryview) -> tuple[EventHeader, Any]:
+        d = msgpack.unpackb(data)
+        try:
+            header = EventHeader(d['data']['type'], d.get('event_id', -1), d.get('response_to_event_id', None))
+        except (AttributeError, KeyError, TypeError):
+            # Malformed frame, let validation explain what exactly is wrong.
+            header = EventHeaderModel.model_validate(d).to_header()
+        return (header, d)
+
+    def decode_payload(self, event_type: str, payload: Any) -> Event:
+        return to_event(get_event_type_adapter(event_type).validate_python(payload))
+
+
+_JSON_TYPE_RE = re.compile(r'"type"\s*:\s*"([a-z0-9_]+)"')
+_JSON_EVENT_ID_RE = re.compile(r'"event_id"\s*:\s*(-?\d+)')
+_JSON_RESPONSE_TO_EVENT_ID_RE = re.compile(r'"response_to_event_id"\s*:\s*(\d+)')
+
+
+# Finds data.type and the ids with a regex scan instead of parsing the whole JSON. Key order is not fixed
+# (the mod's encoder uses table order) and nested data has "type" keys as well (e.g. actor refs), so the first
+# "type" with a known event type value wins. Quotes inside strings are escaped and never match.
+def _peek_json_event_header(text: str) -> EventHeader:
+    event_type: Optional[str] = None
+    for match in _JSON_TYPE_RE.finditer(text):
+        if match.group(1) in get_event_data_type_names():
+            event_type = match.group(1)
+            break
+
+    if event_type is None:
+        return EventHeaderModel.model_validate_json(text).to_header()
+
+    event_id_match = _JSON_EVENT_ID_RE.search(text)
+    response_to_event_id_match = _JSON_RESPONSE_TO_EVENT_ID_RE.search(text)
+    return EventHeader(
+        event_type,
+        int(event_id_match.group(1)) if event_id_match else -1,
+        int(response_to_event_id_match.group(1)) if response_to_event_id_match else None
+    )
+
+
+def create_event_codec(name: CodecName, encoding: str) -> AbstractEventCodec:
+    if name == 'json':
+        return JsonEventCodec(encoding)
+    elif name == 'msgpack':
+        return MsgpackEventCodec()
+    else:
+        raise Exception(f"Unknown event codec '{name}'")
+
+
+def try_parse_handshake_request(data: bytes | memoryview, encoding: str) -> HandshakeRequest | None:
+    # Handshake is always sent as JSON before any event, and unlike events it has "type" at the top level.
+    if data[0:1] != b'{':
+        return None
+
+    try:
+        d: Any = json.loads(str(data, encoding=encoding))
+    except Exception:
+        return None
+
+    if not isinstance(d, dict) or d.get('type') != 'handshake_request':  # type: ignore
+        return None
+
+    return HandshakeRequest.model_validate(d)
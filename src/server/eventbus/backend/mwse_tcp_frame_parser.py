@@ -0,0 +1,47 @@
+import struct
+from typing import Callable
+
+_HEADER = struct.Struct('>I')
+
+
+# Splits a TCP byte stream into length-prefixed frames (big-endian uint32 size, then the body).
+# Data is accumulated in a single reusable buffer and every complete frame is handed to `on_frame`
+# as a memoryview into that buffer, so no per-frame bytes object is allocated.
+# The view is only valid during the callback: it is released right after, copy it to keep it.
+class MwseTcpFrameParser:
+    HEADER_SIZE = _HEADER.size
+
+    def __init__(self, on_frame: Callable[[memoryview], None], max_frame_size: int) -> None:
+        self._on_frame = on_frame
+        self._max_frame_size = max_frame_size
+        self._buf = bytearray()
+
+    @property
+    def buffered_bytes(self) -> int:
+        return len(self._buf)
+
+    def feed(self, data: bytes):
+        buf = self._buf
+        buf += data
+
+        offset = 0
+        buf_size = len(buf)
+        try:
+            with memoryview(buf) as view:
+                while buf_size - offset >= MwseTcpFrameParser.HEADER_SIZE:
+                    frame_size: int = _HEADER.unpack_from(view, offset)[0]
+                    if frame_size > self._max_frame_size:
+                        raise Exception(f"Frame of {frame_size} bytes is above the limit of {self._max_frame_size} bytes")
+
+                    frame_start = offset + MwseTcpFrameParser.HEADER_SIZE
+                    frame_end = frame_start + frame_size
+                    if frame_end > buf_size:
+                        break
+
+                    with view[frame_start:frame_end] as frame:
+                        self._on_frame(frame)
+                    offset = frame_end
+        finally:
+            # Parsed frames are cut off only when no view into the buffer is alive, bytearray can't resize otherwise.
+            if offset > 0:
+                del buf[:offset]
@@ -0,0 +1,80 @@
+import atexit
+import gzip
+import time
+from typing import IO, Iterator, Literal
+
+from pydantic import BaseModel
+
+from eventbus.event import Event
+from util.logger import Logger
+
+logger = Logger(__name__)
+
+FrameDirection = Literal['in', 'out']
+
+
+class RecordedFrame(BaseModel):
+    # Seconds since the recording started.
+    t: float
+
+    # 'in' is from game to server, 'out' is from server to game.
+    dir: FrameDirection
+    peer: str
+    event: Event
+
+
+# Writes every decoded frame as a JSON line, independently of the codec negotiated with the client.
+# Paths ending with '.gz' are gzip-compressed.
+class MwseTcpRecorder:
+    FLUSH_INTERVAL_SEC = 1.0
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._file = self._open(path, 'w')
+        self._started_at = time.monotonic()
+        self._last_flush_at = self._started_at
+
+        # Without close() a gzip recording has no end-of-stream trailer, so close it on exit at the latest.
+        atexit.register(self.close)
+
+        logger.info(f"Recording MWSE event stream to {path}")
+
+    def record(self, direction: FrameDirection, peer: str, event: Event):
+        now = time.monotonic()
+        frame = RecordedFrame(t=round(now - self._started_at, 6), dir=direction, peer=peer, event=event)
+        self._file.write(frame.model_dump_json())
+        self._file.write('\n')
+
+        if now - self._last_flush_at >= MwseTcpRecorder.FLUSH_INTERVAL_SEC:
+            self._file.flush()
+            self._last_flush_at = now
+
+    def close(self):
+        if self._file.closed:
+            return
+
+        self._file.close()
+        atexit.unregister(self.close)
+        logger.info(f"Recording of MWSE event stream saved to {self._path}")
+
+    # A recording which was not closed, e.g. after a crash, is read up to its last complete frame.
+    @staticmethod
+    def read(path: str) -> Iterator[RecordedFrame]:
+        with MwseTcpRecorder._open(path, 'r') as f:
+            try:
+                for line in f:
+                    if not line.endswith('\n'):
+                        logger.warning(f"Recording {path} ends with an incomplete frame, skipping it")
+                        return
+
+                    line = line.strip()
+                    if len(line) > 0:
+                        yield RecordedFrame.model_validate_json(line)
+            except EOFError:
+                logger.warning(f"Recording {path} was not closed, read up to its last complete frame")
+
+    @staticmethod
+    def _open(path: str, mode: Literal['r', 'w']) -> IO[str]:
+        if path.endswith('.gz'):
+            return gzip.open(path, f"{mode}t", encoding='utf-8')  # type: ignore
+        return open(path, mode, encoding='utf-8')
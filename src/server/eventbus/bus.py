@@ -1,14 +1,17 @@
 import asyncio
 from util.logger import Logger
 import traceback
-from typing import Any, Callable, Coroutine, List, Literal
+from typing import Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from eventbus.backend.abstract import AbstractEventBusBackend
 from eventbus.backend.mwse_tcp import MwseTcpEventBusBackend
 from eventbus.event import Event
-from eventbus.event_consumer import EventConsumer
+from eventbus.event_decode_stats import EventDecodeStats
+from eventbus.event_shards import EventShardingRule, EventShards, EventShardStats
+from eventbus.event_consumer import EventConsumer, EventHandler
 from eventbus.event_producer import EventProducer
+from eventbus.priority_event_queue import EventCoalesceRule, EventPriorityClass, EventQueueStats, PriorityEventQueue
 
 logger = Logger(__name__)
 
@@ -25,16 +28,33 @@ class EventBus(EventProducer, EventConsumer):
         queue_max_size: int
         queue_overflow: Literal['drop_newest', 'drop_oldest']
 
+        # Ordered from the highest priority to the lowest. Events of types not listed in any class
+        # go to the 'default' class which uses queue_max_size and queue_overflow above.
+        priority_classes: list[EventPriorityClass] = Field(default=[])
+
+        # Event types which only matter in their latest version: a newer event replaces a queued one with the same key.
+        coalesce: list[EventCoalesceRule] = Field(default=[])
+
+        # When above 0, events from the game matching shard_keys are handled in order per routing key,
+        # each key always on the same one of `shards` workers. Other events are handled by `consumers` as before.
+        shards: int = Field(default=0)
+        shard_keys: list[EventShardingRule] = Field(default=[])
+
     def __init__(self, config: Config):
         self._config = config
 
         self._next_event_id = 1
 
         self._backend = self._create_backend()
-        self._handlers: List[Callable[[Event], Coroutine[Any, Any, None]]] = []
+        self._handler_registrations: list[tuple[EventHandler, Optional[set[str]]]] = []
+        self._event_type_to_handlers: dict[str, list[EventHandler]] = {}
 
-        self._events_to_produce_to_game: asyncio.Queue[Event] = asyncio.Queue(maxsize=config.queue_max_size)
-        self._events_consumed_from_game: asyncio.Queue[Event] = asyncio.Queue(maxsize=config.queue_max_size)
+        self._events_to_produce_to_game = PriorityEventQueue(
+            "outgoing", config.priority_classes, config.queue_max_size, config.queue_overflow, config.coalesce)
+        self._events_consumed_from_game = PriorityEventQueue(
+            "incoming", config.priority_classes, config.queue_max_size, config.queue_overflow, config.coalesce)
+        self._shards = EventShards(config.shards, config.shard_keys, self._events_consumed_from_game.get_priority_class,
+                                   self._handle_consumed_event)
 
     def start(self):
         for _ in range(0, self._config.producers):
@@ -43,25 +63,44 @@ class EventBus(EventProducer, EventConsumer):
         for _ in range(0, self._config.consumers):
             asyncio.get_event_loop().create_task(self._consumer())
 
-        self._backend.start(self._handle_event_from_game)
+        self._shards.start()
+
+        # Events from the game which no handler subscribed to are not decoded beyond the type.
+        self._backend.start(self._handle_event_from_game, lambda event_type: len(self._get_handlers(event_type)) > 0)
 
     def is_connected_to_game(self):
         return self._backend.is_connected_to_game()
 
+    def get_queues_stats(self) -> list[EventQueueStats]:
+        return self._events_consumed_from_game.get_stats() + self._events_to_produce_to_game.get_stats()
+
+    def get_shards_stats(self) -> list[EventShardStats]:
+        return self._shards.get_stats()
+
+    def get_decode_stats(self) -> list[EventDecodeStats]:
+        return self._backend.get_decode_stats()
+
     def _create_backend(self) -> AbstractEventBusBackend:
         return MwseTcpEventBusBackend(self._config.system.mwse_tcp)
 
     async def _consumer(self):
         while True:
             event = await self._events_consumed_from_game.get()
+
+            # Routed right after get() without awaiting, so events keep the queue order within a shard.
+            if self._shards.put_nowait(event):
+                continue
+
             Logger.set_ctx(f"consumer_event:{event.event_id}")
+            await self._handle_consumed_event(event)
 
-            for h in self._handlers:
-                try:
-                    await h(event)
-                except Exception as error:
-                    logger.error(f"Consumer handler failed: event={event} error={error}")
-                    logger.debug(traceback.format_exc())
+    async def _handle_consumed_event(self, event: Event):
+        for h in self._get_handlers(event.data.type):
+            try:
+                await h(event)
+            except Exception as error:
+                logger.error(f"Consumer handler failed: event={event} error={error}")
+                logger.debug(traceback.format_exc())
 
     async def _producer(self):
         while True:
@@ -70,7 +109,8 @@ class EventBus(EventProducer, EventConsumer):
 
             self._backend.publish_event_to_game(event)
 
-            for h in self._handlers:
+            # Outgoing events reach only handlers interested in server-originated types.
+            for h in self._get_handlers(event.data.type):
                 try:
                     await h(event)
                 except Exception as error:
@@ -79,36 +119,26 @@ class EventBus(EventProducer, EventConsumer):
 
     def _handle_event_from_game(self, event: Event):
         logger.debug(f"> from game: {event}")
-        try:
-            self._events_consumed_from_game.put_nowait(event)
-        except asyncio.QueueFull:
-            self._handle_queue_full(self._events_consumed_from_game, event, direction="incoming")
-
-    def register_handler(self, handler: Callable[[Event], Coroutine[Any, Any, None]]):
-        self._handlers.append(handler)
+        self._events_consumed_from_game.put_nowait(event)
+
+    def register_handler(self, handler: EventHandler, types: Optional[list[str]] = None):
+        self._handler_registrations.append((handler, set(types) if types is not None else None))
+        self._event_type_to_handlers.clear()
+
+    def _get_handlers(self, event_type: str) -> list[EventHandler]:
+        handlers = self._event_type_to_handlers.get(event_type, None)
+        if handlers is None:
+            # Keeps registration order across typed and untyped handlers.
+            handlers = [
+                handler for (handler, types) in self._handler_registrations
+                if types is None or event_type in types
+            ]
+            self._event_type_to_handlers[event_type] = handlers
+        return handlers
 
     def produce_event(self, event: Event):
         event.event_id = self._next_event_id
         self._next_event_id = self._next_event_id + 1
 
         logger.debug(f"> to game: {event}")
-        try:
-            self._events_to_produce_to_game.put_nowait(event)
-        except asyncio.QueueFull:
-            self._handle_queue_full(self._events_to_produce_to_game, event, direction="outgoing")
-
-    def _handle_queue_full(self, queue: asyncio.Queue[Event], event: Event, direction: str):
-        if self._config.queue_overflow == 'drop_oldest':
-            try:
-                queue.get_nowait()
-            except asyncio.QueueEmpty:
-                logger.warning(f"{direction} event queue was full but now empty, dropping event={event}")
-                return
-            try:
-                queue.put_nowait(event)
-            except asyncio.QueueFull:
-                logger.warning(f"{direction} event queue is still full, dropping event={event}")
-            else:
-                logger.warning(f"{direction} event queue full, dropped oldest to enqueue event={event}")
-        else:
-            logger.warning(f"{direction} event queue is full, dropping event={event}")
+        self._events_to_produce_to_game.put_nowait(event)
@@ -1,5 +1,5 @@
-from typing import Optional, Union
-from pydantic import BaseModel, Field
+from typing import Any, Optional, Union, get_args
+from pydantic import BaseModel, Field, TypeAdapter, create_model
 
 from eventbus.event_data.event_data_from_game import EventDataFromGameUnion
 from eventbus.event_data.event_data_from_server import EventDataFromServerUnion
@@ -15,3 +15,71 @@ class Event(BaseModel):
         EventDataFromServerUnion,
         EventDataRpcUnion
     ] = Field(discriminator='type')
+
+
+def get_event_data_types(event_data_union: Any) -> list[str]:
+    return list(map(lambda data_cls: get_args(data_cls.model_fields['type'].annotation)[0], get_args(event_data_union)))
+
+
+# Just enough of an event to route it, see AbstractEventCodec.decode_header().
+class EventHeader:
+    def __init__(self, type: str, event_id: int, response_to_event_id: Optional[int]) -> None:
+        self.type = type
+        self.event_id = event_id
+        self.response_to_event_id = response_to_event_id
+
+
+# Validating this model skips everything in data except the type, nested values are never turned into models.
+class EventHeaderModel(BaseModel):
+    class Data(BaseModel):
+        type: str
+
+    event_id: int = Field(default=-1)
+    response_to_event_id: Optional[int] = Field(default=None)
+    data: Data
+
+    def to_header(self) -> EventHeader:
+        return EventHeader(self.data.type, self.event_id, self.response_to_event_id)
+
+
+_event_type_to_data_cls: dict[str, type[BaseModel]] = {
+    get_args(data_cls.model_fields['type'].annotation)[0]: data_cls
+    for event_data_union in [EventDataFromGameUnion, EventDataFromServerUnion, EventDataRpcUnion]
+    for data_cls in get_args(event_data_union)
+}
+_event_type_names = set(_event_type_to_data_cls.keys())
+
+_event_type_to_adapter: dict[str, TypeAdapter[Any]] = {}
+
+
+def get_event_data_type_names() -> set[str]:
+    return _event_type_names
+
+
+# Validates an event with the given data type only, skipping the discriminated union of Event.data.
+# Adapters are built on first use and cached.
+def get_event_type_adapter(event_type: str) -> TypeAdapter[Any]:
+    adapter = _event_type_to_adapter.get(event_type, None)
+    if adapter is None:
+        data_cls = _event_type_to_data_cls.get(event_type, None)
+        if data_cls is None:
+            raise Exception(f"Unknown event type '{event_type}'")
+
+        typed_event_cls = create_model(
+            f"Event_{data_cls.__name__}",
+            event_id=(int, Field(default=-1)),
+            response_to_event_id=(Optional[int], Field(default=None)),
+            data=(data_cls, ...)
+        )
+        adapter = TypeAdapter(typed_event_cls)
+        _event_type_to_adapter[event_type] = adapter
+    return adapter
+
+
+def to_event(typed_event: Any) -> Event:
+    # Data is validated already, it is only checked to be an instance of the right class here.
+    return Event(
+        event_id=typed_event.event_id,
+        response_to_event_id=typed_event.response_to_event_id,
+        data=typed_event.data
+    )
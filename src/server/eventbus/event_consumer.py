@@ -1,13 +1,16 @@
 from abc import ABC, abstractmethod
 from util.logger import Logger
-from typing import Any, Callable, Coroutine
+from typing import Any, Callable, Coroutine, Optional
 
 from eventbus.event import Event
 
 logger = Logger(__name__)
 
+EventHandler = Callable[[Event], Coroutine[Any, Any, None]]
+
 
 class EventConsumer(ABC):
+    # Handler is called only for events with data.type in types, or for every event if types is None.
     @abstractmethod
-    def register_handler(self, handler: Callable[[Event], Coroutine[Any, Any, None]]):
+    def register_handler(self, handler: EventHandler, types: Optional[list[str]] = None):
         pass
@@ -1,5 +1,5 @@
 from typing import Literal, Optional, Union
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from eventbus.data.actor_ref import ActorRef
 from eventbus.data.cell import Cell
@@ -142,6 +142,32 @@ class EventDataFromGame:
         type: Literal['combat_stopped']
         actor: Optional[ActorRef] = None
 
+    # Pushed by the game only when some of the fields changed, unchanged fields are omitted.
+    # Fields which became nil are listed in `cleared`, as nil values are dropped by the JSON encoder.
+    class PlayerStateDelta(BaseModel):
+        type: Literal['player_state_delta']
+        health_normalized: Optional[float] = None
+        position: Optional[Position] = None
+        cell: Optional[IdWithName] = None
+        in_dialog: Optional[bool] = None
+        weapon_drawn: Optional[bool] = None
+        weapon: Optional[IdWithName] = None
+        gold: Optional[int] = None
+        cleared: list[str] = Field(default=[])
+
+    class EnvStateDelta(BaseModel):
+        type: Literal['env_state_delta']
+        sunrise_hour: Optional[int] = None
+        current_weather: Optional[str] = None
+        current_year: Optional[int] = None
+        current_hour: Optional[float] = None
+        secunda_phase: Optional[int] = None
+        current_month: Optional[int] = None
+        sunset_hour: Optional[int] = None
+        masser_phase: Optional[int] = None
+        current_day: Optional[int] = None
+        cleared: list[str] = Field(default=[])
+
     # NB: Do not forget to add data to the discriminated union to Event.data.
 
 
@@ -169,4 +195,6 @@ EventDataFromGameUnion = Union[
     EventDataFromGame.GameLoaded,
     EventDataFromGame.CombatStarted,
     EventDataFromGame.CombatStopped,
+    EventDataFromGame.PlayerStateDelta,
+    EventDataFromGame.EnvStateDelta,
 ]
@@ -34,6 +34,15 @@ class EventDataRpc:
         type: Literal['get_npc_response']
         npc_data: NpcData
 
+    #
+    class GetNpcsRequest(BaseModel):
+        type: Literal['get_npcs_request']
+        npc_ref_ids: list[str]
+
+    class GetNpcsResponse(BaseModel):
+        type: Literal['get_npcs_response']
+        npcs_data: list[NpcData]
+
     #
     class GetActorsNearbyRequest(BaseModel):
         type: Literal['get_actors_nearby_request']
@@ -99,6 +108,9 @@ EventDataRpcUnion = Union[
     EventDataRpc.GetNpcRequest,
     EventDataRpc.GetNpcResponse,
 
+    EventDataRpc.GetNpcsRequest,
+    EventDataRpc.GetNpcsResponse,
+
     EventDataRpc.GetActorsNearbyRequest,
     EventDataRpc.GetActorsNearbyResponse,
 
@@ -0,0 +1,58 @@
+from pydantic import BaseModel
+
+
+class EventDecodeStats(BaseModel):
+    type: str
+
+    # Fully validated events, and events dropped after the header because nobody handles their type.
+    decoded: int
+    skipped: int
+
+    mean_decode_us: float
+    max_decode_us: float
+    mean_skip_us: float
+
+
+class _TypeDecodeTimings:
+    def __init__(self) -> None:
+        self.decoded = 0
+        self.skipped = 0
+        self.decode_sec = 0.0
+        self.max_decode_sec = 0.0
+        self.skip_sec = 0.0
+
+
+class EventDecodeTimings:
+    def __init__(self) -> None:
+        self._event_type_to_timings: dict[str, _TypeDecodeTimings] = {}
+
+    def add_decoded(self, event_type: str, duration_sec: float):
+        timings = self._get(event_type)
+        timings.decoded = timings.decoded + 1
+        timings.decode_sec = timings.decode_sec + duration_sec
+        timings.max_decode_sec = max(timings.max_decode_sec, duration_sec)
+
+    def add_skipped(self, event_type: str, duration_sec: float):
+        timings = self._get(event_type)
+        timings.skipped = timings.skipped + 1
+        timings.skip_sec = timings.skip_sec + duration_sec
+
+    def get_stats(self) -> list[EventDecodeStats]:
+        return [
+            EventDecodeStats(
+                type=event_type,
+                decoded=t.decoded,
+                skipped=t.skipped,
+                mean_decode_us=t.decode_sec / t.decoded * 1e6 if t.decoded > 0 else 0.0,
+                max_decode_us=t.max_decode_sec * 1e6,
+                mean_skip_us=t.skip_sec / t.skipped * 1e6 if t.skipped > 0 else 0.0
+            )
+            for (event_type, t) in sorted(self._event_type_to_timings.items())
+        ]
+
+    def _get(self, event_type: str) -> _TypeDecodeTimings:
+        timings = self._event_type_to_timings.get(event_type, None)
+        if timings is None:
+            timings = _TypeDecodeTimings()
+            self._event_type_to_timings[event_type] = timings
+        return timings
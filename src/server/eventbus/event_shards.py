@@ -0,0 +1,164 @@
+import asyncio
+import time
+import zlib
+from collections import deque
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Coroutine, Optional
+
+from pydantic import BaseModel, Field
+
+from eventbus.event import Event
+from eventbus.priority_event_queue import EventPriorityClass
+from util.logger import Logger
+
+logger = Logger(__name__)
+
+
+# Events of matching types (fnmatch patterns allowed) are routed by the values of key_fields.
+# Dotted paths reach into nested data, e.g. 'actor.ref_id' for npc_death or 'npc_ref.ref_id' for dialog_update.
+# The key does not include the type, so different events about the same actor share a shard and stay in order.
+class EventShardingRule(BaseModel):
+    types: list[str]
+    key_fields: list[str] = Field(default=[])
+
+
+class EventShardStats(BaseModel):
+    shard: int
+    depth: int
+    processed: int
+
+    # Events dropped because the shard held queue_max_size events of their priority class.
+    dropped: int
+
+    # Age of the oldest event still waiting in the shard, 0 when it is empty.
+    lag_ms: float
+
+    # Time from routing to the start of handling, over all processed events.
+    mean_wait_ms: float
+    max_wait_ms: float
+
+
+class _Shard:
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.events: deque[tuple[Event, float, str]] = deque()
+        self.priority_class_to_depth: dict[str, int] = {}
+        self.has_events = asyncio.Event()
+        self.processed = 0
+        self.dropped = 0
+        self.wait_sec = 0.0
+        self.max_wait_sec = 0.0
+
+
+# Runs events with the same routing key one after another on a single worker, and different keys in parallel.
+# Routed events leave the incoming queue right away, so each shard bounds them the same way as the queue does:
+# up to queue_max_size events of a priority class, overflow handled with the class's queue_overflow.
+class EventShards:
+    def __init__(self, shards: int, rules: list[EventShardingRule],
+                 get_priority_class: Callable[[str], EventPriorityClass],
+                 handle: Callable[[Event], Coroutine[Any, Any, None]]) -> None:
+        self._rules = rules
+        self._get_priority_class = get_priority_class
+        self._handle = handle
+        self._shards = [_Shard(i) for i in range(0, shards)]
+        self._event_type_to_key_fields: dict[str, Optional[list[list[str]]]] = {}
+
+    def start(self):
+        for shard in self._shards:
+            asyncio.get_event_loop().create_task(self._worker(shard))
+
+    # Returns False when the event has no routing key and should be handled as usual.
+    def put_nowait(self, event: Event) -> bool:
+        key = self.get_key(event)
+        if key is None:
+            return False
+
+        shard = self._shards[self.get_shard_index(key)]
+        priority_class = self._get_priority_class(event.data.type)
+
+        # Same as for the queue, non-positive size means unbounded.
+        depth = shard.priority_class_to_depth.get(priority_class.name, 0)
+        if priority_class.queue_max_size > 0 and depth >= priority_class.queue_max_size:
+            shard.dropped = shard.dropped + 1
+            if priority_class.queue_overflow == 'drop_newest':
+                logger.warning(f"Shard {shard.index} '{priority_class.name}' is full, dropping event={event}")
+                return True
+
+            self._drop_oldest(shard, priority_class.name)
+            logger.warning(f"Shard {shard.index} '{priority_class.name}' full, dropped oldest to enqueue event={event}")
+
+        shard.events.append((event, time.monotonic(), priority_class.name))
+        shard.priority_class_to_depth[priority_class.name] = shard.priority_class_to_depth.get(priority_class.name, 0) + 1
+        shard.has_events.set()
+        return True
+
+    def get_key(self, event: Event) -> Optional[tuple]:
+        if len(self._shards) == 0:
+            return None
+
+        key_fields = self._get_key_fields(event.data.type)
+        if key_fields is None:
+            return None
+
+        return tuple(map(lambda path: self._get_field(event.data, path), key_fields))
+
+    # Stable across runs (unlike hash() of str), so the same actor lands on the same shard in every session.
+    def get_shard_index(self, key: tuple) -> int:
+        return zlib.crc32('\x00'.join(key).encode(encoding='utf-8')) % len(self._shards)
+
+    def get_stats(self) -> list[EventShardStats]:
+        now = time.monotonic()
+        return list(map(lambda shard: EventShardStats(
+            shard=shard.index,
+            depth=len(shard.events),
+            processed=shard.processed,
+            dropped=shard.dropped,
+            lag_ms=(now - shard.events[0][1]) * 1000 if len(shard.events) > 0 else 0.0,
+            mean_wait_ms=shard.wait_sec / shard.processed * 1000 if shard.processed > 0 else 0.0,
+            max_wait_ms=shard.max_wait_sec * 1000
+        ), self._shards))
+
+    def _drop_oldest(self, shard: _Shard, priority_class_name: str):
+        for (i, (_, _, name)) in enumerate(shard.events):
+            if name == priority_class_name:
+                del shard.events[i]
+                shard.priority_class_to_depth[name] = shard.priority_class_to_depth[name] - 1
+                return
+
+    def _get_key_fields(self, event_type: str) -> Optional[list[list[str]]]:
+        if event_type not in self._event_type_to_key_fields:
+            key_fields: Optional[list[list[str]]] = None
+            for rule in self._rules:
+                if any(map(lambda pattern: fnmatchcase(event_type, pattern), rule.types)):
+                    key_fields = list(map(lambda field: field.split('.'), rule.key_fields))
+                    break
+            self._event_type_to_key_fields[event_type] = key_fields
+        return self._event_type_to_key_fields[event_type]
+
+    def _get_field(self, data: Any, path: list[str]) -> str:
+        for name in path:
+            data = getattr(data, name, None)
+            if data is None:
+                break
+        # Values may be unhashable, their string form is good enough for a key.
+        return str(data)
+
+    async def _worker(self, shard: _Shard):
+        while True:
+            await shard.has_events.wait()
+
+            (event, routed_at, priority_class_name) = shard.events.popleft()
+            shard.priority_class_to_depth[priority_class_name] = shard.priority_class_to_depth[priority_class_name] - 1
+            if len(shard.events) == 0:
+                shard.has_events.clear()
+
+            wait_sec = time.monotonic() - routed_at
+            shard.processed = shard.processed + 1
+            shard.wait_sec = shard.wait_sec + wait_sec
+            shard.max_wait_sec = max(shard.max_wait_sec, wait_sec)
+
+            Logger.set_ctx(f"shard:{shard.index}_event:{event.event_id}")
+            try:
+                await self._handle(event)
+            except Exception as error:
+                logger.error(f"Shard {shard.index} failed to handle event={event} error={error}")
@@ -0,0 +1,173 @@
+import asyncio
+from collections import deque
+from fnmatch import fnmatchcase
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from eventbus.event import Event
+from util.logger import Logger
+
+logger = Logger(__name__)
+
+QueueOverflow = Literal['drop_newest', 'drop_oldest']
+
+
+class EventPriorityClass(BaseModel):
+    name: str
+
+    # Event types (fnmatch patterns allowed, e.g. '*_response') which belong to this class.
+    types: list[str] = Field(default=[])
+
+    queue_max_size: int
+    queue_overflow: QueueOverflow
+
+
+# Events of this type replace a queued event of the same type with equal values of key_fields,
+# e.g. key_fields=[] coalesces by type only, key_fields=['npc_ref_id'] by (type, npc_ref_id).
+class EventCoalesceRule(BaseModel):
+    type: str
+    key_fields: list[str] = Field(default=[])
+
+
+class EventQueueStats(BaseModel):
+    direction: str
+    priority_class: str
+    depth: int
+    max_size: int
+    dropped: int
+    coalesced: int
+
+
+class _Slot:
+    def __init__(self, event: Event, coalesce_key: Optional[tuple]) -> None:
+        self.event = event
+        self.coalesce_key = coalesce_key
+
+
+class _Lane:
+    def __init__(self, priority_class: EventPriorityClass) -> None:
+        self.priority_class = priority_class
+        self.slots: deque[_Slot] = deque()
+        self.dropped = 0
+        self.coalesced = 0
+
+
+# Bounded event queue split into priority lanes: get() always takes from the highest non-empty lane,
+# overflow is handled per lane with the lane's own policy.
+class PriorityEventQueue:
+    DEFAULT_CLASS_NAME = 'default'
+
+    def __init__(
+        self,
+        direction: str,
+        priority_classes: list[EventPriorityClass],
+        default_max_size: int,
+        default_overflow: QueueOverflow,
+        coalesce_rules: list[EventCoalesceRule] = []
+    ) -> None:
+        self._direction = direction
+        self._event_type_to_coalesce_key_fields = {rule.type: rule.key_fields for rule in coalesce_rules}
+
+        # Still queued events which may be replaced by a newer one with the same key.
+        self._coalesce_key_to_slot: dict[tuple, _Slot] = {}
+
+        # Events not matching any class go to the 'default' one. It is the lowest lane unless configured explicitly.
+        if not any(map(lambda c: c.name == PriorityEventQueue.DEFAULT_CLASS_NAME, priority_classes)):
+            priority_classes = priority_classes + [EventPriorityClass(
+                name=PriorityEventQueue.DEFAULT_CLASS_NAME,
+                queue_max_size=default_max_size,
+                queue_overflow=default_overflow
+            )]
+
+        self._lanes = list(map(_Lane, priority_classes))
+        self._default_lane = next(filter(lambda l: l.priority_class.name == PriorityEventQueue.DEFAULT_CLASS_NAME, self._lanes))
+        self._event_type_to_lane: dict[str, _Lane] = {}
+
+        # Counts events stored in all lanes, so any number of consumers can wait on it.
+        self._available = asyncio.Semaphore(0)
+
+    def put_nowait(self, event: Event):
+        lane = self._get_lane(event.data.type)
+
+        coalesce_key = self._get_coalesce_key(event)
+        if coalesce_key is not None:
+            queued_slot = self._coalesce_key_to_slot.get(coalesce_key, None)
+            if queued_slot is not None:
+                # Newer event takes the place of the stale one, so it is never serialized nor delivered.
+                logger.debug(f"{self._direction} event queue coalesced event={queued_slot.event} into event={event}")
+                queued_slot.event = event
+                lane.coalesced = lane.coalesced + 1
+                return
+
+        slot = _Slot(event, coalesce_key)
+
+        # Same as for asyncio.Queue, non-positive size means unbounded.
+        max_size = lane.priority_class.queue_max_size
+        if max_size <= 0 or len(lane.slots) < max_size:
+            self._append_slot(lane, slot)
+            self._available.release()
+            return
+
+        lane.dropped = lane.dropped + 1
+        if lane.priority_class.queue_overflow == 'drop_oldest' and len(lane.slots) > 0:
+            self._forget_slot(lane.slots.popleft())
+            self._append_slot(lane, slot)
+            logger.warning(f"{self._direction} event queue '{lane.priority_class.name}' full, dropped oldest to enqueue event={event}")
+        else:
+            logger.warning(f"{self._direction} event queue '{lane.priority_class.name}' is full, dropping event={event}")
+
+    async def get(self) -> Event:
+        await self._available.acquire()
+
+        for lane in self._lanes:
+            if len(lane.slots) > 0:
+                slot = lane.slots.popleft()
+                self._forget_slot(slot)
+                return slot.event
+
+        raise Exception(f"{self._direction} event queue is signaled but all lanes are empty")
+
+    def get_priority_class(self, event_type: str) -> EventPriorityClass:
+        return self._get_lane(event_type).priority_class
+
+    def qsize(self) -> int:
+        return sum(map(lambda l: len(l.slots), self._lanes))
+
+    def get_stats(self) -> list[EventQueueStats]:
+        return list(map(lambda lane: EventQueueStats(
+            direction=self._direction,
+            priority_class=lane.priority_class.name,
+            depth=len(lane.slots),
+            max_size=lane.priority_class.queue_max_size,
+            dropped=lane.dropped,
+            coalesced=lane.coalesced
+        ), self._lanes))
+
+    def _get_coalesce_key(self, event: Event) -> Optional[tuple]:
+        key_fields = self._event_type_to_coalesce_key_fields.get(event.data.type, None)
+        if key_fields is None:
+            return None
+
+        # Field values may be unhashable (e.g. lists), their string form is good enough for a key.
+        return (event.data.type, *map(lambda field: str(getattr(event.data, field, None)), key_fields))
+
+    def _append_slot(self, lane: _Lane, slot: _Slot):
+        lane.slots.append(slot)
+        if slot.coalesce_key is not None:
+            self._coalesce_key_to_slot[slot.coalesce_key] = slot
+
+    def _forget_slot(self, slot: _Slot):
+        if slot.coalesce_key is not None and self._coalesce_key_to_slot.get(slot.coalesce_key, None) is slot:
+            del self._coalesce_key_to_slot[slot.coalesce_key]
+
+    def _get_lane(self, event_type: str) -> _Lane:
+        lane: Optional[_Lane] = self._event_type_to_lane.get(event_type, None)
+        if lane is None:
+            lane = self._default_lane
+            for l in self._lanes:
+                if any(map(lambda pattern: fnmatchcase(event_type, pattern), l.priority_class.types)):
+                    lane = l
+                    break
+            self._event_type_to_lane[event_type] = lane
+        return lane
@@ -2,11 +2,12 @@ import asyncio
 from eventbus.data.player_data_fast import PlayerDataFast
 from util.logger import Logger
 import time
+from typing import NoReturn
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from eventbus.bus import EventBus
-from eventbus.event import Event
-from eventbus.event_data.event_data_rpc import EventDataRpc
+from eventbus.event import Event, get_event_data_types
+from eventbus.event_data.event_data_rpc import EventDataRpc, EventDataRpcUnion
 from eventbus.data.env_data import EnvData
 from eventbus.data.npc_data import NpcData
 from eventbus.data.player_data import PlayerData
@@ -17,13 +18,22 @@ class Rpc:
     class Config(BaseModel):
         max_wait_time_sec: float
 
+        # Responses to requests of these types (e.g. 'get_actors_nearby_request') are reused
+        # for identical requests during the given number of seconds.
+        cache_ttl_sec: dict[str, float] = Field(default={})
+
     def __init__(self, config: Config, event_bus: EventBus) -> None:
         self._config = config
         self._event_bus = event_bus
-        self._event_bus.register_handler(self._handle_event)
+        self._event_bus.register_handler(
+            self._handle_event,
+            list(filter(lambda t: t.endswith('_response'), get_event_data_types(EventDataRpcUnion)))
+        )
+
+        self._request_event_id_to_response_future: dict[int, asyncio.Future[Event]] = {}
 
-        self._waiting_response_for_event_ids: set[int] = set()
-        self._request_event_id_to_response_event: dict[int, Event] = {}
+        self._request_key_to_shared_call: dict[str, asyncio.Task[Event]] = {}
+        self._request_key_to_cached_response: dict[str, tuple[float, Event]] = {}
 
     async def get_npc_data(self, npc_ref_id: str) -> NpcData:
         request = Event(data=EventDataRpc.GetNpcRequest(
@@ -36,71 +46,123 @@ class Rpc:
             self._raise_unknown_response_exception(request, response)
         return response.data.npc_data
 
+    async def get_npcs_data(self, npc_ref_ids: list[str]) -> list[NpcData]:
+        request = Event(data=EventDataRpc.GetNpcsRequest(
+            type='get_npcs_request',
+            npc_ref_ids=npc_ref_ids
+        ))
+
+        response = await self._call(request)
+        if response.data.type != 'get_npcs_response':
+            self._raise_unknown_response_exception(request, response)
+        return response.data.npcs_data
+
     async def get_local_player(self) -> PlayerData:
         request = Event(data=EventDataRpc.GetLocalPlayerRequest(type='get_local_player_request'))
-        response = await self._call(request)
+        response = await self._call_shared(request)
         if response.data.type != 'get_local_player_response':
             self._raise_unknown_response_exception(request, response)
         return response.data.player_data
 
     async def get_local_player_fast(self) -> PlayerDataFast:
         request = Event(data=EventDataRpc.GetLocalPlayerFastRequest(type='get_local_player_fast_request'))
-        response = await self._call(request)
+        response = await self._call_shared(request)
         if response.data.type != 'get_local_player_fast_response':
             self._raise_unknown_response_exception(request, response)
         return response.data.player_data_fast
 
     async def get_env(self) -> EnvData:
         request = Event(data=EventDataRpc.GetEnvRequest(type='get_env_request'))
-        response = await self._call(request)
+        response = await self._call_shared(request)
         if response.data.type != 'get_env_response':
             self._raise_unknown_response_exception(request, response)
         return response.data.env_data
 
     async def get_actors_nearby(self, data: EventDataRpc.GetActorsNearbyRequest) -> EventDataRpc.GetActorsNearbyResponse:
         request = Event(data=data)
-        response = await self._call(request)
+        response = await self._call_shared(request)
         if response.data.type != 'get_actors_nearby_response':
             self._raise_unknown_response_exception(request, response)
         return response.data
 
+    # Identical requests (by payload) issued while one is in flight share its round trip and its parsed response,
+    # so callers must not mutate it. NPC data is not shared: NpcService keeps and updates what it receives.
+    async def _call_shared(self, request_event: Event) -> Event:
+        key = request_event.data.model_dump_json()
+
+        cached = self._request_key_to_cached_response.get(key, None)
+        if cached is not None:
+            (expire_at, cached_response_event) = cached
+            if time.monotonic() < expire_at:
+                logger.debug(f"RPC call served from cache: {key}")
+                return cached_response_event
+            del self._request_key_to_cached_response[key]
+
+        shared_call = self._request_key_to_shared_call.get(key, None)
+        if shared_call is None:
+            shared_call = asyncio.get_running_loop().create_task(self._call(request_event))
+            self._request_key_to_shared_call[key] = shared_call
+            shared_call.add_done_callback(lambda call: self._handle_shared_call_done(key, request_event, call))
+        else:
+            logger.debug(f"RPC call joined the one in flight: {key}")
+
+        # Cancellation of one caller must not cancel the call for the others.
+        return await asyncio.shield(shared_call)
+
+    def _handle_shared_call_done(self, key: str, request_event: Event, call: asyncio.Task[Event]):
+        self._request_key_to_shared_call.pop(key, None)
+        if call.cancelled() or call.exception() is not None:
+            return
+
+        ttl_sec = self._config.cache_ttl_sec.get(request_event.data.type, 0)
+        if ttl_sec > 0:
+            cached = (time.monotonic() + ttl_sec, call.result())
+            self._request_key_to_cached_response[key] = cached
+            # Keys include request fields like actor_ref_id, an expired response is dropped even if never asked for again.
+            asyncio.get_running_loop().call_later(ttl_sec, self._evict_cached_response, key, cached)
+
+    def _evict_cached_response(self, key: str, cached: tuple[float, Event]):
+        if self._request_key_to_cached_response.get(key, None) is cached:
+            del self._request_key_to_cached_response[key]
+
     async def _call(self, request_event: Event) -> Event:
         # event_id is set only after this call.
         self._event_bus.produce_event(request_event)
 
-        self._waiting_response_for_event_ids.add(request_event.event_id)
-        logger.debug(f"RPC call added id={request_event.event_id} total={len(self._waiting_response_for_event_ids)}")
+        # Nothing is awaited between producing the request and registering the future,
+        # so the response cannot be handled before the future exists.
+        response_future: asyncio.Future[Event] = asyncio.get_running_loop().create_future()
+        self._request_event_id_to_response_future[request_event.event_id] = response_future
+        logger.debug(f"RPC call added id={request_event.event_id} total={len(self._request_event_id_to_response_future)}")
 
         t0 = time.time()
-        while True:
-            if (time.time() - t0) > self._config.max_wait_time_sec:
-                self._raise_timeout_exception(request_event)
-
-            if request_event.event_id not in self._request_event_id_to_response_event:
-                await asyncio.sleep(1.0 / 20.0)
-                continue
+        try:
+            response_event = await asyncio.wait_for(response_future, timeout=self._config.max_wait_time_sec)
+        except asyncio.TimeoutError:
+            self._raise_timeout_exception(request_event)
+        finally:
+            self._request_event_id_to_response_future.pop(request_event.event_id, None)
 
-            response_event = self._request_event_id_to_response_event.pop(request_event.event_id)
-            logger.debug(f"RPC call resolved id={request_event.event_id} in {time.time() - t0} sec")
-
-            return response_event
+        logger.debug(f"RPC call resolved id={request_event.event_id} in {time.time() - t0} sec")
+        return response_event
 
     async def _handle_event(self, event: Event):
         if event.response_to_event_id is None:
             return
 
-        if event.response_to_event_id in self._waiting_response_for_event_ids:
-            self._waiting_response_for_event_ids.remove(event.response_to_event_id)
-            self._request_event_id_to_response_event[event.response_to_event_id] = event
-
-            logger.debug(f"Received response event for id={event.response_to_event_id}")
-        else:
+        response_future = self._request_event_id_to_response_future.pop(event.response_to_event_id, None)
+        if response_future is None:
             logger.error(f"Received unexpected response event: {event}")
+        elif response_future.done():
+            logger.warning(f"Received response event for the call which is already finished: {event}")
+        else:
+            response_future.set_result(event)
+            logger.debug(f"Received response event for id={event.response_to_event_id}")
 
     def _raise_unknown_response_exception(self, request: Event, response: Event):
         logger.error(f"Received unexpected response: request={request} response={response}")
         raise Exception("Received unexpected response")
 
-    def _raise_timeout_exception(self, request: Event):
+    def _raise_timeout_exception(self, request: Event) -> NoReturn:
         logger.error(f"RPC call timeout: request={request}")
         raise Exception(f"RPC call timeout")
@@ -27,7 +27,8 @@ class StoryItemData:
         type: Literal['player_trigger_dialog_topic']
         speaker: ActorRef
         target: ActorRef
-        original_text: str
+        # None when the player's line is already in the story as say_processed.
+        original_text: Optional[str] = None
         trigger_topic: str
         # topic_text: str
 
@@ -42,7 +43,7 @@ class StoryItemData:
         type: Literal['player_trigger_list_dialog_topics']
         speaker: ActorRef
         target: ActorRef
-        original_text: str
+        original_text: Optional[str] = None
 
     class ChangeDisposition(BaseModel):
         type: Literal['change_disposition']
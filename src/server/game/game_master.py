@@ -7,8 +7,12 @@ from eventbus.event_data.event_data_from_server import EventDataFromServer
 from eventbus.event_producer import EventProducer
 from game.service.npc_services.npc_intention_analyzer import NpcIntentionAnalyzer
 from game.service.npc_services.npc_speaker_service import NpcSpeakerService
+from game.service.npc_services.npc_speech_stream import NpcSpeechStream
 from game.service.player_services.player_personal_story_service import PlayerPersonalStoryService
+from game.service.player_services.player_speech_speculator import PlayerSpeechSpeculator
 from game.service.providers.cell_name_provider import CellNameProvider
+from game.service.scene.npc_turn_pipeline import NpcTurn, NpcTurnPipeline
+from game.service.scene.story_scheduler import StoryScheduler
 from game.service.util.text_sanitizer import TextSanitizer
 from util.colored_lines import green
 from util.logger import Logger
@@ -34,6 +38,13 @@ from util.now_ms import now_ms
 logger = Logger(__name__)
 
 class GameMaster:
+    _FLOW_CHANGING_PLAYER_ITEM_TYPES = [
+        'player_trigger_dialog_topic',
+        'player_trigger_list_dialog_topics',
+        'player_tells_to_shut_up',
+        'player_tells_to_stop_combat'
+    ]
+
     def __init__(
         self,
         config: AppConfig,
@@ -80,15 +91,30 @@ class GameMaster:
         self._player_was_going_to_act_last_time = False
         self._last_shut_up_command_ms = 0
 
+        # Player lines which are still being analyzed and are not in the story yet.
+        self._pending_player_lines = 0
+
+        # With player_intention.parallel, lines whose intention interrupted NPCs already reacting to them.
+        self._parallel_intention_lines = 0
+        self._parallel_intention_rollbacks = 0
+
+        # The story step in progress, a rolled back player line cancels it.
+        self._story_step_task: Optional[asyncio.Task[None]] = None
+
         self._listener_k = keyboard.Listener(
             on_press=self._handle_press,  # type: ignore
             on_release=self._handle_release)  # type: ignore
         self._pause_story_loop = False
         self._listener_k.start()
 
-        event_consumer.register_handler(self._handler)
+        event_consumer.register_handler(self._handler, ['npc_death', 'ashfall_eat_stew', 'barter_offer', 'cell_changed', 'stt_recognition_update'])
 
-        asyncio.get_event_loop().create_task(self._progress_story_loop())
+        self._npc_turn_pipeline = NpcTurnPipeline(config.npc_turn_pipeline, self._prepare_next_npc_turn)
+        self._player_speech_speculator = PlayerSpeechSpeculator(config.speculative_stt, self._analyze_player_intention)
+
+        self._story_scheduler = StoryScheduler(config.story_scheduler, self._can_progress_story, self._determine_npc_to_act_and_act)
+        self._npc_speaker_service.add_scene_unlock_listener(self._on_scene_unlocked)
+        self._story_scheduler.start()
 
     def start(self):
         self._player_story_service.publish_player_story()
@@ -105,20 +131,26 @@ class GameMaster:
     def _handle_release(self, key):  # type: ignore
         pass
 
-    async def _progress_story_loop(self):
-        while True:
-            await asyncio.sleep(1.0)
+    def _can_progress_story(self):
+        if self._npc_speaker_service.is_scene_locked():
+            return False
 
-            if self._npc_speaker_service.is_scene_locked():
-                continue
+        if (now_ms() - self._last_shut_up_command_ms) < 5:
+            return False
 
-            if (now_ms() - self._last_shut_up_command_ms) < 5:
-                continue
+        if self._pause_story_loop:
+            return False
 
-            if self._pause_story_loop:
-                continue
+        # The story item for the line wakes the scheduler once it is added.
+        if self._pending_player_lines > 0:
+            return False
 
-            await self._determine_npc_to_act_and_act()
+        return True
+
+    def _on_scene_unlocked(self):
+        # The story step unlocks the scene itself when it is the player's turn, that is not a reason to run again.
+        if not self._story_scheduler.is_running:
+            self._story_scheduler.wake('scene_unlocked')
 
     async def _handler(self, event: Event):
         if event.data.type == 'npc_death':
@@ -179,14 +211,73 @@ class GameMaster:
             hearable_npcs = await self._get_npcs_who_can_hear_player(None)
             hearable_actors = list(map(lambda n: n.actor_ref, hearable_npcs))
             await self._npc_speaker_service.npcs_shut_up(lambda a: a not in hearable_actors)
+        elif event.data.type == 'stt_recognition_update':
+            if len(event.data.text) > 0:
+                self._npc_turn_pipeline.invalidate('player_speaks')
+                self._player_speech_speculator.on_partial_text(self._text_sanitizer.sanitize(event.data.text))
 
     async def _on_local_player_speak(self, text: str):
-        item_data_list_from_player = await self._determine_story_item_data_from_player_saying(text)
+        self._npc_turn_pipeline.invalidate('player_says')
 
-        await self._register_and_process_new_incoming_story_item_data_list(
-            place="player_says",
-            item_data_list=item_data_list_from_player
-        )
+        if self._config.player_intention.parallel:
+            await self._on_local_player_speak_with_parallel_intention(text)
+            return
+
+        self._pending_player_lines = self._pending_player_lines + 1
+        try:
+            item_data_list_from_player = await self._determine_story_item_data_from_player_saying(text)
+
+            await self._register_and_process_new_incoming_story_item_data_list(
+                place="player_says",
+                item_data_list=item_data_list_from_player
+            )
+        finally:
+            self._pending_player_lines = self._pending_player_lines - 1
+            self._story_scheduler.wake('player_says')
+
+    # The player's line goes to the story right away, so NPCs start reacting while the intention is being analyzed.
+    # An intention which changes the flow (topic, shut up, stop combat) interrupts NPCs and its story items follow.
+    async def _on_local_player_speak_with_parallel_intention(self, text_raw: str):
+        target_ref = self._get_player_target()
+        text = self._text_sanitizer.sanitize(text_raw)
+        intention_task = asyncio.get_event_loop().create_task(self._get_player_intention(text))
+
+        say_item_data_list: list[StoryItemDataAlias] = [self._create_player_say_item_data(text, target_ref)]
+        points_at_ref = self._create_player_points_at_ref_item_data()
+        if points_at_ref:
+            say_item_data_list.append(points_at_ref)
+
+        self._pending_player_lines = self._pending_player_lines + 1
+        try:
+            await self._register_and_process_new_incoming_story_item_data_list(
+                place="player_says",
+                item_data_list=say_item_data_list
+            )
+        finally:
+            self._pending_player_lines = self._pending_player_lines - 1
+            self._story_scheduler.wake('player_says')
+
+        player_intention = await intention_task
+        item_data_list_from_player = await self._determine_story_item_data_from_player_intention(
+            text, target_ref, player_intention, is_say_committed=True)
+
+        self._parallel_intention_lines = self._parallel_intention_lines + 1
+        if any(map(lambda d: d.type in GameMaster._FLOW_CHANGING_PLAYER_ITEM_TYPES, item_data_list_from_player)):
+            self._parallel_intention_rollbacks = self._parallel_intention_rollbacks + 1
+            logger.info(f"Player intention {player_intention} interrupts NPCs, "
+                        f"rolled back {self._parallel_intention_rollbacks}/{self._parallel_intention_lines} lines")
+
+            # Whatever NPCs were going to say is a reaction to the plain line. The response still being generated
+            # is cancelled, so the intention's items don't wait for it. Shut up and stop combat silence NPCs already.
+            self._cancel_story_step()
+            if not player_intention.npc_shut_up and not player_intention.npc_stop_combat:
+                await self._npc_speaker_service.npcs_shut_up(lambda a: True)
+
+        if len(item_data_list_from_player) > 0:
+            await self._register_and_process_new_incoming_story_item_data_list(
+                place="player_intention",
+                item_data_list=item_data_list_from_player
+            )
 
     def _get_player_target(self):
         if self._dialog_provider.is_in_dialog and self._dialog_provider.npc_ref:
@@ -213,49 +304,51 @@ class GameMaster:
                 hearing_npcs,
                 item_data_list
             )
+            self._story_scheduler.wake('story_item')
         finally:
             self._publish_lock.release()
 
+    # The step runs as its own task, so _cancel_story_step() can stop it without stopping the story scheduler.
     async def _determine_npc_to_act_and_act(self):
+        step = asyncio.get_event_loop().create_task(self._run_story_step())
+        self._story_step_task = step
         try:
-            await self._publish_lock.acquire()
-            scene_lock_generation_id = self._npc_speaker_service.lock_scene()
-
-            target = self._get_player_target()
-            hearing_npcs = await self._get_npcs_who_can_hear_player(target)
-            actor_pick_response = await self._npc_behavior_service.decide_who_should_act(self._player_provider.local_player, target, hearing_npcs)
+            await asyncio.wait([step])
+        except asyncio.CancelledError:
+            step.cancel()
+            raise
+        finally:
+            if self._story_step_task is step:
+                self._story_step_task = None
 
-            if not self._npc_speaker_service.is_scene_locked_at(scene_lock_generation_id):
-                logger.debug("Cancel determining NPC to act, scene lock was retired (1)")
-                return
+    def _cancel_story_step(self):
+        if self._story_step_task and not self._story_step_task.done():
+            logger.info("Cancelling the story step in progress")
+            self._story_step_task.cancel()
 
-            actor_to_act = actor_pick_response.actor_to_act
+    async def _run_story_step(self):
+        await self._publish_lock.acquire()
+        scene_lock_generation_id: Optional[int] = None
+        try:
+            scene_lock_generation_id = self._npc_speaker_service.lock_scene()
 
-            if len(actor_pick_response.reason) > 0:
-                self._player_story_service.add_items_to_personal_story([
-                    StoryItemData.ActorPickReason(
-                        type='actor_pick_reason',
-                        actor=actor_to_act,
-                        reason=actor_pick_response.reason if actor_pick_response.pass_reason_to_npc else ""
-                    )
-                ])
-
-            all_actors: list[ActorRef] = [
-                self._player_provider.local_player.actor_ref
-            ]
-            for npc in hearing_npcs:
-                all_actors.append(npc.actor_ref)
-            all_actors.remove(actor_to_act)
-
-            # self._npc_speaker_service.turn_to_actor(all_actors, actor_to_act)
-            for actor in all_actors:
-                asyncio.get_event_loop().call_later(
-                    random.uniform(0.0, 2.0),
-                    self._npc_speaker_service.turn_to_actor,
-                    [actor], actor_to_act
-                )
+            turn = await self._npc_turn_pipeline.take()
+            if turn is not None:
+                if not self._npc_speaker_service.is_scene_locked_at(scene_lock_generation_id):
+                    logger.debug("Cancel prepared NPC turn, scene lock was retired")
+                    return
+
+                self._apply_actor_pick(turn)
+                if turn.npc:
+                    self._npc_speaker_service.set_scene_holder(scene_lock_generation_id, turn.npc.actor_ref)
+                    if turn.behavior_response:
+                        self._npc_behavior_service.mark_processed(turn.npc, turn.behavior_response)
+            else:
+                turn = await self._prepare_npc_turn(scene_lock_generation_id)
+                if turn is None:
+                    return
 
-            if actor_to_act.type == 'player':
+            if turn.actor_pick_response.actor_to_act.type == 'player':
                 if not self._player_was_going_to_act_last_time:
                     logger.info(f"Player is going to act this time")
                     self._player_was_going_to_act_last_time = True
@@ -264,37 +357,26 @@ class GameMaster:
                     self._npc_speaker_service.unlock_scene()
                 return
 
-            npc_to_act = await self._npc_service.get_npc(actor_to_act.ref_id)
-            self._player_was_going_to_act_last_time = False
-
-            if not self._npc_speaker_service.is_scene_locked_at(scene_lock_generation_id):
-                logger.debug("Cancel determining NPC to act, scene lock was retired (2)")
+            if turn.npc is None:
                 return
 
-            scene_hold = self._npc_speaker_service.set_scene_holder(scene_lock_generation_id, npc_to_act.actor_ref)
-            if not scene_hold:
-                logger.info(f"NPC {npc_to_act.actor_ref} was about to act but scene lock was taken over")
-
-            logger.info(f"NPC {npc_to_act.actor_ref} is going to act")
-            other_hearing_npcs = hearing_npcs.copy()
-            other_hearing_npcs.remove(npc_to_act)
-
-            request = NpcBehaviorService.Request(
-                npc=npc_to_act,
-                other_hearing_npcs=other_hearing_npcs,
-                is_in_dialog=self._dialog_provider.is_in_dialog,
-                known_topics=self._dialog_provider.topics,
-                reasoning=actor_pick_response.reason,
-                player_ref_looked_at=self._player_speak_listener.player_last_ref_looked_at
-            )
-            response = await self._npc_behavior_service.decide_how_npc_should_act(request)
+            self._player_was_going_to_act_last_time = False
 
-            if not self._npc_speaker_service.is_scene_locked_by(npc_to_act.actor_ref):
+            if not self._npc_speaker_service.is_scene_locked_by(turn.npc.actor_ref):
                 logger.info(
-                    f"Cancelling NPC {npc_to_act.actor_ref} response because no more holding the scene lock")
+                    f"Cancelling NPC {turn.npc.actor_ref} response because no more holding the scene lock")
                 return
 
-            await self._handle_npc_behavior_process_response(request, response)
+            await self._handle_npc_behavior_process_response(turn)
+
+            # The next turn is prepared while this line is playing.
+            if self._npc_speaker_service.is_scene_locked_by(turn.npc.actor_ref):
+                self._npc_turn_pipeline.start()
+        except asyncio.CancelledError:
+            logger.info("Story step was cancelled")
+            if scene_lock_generation_id is not None and self._npc_speaker_service.is_scene_locked_at(scene_lock_generation_id):
+                self._npc_speaker_service.unlock_scene()
+            raise
         except Exception as error:
             logger.error(f"Error happened while scene was locked: {error}")
             logger.debug(traceback.format_exc())
@@ -304,6 +386,135 @@ class GameMaster:
         finally:
             self._publish_lock.release()
 
+    # Without scene_lock_generation_id the turn is prepared ahead of time: nothing is changed in the scene
+    # nor in the NPC's state, and the NPC lines are converted to audio right away.
+    async def _prepare_npc_turn(self, scene_lock_generation_id: Optional[int]) -> Optional[NpcTurn]:
+        is_ahead_of_time = scene_lock_generation_id is None
+
+        target = self._get_player_target()
+        hearing_npcs = await self._get_npcs_who_can_hear_player(target)
+        actor_pick_response = await self._npc_behavior_service.decide_who_should_act(self._player_provider.local_player, target, hearing_npcs)
+        turn = NpcTurn(hearing_npcs, actor_pick_response)
+
+        if scene_lock_generation_id is not None:
+            if not self._npc_speaker_service.is_scene_locked_at(scene_lock_generation_id):
+                logger.debug("Cancel determining NPC to act, scene lock was retired (1)")
+                return None
+
+            self._apply_actor_pick(turn)
+
+        actor_to_act = actor_pick_response.actor_to_act
+        if actor_to_act.type == 'player':
+            return turn
+
+        npc_to_act = await self._npc_service.get_npc(actor_to_act.ref_id)
+        turn.npc = npc_to_act
+
+        if scene_lock_generation_id is not None:
+            if not self._npc_speaker_service.is_scene_locked_at(scene_lock_generation_id):
+                logger.debug("Cancel determining NPC to act, scene lock was retired (2)")
+                return None
+
+            scene_hold = self._npc_speaker_service.set_scene_holder(scene_lock_generation_id, npc_to_act.actor_ref)
+            if not scene_hold:
+                logger.info(f"NPC {npc_to_act.actor_ref} was about to act but scene lock was taken over")
+
+            logger.info(f"NPC {npc_to_act.actor_ref} is going to act")
+        else:
+            logger.debug(f"NPC {npc_to_act.actor_ref} is going to act next, preparing the turn")
+
+        other_hearing_npcs = hearing_npcs.copy()
+        other_hearing_npcs.remove(npc_to_act)
+
+        request = NpcBehaviorService.Request(
+            npc=npc_to_act,
+            other_hearing_npcs=other_hearing_npcs,
+            is_in_dialog=self._dialog_provider.is_in_dialog,
+            known_topics=self._dialog_provider.topics,
+            reasoning=actor_pick_response.reason,
+            player_ref_looked_at=self._player_speak_listener.player_last_ref_looked_at
+        )
+
+        # The line is said while it is generated, a line prepared ahead of time is converted to audio as a whole below.
+        speech_stream: Optional[NpcSpeechStream] = None
+        if not is_ahead_of_time and self._config.npc_speech_stream.enabled:
+            speech_stream = NpcSpeechStream(self._config.npc_speech_stream, npc_to_act, self._npc_speaker_service,
+                                            self._npc_intention_analyzer.get_speech_text)
+        try:
+            response = await self._npc_behavior_service.decide_how_npc_should_act(
+                request,
+                mark_processed=not is_ahead_of_time,
+                on_text_delta=speech_stream.add_text if speech_stream else None
+            )
+        except BaseException:
+            if speech_stream:
+                speech_stream.cancel()
+            raise
+        turn.behavior_request = request
+        turn.behavior_response = response
+
+        if speech_stream:
+            speech_stream.finish()
+            turn.speech_stream = speech_stream
+
+        if scene_lock_generation_id is not None and not self._npc_speaker_service.is_scene_locked_by(npc_to_act.actor_ref):
+            logger.info(
+                f"Cancelling NPC {npc_to_act.actor_ref} response because no more holding the scene lock")
+            if speech_stream:
+                speech_stream.cancel()
+            return None
+
+        if not response.is_behavior_updated or len(response.item_data_list) == 0:
+            return turn
+
+        all_hearing_npcs = other_hearing_npcs.copy()
+        all_hearing_npcs.append(npc_to_act)
+
+        for data in response.item_data_list:
+            processed_data_list = await self._npc_intention_analyzer.process_story_item_data(all_hearing_npcs, data)
+            turn.item_data_list.extend(processed_data_list)
+
+        if is_ahead_of_time:
+            for (i, d) in enumerate(turn.item_data_list):
+                text = self._get_npc_line_text(npc_to_act, d)
+                if text is not None:
+                    voiceover = await self._npc_speaker_service.prepare_voiceover(npc_to_act, text)
+                    if voiceover is not None:
+                        turn.voiceovers[i] = voiceover
+
+        return turn
+
+    async def _prepare_next_npc_turn(self):
+        return await self._prepare_npc_turn(None)
+
+    def _apply_actor_pick(self, turn: NpcTurn):
+        actor_pick_response = turn.actor_pick_response
+        actor_to_act = actor_pick_response.actor_to_act
+
+        if len(actor_pick_response.reason) > 0:
+            self._player_story_service.add_items_to_personal_story([
+                StoryItemData.ActorPickReason(
+                    type='actor_pick_reason',
+                    actor=actor_to_act,
+                    reason=actor_pick_response.reason if actor_pick_response.pass_reason_to_npc else ""
+                )
+            ])
+
+        all_actors: list[ActorRef] = [
+            self._player_provider.local_player.actor_ref
+        ]
+        for npc in turn.hearing_npcs:
+            all_actors.append(npc.actor_ref)
+        all_actors.remove(actor_to_act)
+
+        # self._npc_speaker_service.turn_to_actor(all_actors, actor_to_act)
+        for actor in all_actors:
+            asyncio.get_event_loop().call_later(
+                random.uniform(0.0, 2.0),
+                self._npc_speaker_service.turn_to_actor,
+                [actor], actor_to_act
+            )
+
     async def _get_npcs_who_can_hear_player(self, target_ref: Optional[ActorRef]):
         hearing_npcs = await self._npc_service.get_npcs_who_can_hear_another_actor(self._player_provider.local_player.actor_ref)
 
@@ -314,13 +525,33 @@ class GameMaster:
 
         return hearing_npcs
 
-    async def _determine_story_item_data_from_player_saying(self, text_raw: str) -> list[StoryItemDataAlias]:
+    async def _analyze_player_intention(self, text: str):
         target_ref = self._get_player_target()
         known_topics = list(map(lambda topic: topic.topic_text, self._dialog_provider.topics))
+        return await self._player_intention_analyzer.analyze_player_intention(text, known_topics, target_ref)
+
+    async def _get_player_intention(self, text: str):
+        player_intention = await self._player_speech_speculator.take(text)
+        if player_intention is None:
+            player_intention = await self._analyze_player_intention(text)
+        return player_intention
+
+    async def _determine_story_item_data_from_player_saying(self, text_raw: str) -> list[StoryItemDataAlias]:
+        target_ref = self._get_player_target()
 
         text = self._text_sanitizer.sanitize(text_raw)
-        player_intention = await self._player_intention_analyzer.analyze_player_intention(text, known_topics, target_ref)
+        player_intention = await self._get_player_intention(text)
+
+        return await self._determine_story_item_data_from_player_intention(text, target_ref, player_intention, is_say_committed=False)
 
+    # With is_say_committed the player's line (and what the player points at) is already in the story.
+    async def _determine_story_item_data_from_player_intention(
+        self,
+        text: str,
+        target_ref: Optional[ActorRef],
+        player_intention: PlayerIntentionAnalyzer.Response,
+        is_say_committed: bool
+    ) -> list[StoryItemDataAlias]:
         item_data_list_from_player: list[StoryItemDataAlias] = []
 
         should_add_original_say_text = True
@@ -331,7 +562,7 @@ class GameMaster:
                         type='player_trigger_dialog_topic',
                         speaker=self._player_provider.local_player.actor_ref,
                         target=target_ref,
-                        original_text=text,
+                        original_text=None if is_say_committed else text,
                         trigger_topic=player_intention.trigger_dialog_topic
                     )
                 )
@@ -345,7 +576,7 @@ class GameMaster:
                         type='player_trigger_list_dialog_topics',
                         speaker=self._player_provider.local_player.actor_ref,
                         target=target_ref,
-                        original_text=text
+                        original_text=None if is_say_committed else text
                     )
                 )
                 should_add_original_say_text = False
@@ -404,39 +635,44 @@ class GameMaster:
                     )
                 )
 
-            if self._player_speak_listener.player_last_ref_looked_at:
-                ref = self._player_speak_listener.player_last_ref_looked_at
-                if (now_ms() - ref.last_update_ms) < 10000 and ref.name:
-                    item_data_list_from_player.append(
-                        StoryItemData.PlayerPointsAtRef(
-                            type='player_points_at_ref',
-                            speaker=self._player_provider.local_player.actor_ref,
-                            target_ref_id=ref.ref_id,
-                            target_name=ref.name,
-                            target_owner=ref.owner,
-                            target_position=ref.position
-                        )
-                    )
+            points_at_ref = self._create_player_points_at_ref_item_data()
+            if points_at_ref and not is_say_committed:
+                item_data_list_from_player.append(points_at_ref)
+
+        if should_add_original_say_text and not is_say_committed:
+            item_data_list_from_player.insert(0, self._create_player_say_item_data(text, target_ref))
+
+        return item_data_list_from_player
 
-        if should_add_original_say_text:
-            item_data_list_from_player.insert(
-                0,
-                StoryItemData.SayProcessed(
-                    type='say_processed',
+    def _create_player_say_item_data(self, text: str, target_ref: Optional[ActorRef]):
+        return StoryItemData.SayProcessed(
+            type='say_processed',
+            speaker=self._player_provider.local_player.actor_ref,
+            target=target_ref,
+            text=text,
+            audio_duration_sec=None
+        )
+
+    def _create_player_points_at_ref_item_data(self):
+        if self._player_speak_listener.player_last_ref_looked_at:
+            ref = self._player_speak_listener.player_last_ref_looked_at
+            if (now_ms() - ref.last_update_ms) < 10000 and ref.name:
+                return StoryItemData.PlayerPointsAtRef(
+                    type='player_points_at_ref',
                     speaker=self._player_provider.local_player.actor_ref,
-                    target=target_ref,
-                    text=text,
-                    audio_duration_sec=None
+                    target_ref_id=ref.ref_id,
+                    target_name=ref.name,
+                    target_owner=ref.owner,
+                    target_position=ref.position
                 )
-            )
+        return None
 
-        return item_data_list_from_player
+    async def _handle_npc_behavior_process_response(self, turn: NpcTurn):
+        npc = turn.npc
+        response = turn.behavior_response
+        if npc is None or response is None:
+            return
 
-    async def _handle_npc_behavior_process_response(
-        self,
-        request: NpcBehaviorService.Request,
-        response: NpcBehaviorService.Response
-    ):
         if not response.is_behavior_updated:
             logger.debug(f"Noop in NPC behavior response as behavior is not updated: {response}")
             return
@@ -446,15 +682,11 @@ class GameMaster:
 
         logger.debug(f"NPC behavior response is: {response}")
 
-        all_hearing_npcs = request.other_hearing_npcs.copy()
-        all_hearing_npcs.append(request.npc)
+        all_hearing_npcs = turn.behavior_request.other_hearing_npcs.copy() if turn.behavior_request else []
+        all_hearing_npcs.append(npc)
+        new_item_data_list = turn.item_data_list
 
-        new_item_data_list: list[StoryItemDataAlias] = []
-        for data in response.item_data_list:
-            processed_data_list = await self._npc_intention_analyzer.process_story_item_data(all_hearing_npcs, data)
-            new_item_data_list.extend(processed_data_list)
-
-        if not self._npc_speaker_service.is_scene_locked_by(request.npc.actor_ref):
+        if not self._npc_speaker_service.is_scene_locked_by(npc.actor_ref):
             logger.debug("Cancel handling NPC behavior because scene is unlocked (3)")
             return
 
@@ -465,19 +697,21 @@ class GameMaster:
                 new_item_data_list
             )
 
-        for d in new_item_data_list:
-            if d.type == 'say_processed' and d.speaker.type == 'npc':
-                if d.speaker == request.npc.actor_ref:
-                    audio_duration_sec = await self._npc_speaker_service.say(request.npc, d.text, d.target)
-                    d.audio_duration_sec = audio_duration_sec
+        for (i, d) in enumerate(new_item_data_list):
+            if (d.type == 'say_processed' and d.speaker.type == 'npc') or d.type == 'npc_trigger_dialog_topic':
+                if d.speaker == npc.actor_ref:
+                    text = self._get_npc_line_text(npc, d)
+                    if text is not None:
+                        # A streamed line is already being said in parts, its duration is known once the last part is said.
+                        if d.type == 'say_processed' and turn.speech_stream and await turn.speech_stream.wait_started():
+                            d.audio_duration_sec = await turn.speech_stream.wait_finished()
+                            continue
+
+                        audio_duration_sec = await self._npc_speaker_service.say(npc, text, d.target, turn.voiceovers.get(i, None))
+                        if d.type == 'say_processed':
+                            d.audio_duration_sec = audio_duration_sec
                 else:
-                    logger.error(f"Other NPC {d.speaker} wants to speak but request is for {request.npc.actor_ref}")
-            elif d.type == 'npc_trigger_dialog_topic':
-                if d.speaker == request.npc.actor_ref:
-                    text = self._text_sanitizer.sanitize(d.topic_response, npc_data=request.npc.npc_data)
-                    audio_duration_sec = await self._npc_speaker_service.say(request.npc, text, d.target)
-                else:
-                    logger.error(f"Other NPC {d.speaker} wants to speak but request is for {request.npc.actor_ref}")
+                    logger.error(f"Other NPC {d.speaker} wants to speak but request is for {npc.actor_ref}")
 
         if self._config.text_to_speech.sync_print_and_speak:
             await self._add_to_story_and_publish_events(
@@ -486,6 +720,13 @@ class GameMaster:
                 new_item_data_list
             )
 
+    def _get_npc_line_text(self, npc: Npc, d: StoryItemDataAlias) -> Optional[str]:
+        if d.type == 'say_processed' and d.speaker == npc.actor_ref:
+            return d.text
+        elif d.type == 'npc_trigger_dialog_topic' and d.speaker == npc.actor_ref:
+            return self._text_sanitizer.sanitize(d.topic_response, npc_data=npc.npc_data)
+        return None
+
     async def _add_to_story_and_publish_events(
         self,
         place: str,
@@ -508,6 +749,8 @@ class GameMaster:
         self._player_story_service.add_items_to_personal_story(item_data_list)
         self._npc_personal_story_service.add_items_to_personal_stories(npcs_to_add_to, item_data_list)
 
+        self._npc_turn_pipeline.invalidate('story_item')
+
     async def _publish_events(self, item_data_list: list[StoryItemDataAlias]):
         await self._event_producer_from_story.publish_events_from_items(
             item_data_list,
@@ -68,7 +68,7 @@ class GameSetup:
             player_data=player_data,
             personal_story=Story()
         )
-        player_provider = PlayerProvider(rpc, player)
+        player_provider = PlayerProvider(rpc, player, event_bus)
         logger.info(f"{SUCCESS} Got player data for '{player_data.name}'")
 
         database = Database(config.database, player.actor_ref.name)
@@ -76,7 +76,7 @@ class GameSetup:
         #
         logger.info(f"{WAITING} Requesting env for the first time...")
         env_data = await rpc.get_env()
-        env_provider = EnvProvider(env_data, rpc)
+        env_provider = EnvProvider(env_data, rpc, event_bus)
         logger.info(f"{SUCCESS} Got env data")
 
         #
@@ -94,7 +94,7 @@ class GameSetup:
 
         scene_instructions = SceneInstructions(config.scene_instructions)
         system_instructions_builder = NpcLlmSystemInstructionsBuilder(
-            player_provider, env_provider, dropped_items_provider,
+            config.npc_system_instructions, player_provider, env_provider, dropped_items_provider,
             cell_name_provider, i18n, scene_instructions)
         npc_llm_response_producer = NpcLlmResponseProducer(llm, env_provider, system_instructions_builder, i18n)
         pick_actor_service = NpcLlmPickActorService(config.npc_director, llm, env_provider, i18n, text_sanitizer,
@@ -103,12 +103,12 @@ class GameSetup:
         npc_behavior_service = NpcBehaviorService(
             config.npc_database.max_used_in_llm_story_items, env_provider, pick_actor_service, npc_llm_response_producer,
             dialog_provider)
-        npc_service = NpcService(event_bus, rpc, npc_database, env_provider, llm.create_session())
+        npc_service = NpcService(event_bus, rpc, npc_database, env_provider, llm)
         npc_speaker_service = NpcSpeakerService(config.npc_speaker, event_bus,
                                                 event_bus, player_provider, tts, npc_service)
         npc_personal_story_service = NpcPersonalStoryService(npc_database, env_provider, event_bus)
 
-        player_intention_analyzer = PlayerIntentionAnalyzer(llm)
+        player_intention_analyzer = PlayerIntentionAnalyzer(config.player_intention, llm)
         npc_intention_analyzer = NpcIntentionAnalyzer(
             player_provider, npc_service, text_sanitizer, dropped_items_provider,
             scene_instructions)
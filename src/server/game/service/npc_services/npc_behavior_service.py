@@ -4,7 +4,7 @@ from game.data.player_ref_looked_at import PlayerRefLookedAt
 from game.service.npc_services.npc_llm_pick_actor_service import NpcLlmPickActorService
 from game.service.providers.dialog_provider import DialogProvider
 from util.logger import Logger
-from typing import NamedTuple, Optional
+from typing import Callable, NamedTuple, Optional
 from eventbus.data.topic_data import TopicData
 from game.data.npc import Npc
 from game.data.story_item import StoryItem, StoryItemData, StoryItemDataAlias
@@ -28,6 +28,9 @@ class NpcBehaviorService:
         item_data_list: list[StoryItemDataAlias]
         is_behavior_updated: bool
 
+        # The newest story item the response is based on, once marked as processed the NPC won't react to it again.
+        last_processed_story_item_id: Optional[int] = None
+
     def __init__(self, max_used_in_llm_story_items: int, env_provider: EnvProvider,
                  pick_actor_service: NpcLlmPickActorService, npc_llm_response_producer: NpcLlmResponseProducer,
                  dialog_provider: DialogProvider) -> None:
@@ -82,10 +85,21 @@ class NpcBehaviorService:
         logger.debug(f"Pick response: {response}")
         return response
 
-    async def decide_how_npc_should_act(self, request: Request) -> Response:
-        return await self._process_reactive_behavior(request)
+    # With mark_processed=False the NPC's state is left untouched until mark_processed() is called,
+    # so the response can be thrown away, e.g. when it is generated ahead of time.
+    # on_text_delta gets the LLM response text as it is generated, see NpcLlmResponseProducer.
+    async def decide_how_npc_should_act(self, request: Request, mark_processed: bool = True,
+                                        on_text_delta: Optional[Callable[[str], None]] = None) -> Response:
+        response = await self._process_reactive_behavior(request, on_text_delta)
+        if mark_processed:
+            self.mark_processed(request.npc, response)
+        return response
+
+    def mark_processed(self, npc: Npc, response: Response):
+        if response.last_processed_story_item_id is not None:
+            npc.behavior.last_processed_story_item_id = response.last_processed_story_item_id
 
-    async def _process_reactive_behavior(self, request: Request) -> Response:
+    async def _process_reactive_behavior(self, request: Request, on_text_delta: Optional[Callable[[str], None]]) -> Response:
         npc = request.npc
 
         (processed, unprocessed) = self._split_items_by_being_processed_status(npc)
@@ -166,14 +180,12 @@ class NpcBehaviorService:
             reasoning=request.reasoning,
             player_ref_looked_at=request.player_ref_looked_at
         )
-        llm_response = await self._npc_llm_response_producer.produce_npc_response(llm_request)
-
-        if len(unprocessed) > 0:
-            npc.behavior.last_processed_story_item_id = unprocessed[-1].item_id
+        llm_response = await self._npc_llm_response_producer.produce_npc_response(llm_request, on_text_delta)
 
         return NpcBehaviorService.Response(
             item_data_list=llm_response.new_item_data_list,
-            is_behavior_updated=True
+            is_behavior_updated=True,
+            last_processed_story_item_id=unprocessed[-1].item_id if len(unprocessed) > 0 else None
         )
 
     def _split_items_by_being_processed_status(self, npc: Npc) -> tuple[list[StoryItem], list[StoryItem]]:
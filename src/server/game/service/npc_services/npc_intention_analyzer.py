@@ -1,4 +1,5 @@
 import random
+import re
 from typing import Optional
 
 from eventbus.data.actor_ref import ActorRef
@@ -137,6 +138,14 @@ class NpcIntentionAnalyzer:
 
         return result
 
+    # Text of a part of an NPC line as it is going to be said, e.g. while the rest of the line is still being generated.
+    # Triggers are only removed here, they are handled on the whole line by process_story_item_data().
+    def get_speech_text(self, text_raw: str) -> str:
+        text = self._clean_target_prefix(text_raw.strip())
+        text = re.sub(r'trigger_[a-z0-9_]+(\[\d+\])?', '', text, flags=re.IGNORECASE)
+        text = re.sub(r'\s{2,}', ' ', text).strip()
+        return self._text_sanitizer.sanitize(text)
+
     def _process_emotional_triggers(self, text: str):
         disposition_change = 0
         change_disposition_reasons: list[str] = []
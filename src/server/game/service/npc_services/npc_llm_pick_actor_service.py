@@ -1,4 +1,3 @@
-import asyncio
 import random
 from typing import Literal, NamedTuple, Optional
 
@@ -58,9 +57,6 @@ class NpcLlmPickActorService:
         self._i18n = i18n
         self._sanitizer = sanitizer
 
-        self._main_session = llm_system.create_session()
-        self._main_session_lock = asyncio.Lock()
-
         self._prev_reason: str = ''
         self._random_comment_last_ms = now_ms()
 
@@ -71,84 +67,80 @@ class NpcLlmPickActorService:
         if manual_response:
             return NpcLlmPickActorService.Response(manual_response.actor_to_act, manual_response.reason, manual_response.pass_reason_to_npc)
 
-        await self._main_session_lock.acquire()
-        try:
-            exclude_actors, total_said_after_player, last_said_story_item, sheogorath = self._gather_data_from_story_items(request)
-            sheogorath_level = sheogorath.sheogorath_level if sheogorath else None
+        exclude_actors, total_said_after_player, last_said_story_item, sheogorath = self._gather_data_from_story_items(request)
+        sheogorath_level = sheogorath.sheogorath_level if sheogorath else None
+
+        if self._config.force_sheogorath_level is not None:
+            sheogorath_level = self._config.force_sheogorath_level
+
+        if last_said_story_item:
+            last_say_initiator = NpcStoryItemHelper.get_initiator(last_said_story_item.data)
+            if last_say_initiator and last_say_initiator.type == 'player':
+                last_say_target = NpcStoryItemHelper.get_target(last_said_story_item.data)
+                if last_say_target:
+                    return NpcLlmPickActorService.Response(
+                        actor_to_act=last_say_target,
+                        reason="(target is derived from the story item data)",
+                        pass_reason_to_npc=False
+                    )
+
+        eligible_npcs: list[Npc] = []
+        for npc in request.hearing_npcs:
+            if npc.actor_ref in exclude_actors:
+                continue
+            if npc.npc_data.cell.id != request.player.player_data.cell.id:
+                continue
+
+            eligible_npcs.append(npc)
+
+        if len(eligible_npcs) == 0:
+            return NpcLlmPickActorService.Response(
+                actor_to_act=request.player.actor_ref,
+                reason="(no eligible npcs to speak)",
+                pass_reason_to_npc=False
+            )
+
+        if request.is_in_dialog:
+            return self._decide_in_dialog(request, exclude_actors, last_said_story_item)
 
-            if self._config.force_sheogorath_level is not None:
-                sheogorath_level = self._config.force_sheogorath_level
+        if sheogorath_level is None:
+            response = self._exec_strategy_random(request, eligible_npcs, total_said_after_player)
+
+            if response.actor_to_act.type == 'player':
+                silence_duration_ms: int
+                if last_said_story_item:
+                    silence_duration_ms = now_ms() - last_said_story_item.time.real_time_ms
+                else:
+                    silence_duration_ms = now_ms() - self._random_comment_last_ms
+
+                if silence_duration_ms > self._config.random_comment_delay_sec:
+                    if random.random() < self._config.random_comment_proba:
+                        self._random_comment_last_ms = now_ms()
+
+                        l: list[str] = [
+                            "прокомментируй как будто думая вслух текущую погоду и время",
+                            f"прокомментируй как будто думая вслух твое отношение к {request.player.actor_ref.name}",
+                            f"прокомментируй как будто думая вслух состояние {request.player.actor_ref.name}",
+                            "прокомментируй как будто думая вслух ваше текущее местоположение",
+                            "прокомментируй как будто думая вслух свою или чужую одежду",
+                            "сочини как будто думая вслух короткий стих про Морровинд",
+                            "прокомментируй как будто думая вслух красоту окружения вокруг (придумай детали если надо)",
+                            "прокомментируй как будто думая вслух последнее что произошло с тобой недавно",
+                        ]
+                        reason = random.choice(l)
+
+                        if random.random() < 0.03:
+                            reason = "сочини как будто думая вслух короткий матерных стих про Морровинд"
 
-            if last_said_story_item:
-                last_say_initiator = NpcStoryItemHelper.get_initiator(last_said_story_item.data)
-                if last_say_initiator and last_say_initiator.type == 'player':
-                    last_say_target = NpcStoryItemHelper.get_target(last_said_story_item.data)
-                    if last_say_target:
                         return NpcLlmPickActorService.Response(
-                            actor_to_act=last_say_target,
-                            reason="(target is derived from the story item data)",
-                            pass_reason_to_npc=False
+                            actor_to_act=random.choice(eligible_npcs).actor_ref,
+                            reason=reason,
+                            pass_reason_to_npc=True
                         )
 
-            eligible_npcs: list[Npc] = []
-            for npc in request.hearing_npcs:
-                if npc.actor_ref in exclude_actors:
-                    continue
-                if npc.npc_data.cell.id != request.player.player_data.cell.id:
-                    continue
+            return response
 
-                eligible_npcs.append(npc)
-
-            if len(eligible_npcs) == 0:
-                return NpcLlmPickActorService.Response(
-                    actor_to_act=request.player.actor_ref,
-                    reason="(no eligible npcs to speak)",
-                    pass_reason_to_npc=False
-                )
-
-            if request.is_in_dialog:
-                return self._decide_in_dialog(request, exclude_actors, last_said_story_item)
-
-            if sheogorath_level is None:
-                response = self._exec_strategy_random(request, eligible_npcs, total_said_after_player)
-
-                if response.actor_to_act.type == 'player':
-                    silence_duration_ms: int
-                    if last_said_story_item:
-                        silence_duration_ms = now_ms() - last_said_story_item.time.real_time_ms
-                    else:
-                        silence_duration_ms = now_ms() - self._random_comment_last_ms
-
-                    if silence_duration_ms > self._config.random_comment_delay_sec:
-                        if random.random() < self._config.random_comment_proba:
-                            self._random_comment_last_ms = now_ms()
-
-                            l: list[str] = [
-                                "прокомментируй как будто думая вслух текущую погоду и время",
-                                f"прокомментируй как будто думая вслух твое отношение к {request.player.actor_ref.name}",
-                                f"прокомментируй как будто думая вслух состояние {request.player.actor_ref.name}",
-                                "прокомментируй как будто думая вслух ваше текущее местоположение",
-                                "прокомментируй как будто думая вслух свою или чужую одежду",
-                                "сочини как будто думая вслух короткий стих про Морровинд",
-                                "прокомментируй как будто думая вслух красоту окружения вокруг (придумай детали если надо)",
-                                "прокомментируй как будто думая вслух последнее что произошло с тобой недавно",
-                            ]
-                            reason = random.choice(l)
-
-                            if random.random() < 0.03:
-                                reason = "сочини как будто думая вслух короткий матерных стих про Морровинд"
-
-                            return NpcLlmPickActorService.Response(
-                                actor_to_act=random.choice(eligible_npcs).actor_ref,
-                                reason=reason,
-                                pass_reason_to_npc=True
-                            )
-
-                return response
-
-            return await self._exec_strategy_sheogorath(request, eligible_npcs, sheogorath_level)
-        finally:
-            self._main_session_lock.release()
+        return await self._exec_strategy_sheogorath(request, eligible_npcs, sheogorath_level)
 
     def _gather_data_from_story_items(self, request: Request):
         exclude_actors: list[ActorRef] = []
@@ -498,14 +490,15 @@ class NpcLlmPickActorService:
 - Не стесняйся излишней агрессии или беспричинной эскалации, делай разговоры резкими, смешными и увлекательными.
 )"""
 
-        self._main_session.reset(
+        session = self._llm_system.create_session()
+        session.reset(
             system_instructions=b.__str__(),
             messages=history_builder.build_history()
         )
 
         log_context = ",".join(map(lambda n: n.actor_ref.ref_id, eligible_npcs))
 
-        raw_text = await self._main_session.send_message(
+        raw_text = await session.send_message(
             user_text=message,
             log_name="pick_npc",
             log_context=log_context
@@ -1,7 +1,6 @@
-import asyncio
 import json
 import time
-from typing import NamedTuple, Optional
+from typing import Callable, NamedTuple, Optional
 
 from pydantic import BaseModel
 from game.data.npc import Npc
@@ -9,7 +8,7 @@ from game.data.player_ref_looked_at import PlayerRefLookedAt
 from game.data.story_item import StoryItem, StoryItemDataAlias, StoryItemData
 from game.i18n.i18n import I18n
 from game.service.npc_services.npc_llm_message_history_builder import NpcLlmMessageHistoryBuilder
-from game.service.npc_services.npc_llm_system_instructions_builder import NpcLlmSystemInstructionsBuilder
+from game.service.npc_services.npc_llm_system_instructions_builder import NpcLlmSystemInstructions, NpcLlmSystemInstructionsBuilder
 from game.service.providers.env_provider import EnvProvider
 from llm.message import LlmMessage
 from llm.system import LlmSystem
@@ -32,7 +31,7 @@ class NpcLlmResponseProducer:
         raw_text: str
 
     class _RequestPreparedForReset(NamedTuple):
-        llm_system_instructions: str
+        llm_system_instructions: NpcLlmSystemInstructions
         llm_history_messages: list[LlmMessage]
         llm_message_to_send: str
 
@@ -48,59 +47,69 @@ class NpcLlmResponseProducer:
         self._system_instructions_builder = system_instructions_builder
         self._i18n = i18n
 
-        self._main_session = llm_system.create_session()
-        self._main_session_lock = asyncio.Lock()
+    # With on_text_delta the response is streamed, the callback gets pieces of the raw text as the model generates them.
+    async def produce_npc_response(self, request: Request, on_text_delta: Optional[Callable[[str], None]] = None) -> Response:
+        preprocessed_request = self._prepare_data_for_llm_reset(request)
 
-    async def produce_npc_response(self, request: Request) -> Response:
-        await self._main_session_lock.acquire()
-        try:
-            preprocessed_request = self._prepare_data_for_llm_reset(request)
-            self._main_session.reset(
-                system_instructions=preprocessed_request.llm_system_instructions,
-                messages=preprocessed_request.llm_history_messages
-            )
+        # A session per call, so responses for different NPCs, e.g. one prepared ahead of time, can be produced at once.
+        session = self._llm_system.create_session()
+        session.reset(
+            system_instructions=preprocessed_request.llm_system_instructions.text,
+            messages=preprocessed_request.llm_history_messages,
+            system_instructions_stable_prefix_len=preprocessed_request.llm_system_instructions.stable_prefix_len
+        )
 
-            log_context_model = NpcLlmResponseProducer._LogContext(
-                hearing_npcs=request.other_hearing_npcs,
-                npc=request.npc,
-                unprocessed_items=request.unprocessed_items
-            )
-            log_context = json.dumps(log_context_model.model_dump(mode='json'), ensure_ascii=False)
+        log_context_model = NpcLlmResponseProducer._LogContext(
+            hearing_npcs=request.other_hearing_npcs,
+            npc=request.npc,
+            unprocessed_items=request.unprocessed_items
+        )
+        log_context = json.dumps(log_context_model.model_dump(mode='json'), ensure_ascii=False)
 
-            logger.info("Sent request to LLM, waiting...")
-            t0 = time.time()
-            raw_text = await self._main_session.send_message(
+        logger.info("Sent request to LLM, waiting...")
+        t0 = time.time()
+        if on_text_delta is None:
+            raw_text = await session.send_message(
+                user_text=preprocessed_request.llm_message_to_send,
+                log_name=request.npc.actor_ref.ref_id,
+                log_context=log_context
+            )
+        else:
+            pieces: list[str] = []
+            async for piece in session.stream_message(
                 user_text=preprocessed_request.llm_message_to_send,
                 log_name=request.npc.actor_ref.ref_id,
                 log_context=log_context
+            ):
+                pieces.append(piece)
+                on_text_delta(piece)
+            raw_text = ''.join(pieces)
+
+        # A streamed response is already being said, so it is kept as is.
+        if self._llm_system.is_dummy() and on_text_delta is None:
+            saying_text = ""
+            for i in reversed(request.unprocessed_items):
+                if i.data.type == 'say_processed':
+                    saying_text = i.data.text
+                    break
+            if saying_text:
+                raw_text = f'I am dummy {request.npc.actor_ref.name} responding to {saying_text[:8]}'
+            else:
+                raw_text = f'I am dummy {request.npc.actor_ref.name}'
+
+        logger.info(f"Got response from LLM in {time.time() - t0} sec")
+        processed_text = self._post_process_response_text(raw_text)
+
+        new_item_data_list: list[StoryItemDataAlias] = [
+            StoryItemData.SayRaw(
+                type='say_raw',
+                text=processed_text,
+                speaker=request.npc.actor_ref,
+                target=None
             )
+        ]
 
-            if self._llm_system.is_dummy():
-                saying_text = ""
-                for i in reversed(request.unprocessed_items):
-                    if i.data.type == 'say_processed':
-                        saying_text = i.data.text
-                        break
-                if saying_text:
-                    raw_text = f'I am dummy {request.npc.actor_ref.name} responding to {saying_text[:8]}'
-                else:
-                    raw_text = f'I am dummy {request.npc.actor_ref.name}'
-
-            logger.info(f"Got response from LLM in {time.time() - t0} sec")
-            processed_text = self._post_process_response_text(raw_text)
-
-            new_item_data_list: list[StoryItemDataAlias] = [
-                StoryItemData.SayRaw(
-                    type='say_raw',
-                    text=processed_text,
-                    speaker=request.npc.actor_ref,
-                    target=None
-                )
-            ]
-
-            return NpcLlmResponseProducer.Response(new_item_data_list, processed_text)
-        finally:
-            self._main_session_lock.release()
+        return NpcLlmResponseProducer.Response(new_item_data_list, processed_text)
 
     def _prepare_data_for_llm_reset(self, request: Request) -> _RequestPreparedForReset:
         history_builder = NpcLlmMessageHistoryBuilder(
@@ -1,4 +1,7 @@
 import math
+from typing import Callable, NamedTuple
+
+from pydantic import BaseModel, Field
 from eventbus.data.actor_stats import ActorStats
 from eventbus.data.npc_data import NpcData
 from game.data.npc import Npc
@@ -14,16 +17,45 @@ from game.service.util.map_value_in_range import map_value_in_range
 from game.service.util.prompt_builder import PromptBuilder
 from llm.message import LlmMessage
 from util.distance import Distance
+from util.lru_cache import LruCache
 from util.logger import Logger
 
 logger = Logger(__name__)
 
 
+class NpcLlmSystemInstructions(NamedTuple):
+    text: str
+
+    # The beginning of the text which does not depend on the scene, the time or the story.
+    stable_prefix_len: int
+
+
+class NpcLlmSystemInstructionsStats(BaseModel):
+    section_hits: int
+    section_misses: int
+    section_evictions: int
+
+
+# Fields each memoized section reads, the section is rendered again only when one of them changes.
+_INITIAL_NPC_FIELDS = {'name', 'female', 'race', 'class_name', 'stats', 'faction', 'equipped', 'nakedness'}
+_WHAT_NPC_DOES_FIELDS = {'name', 'class_name', 'is_ashfall_innkeeper', 'ashfall_stew_cost', 'ai_config'}
+_OTHER_NPC_SUMMARY_FIELDS = {'name', 'female', 'race', 'class_name', 'stats', 'equipped', 'faction', 'hostiles'}
+_PLAYER_INFO_NPC_FIELDS = {'name', 'race', 'faction', 'disposition', 'following'}
+_PLAYER_INFO_PLAYER_FIELDS = {'name', 'female', 'race', 'stats', 'hostiles', 'factions', 'equipped', 'nakedness',
+                              'weapon_drawn', 'weapon', 'health_normalized'}
+
+
 class NpcLlmSystemInstructionsBuilder():
-    def __init__(self, player_provider: PlayerProvider, env_provider: EnvProvider,
+    class Config(BaseModel):
+        # Rendered sections kept for reuse, e.g. an NPC's persona or its summary of another NPC.
+        # 0 renders every section on every build.
+        section_cache_size: int = Field(default=1024, ge=0)
+
+    def __init__(self, config: Config, player_provider: PlayerProvider, env_provider: EnvProvider,
                  dropped_items_provider: DroppedItemsProvider,
                  cell_name_provider: CellNameProvider, i18n: I18n,
                  scene_instructions: SceneInstructions):
+        self._config = config
         self._player_provider = player_provider
         self._env_provider = env_provider
         self._dropped_items_provider = dropped_items_provider
@@ -31,20 +63,62 @@ class NpcLlmSystemInstructionsBuilder():
         self._i18n = i18n
         self._scene_instructions = scene_instructions
 
-    def build(self, npc: Npc, other_npcs: list[Npc], messages: list[LlmMessage]) -> str:
-        b = PromptBuilder()
+        self._sections: LruCache[str] = LruCache(self._config.section_cache_size)
+
+    def build(self, npc: Npc, other_npcs: list[Npc], messages: list[LlmMessage]) -> NpcLlmSystemInstructions:
         d = npc.npc_data
+        p = self._player_provider.local_player.player_data
 
-        self._initial(npc, b, d)
-        self._what_npc_does(b, d)
-        self._current_env(b, d)
-        self._health(b, d)
-        self._npcs_nearby(npc, b, d, other_npcs)
-        self._player_info(npc, b, d)
-        self._info_from_wiki(npc, b, d)
-        self._final(npc, b, d, other_npcs, messages)
+        # What stays the same from turn to turn goes first, so the LLM provider can cache it.
+        stable = [
+            self._section(
+                ('initial', npc.actor_ref.ref_id, npc.personality.background, d.model_dump_json(include=_INITIAL_NPC_FIELDS)),
+                lambda b: self._initial(npc, b, d)),
+            self._section(
+                ('what_npc_does', d.model_dump_json(include=_WHAT_NPC_DOES_FIELDS)),
+                lambda b: self._what_npc_does(b, d)),
+            self._section(
+                ('info_from_wiki', npc.actor_ref.ref_id, d.cell.id, d.faction.faction_id if d.faction else None, p.name),
+                lambda b: self._info_from_wiki(npc, b, d)),
+            self._section(('rules',), self._rules),
+        ]
+
+        volatile = [
+            self._render(lambda b: self._current_env(b, d)),
+            self._render(lambda b: self._health(b, d)),
+            self._npcs_nearby(npc, d, other_npcs),
+            self._section(
+                ('player_info', round(Distance.from_ingame_to_meters(d.player_distance)),
+                 d.model_dump_json(include=_PLAYER_INFO_NPC_FIELDS),
+                 p.model_dump_json(include=_PLAYER_INFO_PLAYER_FIELDS),
+                 self._env_provider.env.ashfall.model_dump_json() if self._env_provider.env.ashfall else None),
+                lambda b: self._player_info(npc, b, d)),
+            self._render(lambda b: self._final(npc, b, d, other_npcs, messages)),
+        ]
+
+        stable_prefix = f"{self._join(stable, "\n\n")}\n\n"
+        return NpcLlmSystemInstructions(
+            text=stable_prefix + self._join(volatile, "\n\n"),
+            stable_prefix_len=len(stable_prefix)
+        )
+
+    def get_stats(self):
+        return NpcLlmSystemInstructionsStats(
+            section_hits=self._sections.hits,
+            section_misses=self._sections.misses,
+            section_evictions=self._sections.evictions
+        )
+
+    def _section(self, key: tuple, render: Callable[[PromptBuilder], None]) -> str:
+        return self._sections.get_or_create(key, lambda: self._render(render))
+
+    def _render(self, render: Callable[[PromptBuilder], None]) -> str:
+        b = PromptBuilder()
+        render(b)
+        return b.__str__().strip()
 
-        return b.__str__()
+    def _join(self, sections: list[str], separator: str):
+        return separator.join(filter(lambda s: len(s) > 0, sections))
 
     def _initial(self, npc: Npc, b: PromptBuilder, d: NpcData) -> None:
         b.paragraph()
@@ -238,24 +312,27 @@ class NpcLlmSystemInstructionsBuilder():
         if d.is_diseased:
             b.line(f"{d.name} заболел.")
 
-    def _npcs_nearby(self, npc: Npc, b: PromptBuilder, d: NpcData, other_npcs: list[Npc]):
-        b.paragraph()
+    def _npcs_nearby(self, npc: Npc, d: NpcData, other_npcs: list[Npc]):
+        summaries: list[str] = []
         for other_npc in other_npcs:
-            self._other_npc_summary(npc, b, d, other_npc)
-
-    def _other_npc_summary(self, npc: Npc, b: PromptBuilder, d: NpcData, other_npc: Npc):
+            distance_meters = round(Distance.from_ingame_to_meters(other_npc.npc_data.position.distance(d.position)))
+            summaries.append(self._section(
+                ('other_npc_summary', d.name, d.faction.model_dump_json() if d.faction else None,
+                 npc.behavior.relation_to_other_npc.get(other_npc.actor_ref.ref_id, 50), distance_meters,
+                 other_npc.npc_data.model_dump_json(include=_OTHER_NPC_SUMMARY_FIELDS)),
+                lambda b: self._other_npc_summary(npc, b, d, other_npc, distance_meters)))
+        return self._join(summaries, "\n")
+
+    def _other_npc_summary(self, npc: Npc, b: PromptBuilder, d: NpcData, other_npc: Npc, distance_meters: int):
         d2 = other_npc.npc_data
 
-        distance_ingame = other_npc.npc_data.position.distance(d.position)
-        distance_meters = Distance.from_ingame_to_meters(distance_ingame)
-
         he = "она" if d2.female else "он"
         him = "неё" if d2.female else "него"
         verb_suffix = "а" if d2.female else ""
 
         b.line()
         b.sentence(
-            f"- В {round(distance_meters)} метров от {d.name} стоит {"женщина" if d2.female else "мужчина"} {d2.race.name if d2.race else ""} по имени {d2.name}")
+            f"- В {distance_meters} метров от {d.name} стоит {"женщина" if d2.female else "мужчина"} {d2.race.name if d2.race else ""} по имени {d2.name}")
         if d2.stats:
             b.sentence(f"У {him} уровень {d2.stats.other.level}, класс {d2.class_name}.")
 
@@ -588,12 +665,8 @@ class NpcLlmSystemInstructionsBuilder():
 Ты не хочешь, чтобы кто попало вступал в гильдию - ты хочешь, чтобы члены гильдии были честными и сильными.
 """)
 
-    def _final(self, npc: Npc, b: PromptBuilder, d: NpcData, other_npcs: list[Npc], messages: list[LlmMessage]) -> None:
-        p = self._player_provider.local_player.player_data
-
+    def _rules(self, b: PromptBuilder) -> None:
         b.paragraph()
-        b.reset_option_index()
-
         b.line(f"""
 
 # ПРАВИЛА
@@ -636,6 +709,14 @@ class NpcLlmSystemInstructionsBuilder():
 Например, чтобы дать 36 монет напиши "trigger_drop_gold[36]".
 
 """)
+
+    def _final(self, npc: Npc, b: PromptBuilder, d: NpcData, other_npcs: list[Npc], messages: list[LlmMessage]) -> None:
+        p = self._player_provider.local_player.player_data
+
+        b.paragraph()
+        b.reset_option_index()
+
+        b.line("# ДРУГИЕ ТРИГГЕРЫ")
         if len(self._dropped_items_provider.dropped_items) > 0:
             item_index = 0
             for item in self._dropped_items_provider.dropped_items:
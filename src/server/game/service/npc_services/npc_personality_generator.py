@@ -1,18 +1,16 @@
-import asyncio
 import random
 from eventbus.data.npc_data import NpcData
 from game.data.npc_personality import NpcPersonality
 from game.data.time import GameTime
 from game.service.util.format_date import format_date
 from game.service.util.prompt_builder import PromptBuilder
-from llm.session import LlmSession
+from llm.system import LlmSystem
 from tts.voice import Voice
 
 
 class NpcPersonalityGenerator():
-    def __init__(self, llm_session: LlmSession) -> None:
-        self._llm_session = llm_session
-        self._lock = asyncio.Lock()
+    def __init__(self, llm: LlmSystem) -> None:
+        self._llm = llm
 
     async def generate(self, npc_data: NpcData, now: GameTime) -> NpcPersonality:
         pre_text = self._generate_background(npc_data, now)
@@ -36,41 +34,38 @@ class NpcPersonalityGenerator():
         return personality
 
         # Good option, but takes too long.
-        await self._lock.acquire()
-        try:
-            self._llm_session.reset(
-                system_instructions="""Сгенерируй бекграунд персонажа из мира Morrowind Elder Scrolls на базе того, что тебе дали.
+        llm_session = self._llm.create_session(priority='low')
+        llm_session.reset(
+            system_instructions="""Сгенерируй бекграунд персонажа из мира Morrowind Elder Scrolls на базе того, что тебе дали.
 
 1. Добавь персонажу больше интересных и необычных черт личности, и раскрой, откуда он их приобрёл.
 2. Добавь персонажу психологических черт, свойственных его классу. В частности то, как он говорит, в каком стиле.""",
-                messages=[]
-            )
-            text = await self._llm_session.send_message(
-                user_text=f"""Ты - персонаж во вселенной игры Morrowind из Elder Scrolls.
+            messages=[]
+        )
+        text = await llm_session.send_message(
+            user_text=f"""Ты - персонаж во вселенной игры Morrowind из Elder Scrolls.
 Тебя зовут {npc_data.name}, ты - {"женщина" if npc_data.female else "мужчина"} расы {npc_data.race.name}.
 Класс - {npc_data.class_name}.
 
 {pre_text}"""
-            )
+        )
 
-            personality = NpcPersonality(
-                background=text,
-                voice=Voice(
-                    speaker_ref_id=npc_data.ref_id,
-                    race_id=npc_data.race.id,
-                    female=npc_data.female,
-                    pitch=random.uniform(0.9, 1.1),
-                    elevenlabs=Voice.Elevenlabs(
-                        stability=random.uniform(0.3, 1.0),
-                        style=random.uniform(0.3, 0.7),
-                        similarity_boost=random.uniform(0.3, 0.7),
-                    )
+        personality = NpcPersonality(
+            background=text,
+            voice=Voice(
+                speaker_ref_id=npc_data.ref_id,
+                race_id=npc_data.race.id,
+                female=npc_data.female,
+                pitch=random.uniform(0.9, 1.1),
+                elevenlabs=Voice.Elevenlabs(
+                    stability=random.uniform(0.3, 1.0),
+                    style=random.uniform(0.3, 0.7),
+                    similarity_boost=random.uniform(0.3, 0.7),
                 )
             )
+        )
 
-            return personality
-        finally:
-            self._lock.release()
+        return personality
 
 
     def _generate_background(self, npc_data: NpcData, now: GameTime) -> str:
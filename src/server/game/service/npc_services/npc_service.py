@@ -1,6 +1,6 @@
 import asyncio
 from dataclasses import dataclass
-from llm.session import LlmSession
+from llm.system import LlmSystem
 from util.logger import Logger
 
 from game.service.npc_services.npc_database import NpcDatabase
@@ -29,10 +29,10 @@ class _NpcInMemory:
 
 class NpcService:
     def __init__(self, consumer: EventConsumer, rpc: Rpc, db: NpcDatabase, env_provider: EnvProvider,
-                 llm_session: LlmSession) -> None:
+                 llm: LlmSystem) -> None:
         self._rpc = rpc
         self._db = db
-        self._npc_personality_generator = NpcPersonalityGenerator(llm_session)
+        self._npc_personality_generator = NpcPersonalityGenerator(llm)
 
         self._env_provider = env_provider
 
@@ -40,48 +40,86 @@ class NpcService:
         self._npc_data_expiration_ms = 30_000
         self._npc_ref_id_being_queried: set[str] = set()
 
-        consumer.register_handler(self._handle_event)
+        consumer.register_handler(self._handle_event, ['npc_death'])
 
     def clear_cache(self):
         self._ref_id_to_npc.clear()
 
     async def get_npc(self, npc_ref_id: str) -> Npc:
-        while npc_ref_id in self._npc_ref_id_being_queried:
+        npcs = await self.get_npcs([npc_ref_id])
+        return npcs[0]
+
+    async def get_npcs(self, npc_ref_ids: list[str]) -> list[Npc]:
+        unique_npc_ref_ids = list(dict.fromkeys(npc_ref_ids))
+
+        while any(map(lambda ref_id: ref_id in self._npc_ref_id_being_queried, unique_npc_ref_ids)):
             await asyncio.sleep(1.0 / 30.0)
 
-        self._npc_ref_id_being_queried.add(npc_ref_id)
+        self._npc_ref_id_being_queried.update(unique_npc_ref_ids)
         try:
-            # memory
-            npc_in_memory = self._ref_id_to_npc.get(npc_ref_id, None)
-            if npc_in_memory:
-                if now_ms() > npc_in_memory.npc_data_expire_at_ms:
-                    npc_in_memory.npc.npc_data = await self._rpc.get_npc_data(npc_ref_id)
-                    self._db.save_npc_data(npc_in_memory.npc)
-
-                return npc_in_memory.npc
-
-            # db
-            npc_from_db = self._get_from_database(npc_ref_id)
-            if npc_from_db:
+            ref_id_to_npc: dict[str, Npc] = {}
+            ref_ids_to_refresh: list[str] = []
+            ref_ids_to_create: list[str] = []
+
+            for npc_ref_id in unique_npc_ref_ids:
+                # memory
+                npc_in_memory = self._ref_id_to_npc.get(npc_ref_id, None)
+                if npc_in_memory:
+                    ref_id_to_npc[npc_ref_id] = npc_in_memory.npc
+                    if now_ms() > npc_in_memory.npc_data_expire_at_ms:
+                        ref_ids_to_refresh.append(npc_ref_id)
+                    continue
+
+                # db
+                npc_from_db = self._get_from_database(npc_ref_id)
+                if npc_from_db:
+                    self._ref_id_to_npc[npc_ref_id] = _NpcInMemory(
+                        npc_from_db,
+                        now_ms() + self._npc_data_expiration_ms
+                    )
+                    ref_id_to_npc[npc_ref_id] = npc_from_db
+                    ref_ids_to_refresh.append(npc_ref_id)
+                    continue
+
+                ref_ids_to_create.append(npc_ref_id)
+
+            # game
+            ref_id_to_npc_data = await self._query_npcs_data(ref_ids_to_refresh + ref_ids_to_create)
+
+            for npc_ref_id in ref_ids_to_refresh:
+                npc = ref_id_to_npc[npc_ref_id]
+                npc.npc_data = ref_id_to_npc_data[npc_ref_id]
+                self._ref_id_to_npc[npc_ref_id].npc_data_expire_at_ms = now_ms() + self._npc_data_expiration_ms
+                self._db.save_npc_data(npc)
+
+            for npc_ref_id in ref_ids_to_create:
+                new_npc = await self._create_new_npc(ref_id_to_npc_data[npc_ref_id])
                 self._ref_id_to_npc[npc_ref_id] = _NpcInMemory(
-                    npc_from_db,
+                    new_npc,
                     now_ms() + self._npc_data_expiration_ms
                 )
+                ref_id_to_npc[npc_ref_id] = new_npc
 
-                npc_from_db.npc_data = await self._rpc.get_npc_data(npc_ref_id)
-                self._db.save_npc_data(npc_from_db)
-                return npc_from_db
-
-            # game
-            npc_data_from_game = await self._rpc.get_npc_data(npc_ref_id)
-            new_npc = await self._create_new_npc(npc_data_from_game)
-            self._ref_id_to_npc[npc_ref_id] = _NpcInMemory(
-                new_npc,
-                now_ms() + self._npc_data_expiration_ms
-            )
-            return new_npc
+            return list(map(lambda ref_id: ref_id_to_npc[ref_id], npc_ref_ids))
         finally:
-            self._npc_ref_id_being_queried.remove(npc_ref_id)
+            self._npc_ref_id_being_queried.difference_update(unique_npc_ref_ids)
+
+    async def _query_npcs_data(self, npc_ref_ids: list[str]) -> dict[str, NpcData]:
+        if len(npc_ref_ids) == 0:
+            return {}
+
+        if len(npc_ref_ids) == 1:
+            npc_data = await self._rpc.get_npc_data(npc_ref_ids[0])
+            return {npc_ref_ids[0]: npc_data}
+
+        npcs_data = await self._rpc.get_npcs_data(npc_ref_ids)
+        ref_id_to_npc_data = {npc_data.ref_id: npc_data for npc_data in npcs_data}
+
+        missing_ref_ids = list(filter(lambda ref_id: ref_id not in ref_id_to_npc_data, npc_ref_ids))
+        if len(missing_ref_ids) > 0:
+            raise Exception(f"Game did not return data for NPCs: {missing_ref_ids}")
+
+        return ref_id_to_npc_data
 
     async def get_npcs_who_can_hear_another_actor(self, another_actor: ActorRef) -> list[Npc]:
         data = EventDataRpc.GetActorsNearbyRequest(
@@ -92,7 +130,7 @@ class NpcService:
         )
         response = await self._rpc.get_actors_nearby(data)
 
-        npcs: list[Npc] = []
+        actors_who_can_hear: list[EventDataRpc.GetActorsNearbyResponse.ActorNearby] = []
         for actor in response.actors:
             if actor.actor_ref.type == 'creature':
                 if actor.actor_ref.ref_id not in ['vivec_god00000000']:
@@ -101,7 +139,12 @@ class NpcService:
             if not actor.can_see and Distance.from_ingame_to_meters(actor.distance_ingame) > 3:
                 continue
 
-            npc = await self.get_npc(actor.actor_ref.ref_id)
+            actors_who_can_hear.append(actor)
+
+        npcs_who_can_hear = await self.get_npcs(list(map(lambda a: a.actor_ref.ref_id, actors_who_can_hear)))
+
+        npcs: list[Npc] = []
+        for (actor, npc) in zip(actors_who_can_hear, npcs_who_can_hear):
             if npc.npc_data.is_dead:
                 continue
 
@@ -1,6 +1,6 @@
 import asyncio
 import traceback
-from typing import Callable
+from typing import Callable, Optional
 import mutagen.mp3
 from pydantic import BaseModel, Field
 from eventbus.data.actor_ref import ActorRef
@@ -21,10 +21,11 @@ logger = Logger(__name__)
 
 
 class _SceneLock:
-    def __init__(self) -> None:
+    def __init__(self, on_unlock: Optional[Callable[[], None]] = None) -> None:
         self._is_locked = False
         self._generation = 1
         self._holder: ActorRef | None = None
+        self._on_unlock = on_unlock
 
     def locked(self):
         return self._is_locked
@@ -62,10 +63,15 @@ class _SceneLock:
         return True
 
     def unlock(self):
+        was_locked = self._is_locked
+
         self._is_locked = False
         self._holder = None
         self._generation = self._generation + 1
 
+        if was_locked and self._on_unlock:
+            self._on_unlock()
+
     def unlock_later_if_same_generation(self, delay_s: float):
         current_generation = self._generation
         asyncio.get_event_loop().call_later(
@@ -132,10 +138,14 @@ class NpcSpeakerService:
 
         self._scene_lock_timeout_s: int = 90
 
-        self._scene_lock = _SceneLock()
+        self._scene_lock = _SceneLock(self._handle_scene_unlocked)
+        self._scene_unlock_listeners: list[Callable[[], None]] = []
         self._actor_lock: dict[ActorRef, _ActorLock] = {}
 
-        consumer.register_handler(self._handle_event)
+        # Loop time when the last audio sent for the actor ends.
+        self._speaking_until: dict[ActorRef, float] = {}
+
+        consumer.register_handler(self._handle_event, ['npc_death', 'stt_recognition_update', 'stt_recognition_complete'])
 
     async def _handle_event(self, event: Event):
         if event.data.type == 'npc_death':
@@ -181,6 +191,14 @@ class NpcSpeakerService:
         if self._scene_lock.locked() and (self._scene_lock.holder is None or self._scene_lock.holder.type == 'npc'):
             self._scene_lock.unlock()
 
+    # Listeners are called on every unlock, including the timed one near the end of NPC audio.
+    def add_scene_unlock_listener(self, listener: Callable[[], None]):
+        self._scene_unlock_listeners.append(listener)
+
+    def _handle_scene_unlocked(self):
+        for listener in self._scene_unlock_listeners:
+            listener()
+
     def lock_scene(self):
         return self._scene_lock.lock()
 
@@ -199,7 +217,14 @@ class NpcSpeakerService:
     def set_scene_holder(self, generation_id: int, holder: ActorRef):
         self._scene_lock.set_holder(generation_id, holder)
 
-    async def say(self, npc: Npc, text: str, target: ActorRef | None):
+    # Converts the line to audio without saying it, the result can be passed to say() later.
+    async def prepare_voiceover(self, npc: Npc, text: str):
+        return await self._produce_voiceover(npc, text)
+
+    # With hold_scene the scene stays locked after the audio, for lines said in parts, see NpcSpeechStream.
+    # release_scene_after_speech() must be called once the last part is said.
+    async def say(self, npc: Npc, text: str, target: ActorRef | None, voiceover: Optional[TtsResponse] = None,
+                  hold_scene: bool = False) -> Optional[float]:
         if not self._scene_lock.locked():
             logger.debug(f"Say is called for {npc.actor_ref} but scene is not locked, skipping say")
             return
@@ -209,11 +234,12 @@ class NpcSpeakerService:
                 f"Say is called for NPC who does not hold the lock: npc={npc.actor_ref} holder={self._scene_lock.holder}")
             return
 
-        tts_response = await self._produce_voiceover(npc, text)
+        tts_response = voiceover if voiceover is not None else await self._produce_voiceover(npc, text)
 
         if tts_response is None:
             logger.debug(f"Empty TTS response, skip: npc={npc.actor_ref}")
-            self.unlock_scene()
+            if not hold_scene:
+                self.unlock_scene()
             return
 
         if self._scene_lock.holder != npc.actor_ref:
@@ -245,11 +271,28 @@ class NpcSpeakerService:
 
         logger.debug(f"Actor will be unlocked in {actor_lock_timeout} sec")
 
-        scene_lock_timeout = max(1, audio_duration_sec - self._config.release_before_end_sec)
-        self._scene_lock.unlock_later_if_same_generation(scene_lock_timeout)
-        logger.debug(f"Scene will be unlocked in {scene_lock_timeout} sec")
+        if not hold_scene:
+            scene_lock_timeout = max(1, audio_duration_sec - self._config.release_before_end_sec)
+            self._scene_lock.unlock_later_if_same_generation(scene_lock_timeout)
+            logger.debug(f"Scene will be unlocked in {scene_lock_timeout} sec")
 
+        self._speaking_until[npc.actor_ref] = asyncio.get_event_loop().time() + audio_duration_sec
         self._send_say_mp3_event(npc, text, target, tts_response, audio_duration_sec)
+        return audio_duration_sec
+
+    # Unlocks the scene held by say() with hold_scene near the end of the NPC's audio, as say() does otherwise.
+    def release_scene_after_speech(self, npc: Npc):
+        if self._scene_lock.holder != npc.actor_ref:
+            return
+
+        remaining_sec = self._speaking_until.get(npc.actor_ref, 0.0) - asyncio.get_event_loop().time()
+        if remaining_sec <= 0:
+            self.unlock_scene()
+            return
+
+        scene_lock_timeout = max(1, remaining_sec - self._config.release_before_end_sec)
+        self._scene_lock.unlock_later_if_same_generation(scene_lock_timeout)
+        logger.debug(f"Scene will be unlocked in {scene_lock_timeout} sec")
 
     def turn_to_actor(self, actors: list[ActorRef], target: ActorRef):
         self._producer.produce_event(Event(
@@ -0,0 +1,120 @@
+import asyncio
+import traceback
+from typing import Callable, Optional
+
+from pydantic import BaseModel, Field
+
+from game.data.npc import Npc
+from game.service.npc_services.npc_speaker_service import NpcSpeakerService
+from game.service.util.sentence_splitter import SentenceSplitter
+from tts.response import TtsResponse
+from util.logger import Logger
+
+logger = Logger(__name__)
+
+
+# Says an NPC line while the LLM is still generating it: the text is cut into sentences,
+# each one is converted to audio as soon as it is complete and said right after the previous one.
+# The NPC holds the scene until the last part is said.
+class NpcSpeechStream:
+    class Config(BaseModel):
+        enabled: bool = Field(default=False)
+
+        # Shorter sentences are joined with the next one, each part is a separate TTS request.
+        min_part_chars: int = Field(default=20, ge=1)
+
+    def __init__(self, config: Config, npc: Npc, speaker: NpcSpeakerService, get_speech_text: Callable[[str], str]) -> None:
+        self._npc = npc
+        self._speaker = speaker
+        self._get_speech_text = get_speech_text
+
+        self._splitter = SentenceSplitter(config.min_part_chars)
+        self._parts: asyncio.Queue[Optional[tuple[str, asyncio.Task[Optional[TtsResponse]]]]] = asyncio.Queue()
+        self._first_part_said = asyncio.Event()
+        self._is_finished = False
+
+        self.parts = 0
+        self.said_parts = 0
+
+        # Total audio duration of the parts said so far.
+        self.audio_duration_sec = 0.0
+
+        self._player = asyncio.get_event_loop().create_task(self._play())
+
+    def add_text(self, delta: str):
+        for sentence in self._splitter.add(delta):
+            self._add_part(sentence)
+
+    # Called once the whole line is generated.
+    def finish(self):
+        if self._is_finished:
+            return
+        self._is_finished = True
+
+        rest = self._splitter.flush()
+        if rest is not None:
+            self._add_part(rest)
+        self._parts.put_nowait(None)
+
+    # Waits until the first part is said, returns False if nothing was said, then the scene is left as is.
+    async def wait_started(self):
+        await self._first_part_said.wait()
+        return self.said_parts > 0
+
+    # Waits until the last part is said or saying stops, returns the audio duration of the said parts.
+    async def wait_finished(self) -> Optional[float]:
+        await asyncio.wait([self._player])
+        return self.audio_duration_sec if self.said_parts > 0 else None
+
+    def cancel(self):
+        self._is_finished = True
+        self._player.cancel()
+        self._cancel_pending_parts()
+
+    def _add_part(self, sentence: str):
+        text = self._get_speech_text(sentence)
+        if len(text) == 0 or self._player.done():
+            return
+
+        self.parts = self.parts + 1
+        logger.debug(f"Converting part {self.parts} of {self._npc.actor_ref} line to audio: {text}")
+        task = asyncio.get_event_loop().create_task(self._speaker.prepare_voiceover(self._npc, text))
+        self._parts.put_nowait((text, task))
+
+    async def _play(self):
+        try:
+            while True:
+                part = await self._parts.get()
+                if part is None:
+                    if self.said_parts > 0:
+                        self._speaker.release_scene_after_speech(self._npc)
+                    return
+
+                (text, task) = part
+                voiceover = await task
+
+                if not self._speaker.is_scene_locked_by(self._npc.actor_ref):
+                    logger.debug(f"Stop saying {self._npc.actor_ref} line in parts, the scene is not held anymore")
+                    return
+
+                audio_duration_sec = await self._speaker.say(self._npc, text, None, voiceover, hold_scene=True)
+                if audio_duration_sec is not None:
+                    self.said_parts = self.said_parts + 1
+                    self.audio_duration_sec = self.audio_duration_sec + audio_duration_sec
+                    self._first_part_said.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            logger.error(f"Saying {self._npc.actor_ref} line in parts failed: {error}")
+            logger.debug(traceback.format_exc())
+            if self.said_parts > 0:
+                self._speaker.release_scene_after_speech(self._npc)
+        finally:
+            self._first_part_said.set()
+            self._cancel_pending_parts()
+
+    def _cancel_pending_parts(self):
+        while not self._parts.empty():
+            part = self._parts.get_nowait()
+            if part is not None:
+                part[1].cancel()
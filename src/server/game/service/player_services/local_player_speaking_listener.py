@@ -12,7 +12,13 @@ class LocalPlayerSpeakingListener:
         self._player_started_speaking_looking_at: Optional[ActorRef] = None
         self._player_stopped_speaking_looking_at: Optional[ActorRef] = None
         self._player_last_ref_looked_at: Optional[PlayerRefLookedAt] = None
-        event_consumer.register_handler(self._handle_event)
+        event_consumer.register_handler(self._handle_event, [
+            'dialog_text_submit',
+            'stt_recognition_complete',
+            'player_starts_speaking_looking_at',
+            'player_stops_speaking_looking_at',
+            'show_tooltip_for_ref'
+        ])
 
     @property
     def player_started_speaking_looking_at(self):
@@ -1,9 +1,9 @@
-import asyncio
 from typing import Literal, Optional
 from eventbus.data.actor_ref import ActorRef
+from game.service.player_services.player_intention_classifier import PlayerIntentionClassifier
 from game.service.util.prompt_builder import PromptBuilder
 from util.logger import Logger
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from llm.system import LlmSystem
 
@@ -12,6 +12,13 @@ logger = Logger(__name__)
 
 
 class PlayerIntentionAnalyzer:
+    class Config(BaseModel):
+        # Adds the player's line to the story and lets NPCs react before the intention is known.
+        parallel: bool = Field(default=False)
+
+        # Clear cases are decided by local rules, and lines without anything intent-like skip the LLM.
+        local_classifier: bool = Field(default=False)
+
     class Response(BaseModel):
         trigger_dialog_topic: str | None = None
         list_available_dialog_topics: bool = False
@@ -20,59 +27,72 @@ class PlayerIntentionAnalyzer:
         npc_stop_combat: bool = False
         sheogorath_level: Literal['normal', 'mad'] | None = None
 
-    def __init__(self, llm: LlmSystem) -> None:
-        self._llm_session = llm.create_session()
-        self._lock = asyncio.Lock()
+    def __init__(self, config: Config, llm: LlmSystem) -> None:
+        self._config = config
+        self._llm = llm
+
+        self._classifier = PlayerIntentionClassifier()
+        self.local_decisions: dict[str, int] = {}
 
     async def analyze_player_intention(self, text: str, known_topics: list[str], target: Optional[ActorRef]) -> Response:
         if "лично" in text:  # i18n
             return PlayerIntentionAnalyzer.Response()
 
-        await self._lock.acquire()
-        try:
-            instructions = self._build_instructions(text, known_topics, target)
-
-            self._llm_session.reset(
-                system_instructions=instructions,
-                messages=[]
-            )
-
-            log_context = "\n".join([
-                f"Player intention analyzer",
-                f"Known topics: {known_topics}",
-            ])
-            llm_response = await self._llm_session.send_message(
-                user_text=f"(игрок говорит) {text}",
-                log_name="player_intent",
-                log_context=log_context
-            )
-
-            response = PlayerIntentionAnalyzer.Response()
-
-            lines = llm_response.split("\n")
-            for line in lines:
-                line = line.strip()
-                if line.startswith('trigger_dialog_topic'):
-                    triggered_topic = line.split(':')[1].strip()
-                    response.trigger_dialog_topic = self._match_exact_topic_name(known_topics, triggered_topic)
-                if line.startswith('list_available_dialog_topics'):
-                    response.list_available_dialog_topics = True
-                if line.startswith('npc_shut_up'):
-                    response.npc_shut_up = True
-                if line.startswith('npc_stop_combat'):
-                    response.npc_stop_combat = True
-                if line.startswith('npc_stop_follow'):
-                    response.npc_stop_follow = True
-                if line.startswith('npc_sheogorath_normal'):
-                    response.sheogorath_level = 'normal'
-                if line.startswith('npc_sheogorath_mad'):
-                    response.sheogorath_level = 'mad'
-
-            logger.debug(f"Player intention from {text} is {response}")
-
-            return response
-        finally:
-            self._lock.release()
+        if self._config.local_classifier:
+            result = self._classifier.classify(text, known_topics, target)
+            self.local_decisions[result.decision] = self.local_decisions.get(result.decision, 0) + 1
+            if result.decision != 'unsure':
+                response = self._parse_response(result.lines, known_topics)
+                logger.debug(f"Player intention from {text} is {response} (local)")
+                return response
+
+        instructions = self._build_instructions(text, known_topics, target)
+
+        # A session per call, so analyses of different lines don't wait for each other.
+        llm_session = self._llm.create_session(priority='high')
+        llm_session.reset(
+            system_instructions=instructions,
+            messages=[]
+        )
+
+        log_context = "\n".join([
+            f"Player intention analyzer",
+            f"Known topics: {known_topics}",
+        ])
+        llm_response = await llm_session.send_message(
+            user_text=f"(игрок говорит) {text}",
+            log_name="player_intent",
+            log_context=log_context
+        )
+
+        response = self._parse_response(llm_response.split("\n"), known_topics)
+
+        logger.debug(f"Player intention from {text} is {response}")
+
+        return response
+
+    def _parse_response(self, lines: list[str], known_topics: list[str]):
+        response = PlayerIntentionAnalyzer.Response()
+
+        for line in lines:
+            line = line.strip()
+            if line.startswith('trigger_dialog_topic'):
+                triggered_topic = line.split(':')[1].strip()
+                response.trigger_dialog_topic = self._match_exact_topic_name(known_topics, triggered_topic)
+            if line.startswith('list_available_dialog_topics'):
+                response.list_available_dialog_topics = True
+            if line.startswith('npc_shut_up'):
+                response.npc_shut_up = True
+            if line.startswith('npc_stop_combat'):
+                response.npc_stop_combat = True
+            if line.startswith('npc_stop_follow'):
+                response.npc_stop_follow = True
+            if line.startswith('npc_sheogorath_normal'):
+                response.sheogorath_level = 'normal'
+            if line.startswith('npc_sheogorath_mad'):
+                response.sheogorath_level = 'mad'
+
+        return response
 
     def _build_instructions(self, text: str, known_topics: list[str], target: Optional[ActorRef]) -> str:
         b = PromptBuilder()
@@ -0,0 +1,112 @@
+import math
+import re
+from typing import Literal, NamedTuple, Optional
+
+from eventbus.data.actor_ref import ActorRef
+
+PlayerIntentionDecision = Literal['none', 'intent', 'unsure']
+
+
+# Rule-based classifier for the fixed player intentions, it runs ahead of the LLM in PlayerIntentionAnalyzer.
+# 'intent' and 'none' are confident answers, 'unsure' means the text looks intent-like but only the LLM can tell.
+# Lines use the same format as the LLM answer, e.g. 'npc_shut_up' or 'trigger_dialog_topic:задания'.
+class PlayerIntentionClassifier:
+    class Result(NamedTuple):
+        decision: PlayerIntentionDecision
+        lines: list[str]
+
+    # (intent, pattern) matched against the normalized text, see _normalize.
+    _RULES: list[tuple[str, str]] = [
+        ('npc_shut_up', r'\b(за|по)?молчи(те)?\b|\b(за|по)?молчать\b|\bумолкни(те)?\b|\bзаткн|\bзакрой(те)? (свой |свои |ваши )?(рот|рты|пасть|пасти)'
+                        r'|\b(хватит|прекрати(те)?|перестань(те)?) (болтать|трепаться|говорить|галдеть|орать|шуметь)'),
+        ('npc_stop_combat', r'\b(хватит|прекрати(те)?|перестань(те)?|не надо|стоп) (драться|драку|биться|бой|сражаться|сражение|битву|воевать)'
+                            r'|\bне дерит|\bне дерись|\bостанови(те)? (бой|драку|сражение|битву)'
+                            r'|\b(опусти(те)?|убери(те)?) (оружие|мечи|клинки)'),
+        ('npc_stop_follow', r'\b(хватит|прекрати|перестань|не надо|не нужно) (следовать|ходить|идти|таскаться)( за мной)?'
+                            r'|\b(не|хватит) (ходи|иди|следуй|таскайся) за мной|\bотстань|\bотвяжись'
+                            r'|\b(жди|ждите|оставайся|останься|стой) (здесь|тут)'),
+    ]
+
+    _OPINION = r'\b(что|как) (вы |ты )?(думаете|думаешь|считаете|считаешь|скажете|скажешь)|\bваше мнение|\bтвое мнение|\bкто (что )?думает'
+    _INSULTS = r'\b(идиот|дурак|дур(ы|ни)|туп|болван|кретин|придур|ублюд|свин|бестолоч|недоумк|олух|дебил)'
+
+    _LIST_TOPICS = r'\b(о чем|про что|какие тем|на какие тем|список тем|какие вопросы)'
+
+    # 'не' right before a command or up to two words before it, e.g. 'не молчи', 'я не хочу молчать'.
+    _NEGATION = r'\bне ([а-яa-z0-9-]+ ){0,2}$'
+
+    # Anything intent-like which the rules above could not resolve goes to the LLM.
+    _CUES = (r'предмет|молч|молк|тих|тиш|драк|дерит|дерись|драть|бой|бить|сраж|оруж|следо|следу|за мной'
+             r'|отстан|мнени|думает|думаешь|считает|считаешь|скажете|скажешь')
+
+    def classify(self, text: str, known_topics: list[str], target: Optional[ActorRef]) -> Result:
+        normalized = self._normalize(text)
+
+        if 'предметно' in normalized:
+            if re.search(PlayerIntentionClassifier._LIST_TOPICS, normalized):
+                return PlayerIntentionClassifier.Result('intent', ['list_available_dialog_topics'])
+
+            topic = self._match_topic(normalized, known_topics)
+            if topic is not None:
+                return PlayerIntentionClassifier.Result('intent', [f"trigger_dialog_topic:{topic}"])
+
+            return PlayerIntentionClassifier.Result('unsure', [])
+
+        lines: list[str] = []
+        for (intent, pattern) in PlayerIntentionClassifier._RULES:
+            matches = list(re.finditer(pattern, normalized))
+            if any(map(lambda m: re.search(PlayerIntentionClassifier._NEGATION, normalized[:m.start()]), matches)):
+                return PlayerIntentionClassifier.Result('unsure', [])
+            if len(matches) > 0:
+                lines.append(intent)
+
+        if target is None and re.search(PlayerIntentionClassifier._OPINION, normalized):
+            if re.search(PlayerIntentionClassifier._INSULTS, normalized):
+                lines.append('npc_sheogorath_mad')
+            else:
+                lines.append('npc_sheogorath_normal')
+
+        if len(lines) > 0:
+            return PlayerIntentionClassifier.Result('intent', lines)
+
+        if re.search(PlayerIntentionClassifier._CUES, normalized):
+            return PlayerIntentionClassifier.Result('unsure', [])
+
+        return PlayerIntentionClassifier.Result('none', ['none'])
+
+    # A topic matches if all of its words are in the text, allowing for different word endings,
+    # and no other topic with as many words matches as well. The cue word itself is not matched against topics.
+    def _match_topic(self, normalized: str, known_topics: list[str]) -> Optional[str]:
+        text_words = list(filter(lambda w: w != 'предметно', normalized.split(' ')))
+
+        matched: list[tuple[int, str]] = []
+        for topic in known_topics:
+            topic_words = list(filter(lambda w: len(w) > 2, self._normalize(topic).split(' ')))
+            if len(topic_words) > 0 and all(map(lambda w: any(map(lambda t: self._is_same_word(w, t), text_words)), topic_words)):
+                matched.append((len(topic_words), topic))
+
+        if len(matched) == 0:
+            return None
+
+        matched.sort(reverse=True)
+        if len(matched) > 1 and matched[0][0] == matched[1][0]:
+            return None
+        return matched[0][1]
+
+    # Russian words mostly change at the end, e.g. 'задания'/'заданием', 'слухи'/'слухах'.
+    # The common stem must cover most of the topic word `a`, a short common prefix like 'пред' is not enough.
+    def _is_same_word(self, a: str, b: str):
+        if a == b:
+            return True
+
+        min_common = max(3, math.ceil(len(a) * 0.6), min(4, len(a) - 1))
+        common = 0
+        for (ca, cb) in zip(a, b):
+            if ca != cb:
+                break
+            common = common + 1
+        return common >= min_common
+
+    def _normalize(self, text: str):
+        text = text.lower().replace('ё', 'е')
+        return ' '.join(re.findall(r'[а-яa-z0-9]+(?:-[а-яa-z0-9]+)*', text))
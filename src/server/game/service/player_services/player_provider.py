@@ -1,12 +1,32 @@
 import asyncio
+import time
+from typing import Optional
+from eventbus.event import Event
+from eventbus.event_consumer import EventConsumer
 from eventbus.rpc import Rpc
 from game.data.player import Player
+from util.logger import Logger
+from util.state_delta import StateDelta
+
+logger = Logger(__name__)
 
 
 class PlayerProvider:
-    def __init__(self, rpc: Rpc, player: Player):
+    FULL_POLL_INTERVAL_SEC = 30.0
+    FAST_POLL_INTERVAL_SEC = 5.0
+
+    # While the game pushes player_state_delta, polling only guards against lost or missed deltas.
+    FAST_POLL_FALLBACK_INTERVAL_SEC = 60.0
+
+    # The game pushes player_state_delta every 0.5 s, even an empty one. Without any for this long polling is back to normal.
+    DELTA_TIMEOUT_SEC = 1.0
+
+    def __init__(self, rpc: Rpc, player: Player, consumer: EventConsumer):
         self._rpc = rpc
         self._local_player = player
+        self._last_delta_at: Optional[float] = None
+
+        consumer.register_handler(self._handle_state_delta, ['player_state_delta'])
 
         asyncio.get_event_loop().create_task(self._query_player())
         asyncio.get_event_loop().create_task(self._query_player_fast())
@@ -15,17 +35,34 @@ class PlayerProvider:
     def local_player(self):
         return self._local_player
 
+    async def _handle_state_delta(self, event: Event):
+        if event.data.type == 'player_state_delta':
+            self._last_delta_at = time.monotonic()
+            updated = StateDelta.merge(self._local_player.player_data, event.data)
+            if len(updated) > 0:
+                logger.debug(f"Player state delta updated {updated}")
+
+    def _get_fast_poll_interval(self) -> float:
+        if self._last_delta_at is None or time.monotonic() - self._last_delta_at > PlayerProvider.DELTA_TIMEOUT_SEC:
+            return PlayerProvider.FAST_POLL_INTERVAL_SEC
+        return PlayerProvider.FAST_POLL_FALLBACK_INTERVAL_SEC
+
     async def _query_player(self):
         while True:
-            await asyncio.sleep(30)
+            await asyncio.sleep(PlayerProvider.FULL_POLL_INTERVAL_SEC)
 
             player_data = await self._rpc.get_local_player()
             self._local_player.player_data = player_data
 
     async def _query_player_fast(self):
+        # Wakes up at the shortest interval, so stopped deltas are noticed without waiting out the long one.
+        last_poll_at = time.monotonic()
         while True:
-            await asyncio.sleep(5)
+            await asyncio.sleep(PlayerProvider.FAST_POLL_INTERVAL_SEC)
+            if time.monotonic() - last_poll_at < self._get_fast_poll_interval():
+                continue
 
+            last_poll_at = time.monotonic()
             player_data_fast = await self._rpc.get_local_player_fast()
 
             self._local_player.player_data.cell = player_data_fast.cell
@@ -0,0 +1,116 @@
+import asyncio
+import difflib
+import traceback
+from typing import Any, Callable, Coroutine, Optional
+
+from pydantic import BaseModel, Field
+
+from game.service.player_services.player_intention_analyzer import PlayerIntentionAnalyzer
+from util.logger import Logger
+
+logger = Logger(__name__)
+
+
+class PlayerSpeechSpeculatorStats(BaseModel):
+    hits: int
+    misses: dict[str, int]
+
+
+# Starts player intention analysis on a partial speech-to-text result once it stops changing for a while,
+# i.e. the player made a pause, so the LLM call is mostly done by the time the final text arrives.
+# The result is used only if the final text is close enough to the partial one.
+class PlayerSpeechSpeculator:
+    class Config(BaseModel):
+        enabled: bool = Field(default=False)
+
+        # The partial text is stable when no other partial result arrives within this time.
+        stable_sec: float = Field(default=0.3, ge=0.0)
+        min_words: int = Field(default=2, ge=1)
+
+        # Ratio from difflib.SequenceMatcher between the partial and the final text, 1.0 is an exact match.
+        similarity_threshold: float = Field(default=0.9, ge=0.0, le=1.0)
+
+    def __init__(
+        self,
+        config: Config,
+        analyze: Callable[[str], Coroutine[Any, Any, PlayerIntentionAnalyzer.Response]]
+    ) -> None:
+        self._config = config
+        self._analyze = analyze
+
+        self._partial_text = ''
+        self._stable_timer: Optional[asyncio.TimerHandle] = None
+
+        self._text: Optional[str] = None
+        self._task: Optional[asyncio.Task[PlayerIntentionAnalyzer.Response]] = None
+
+        self.hits = 0
+        self.misses: dict[str, int] = {}
+
+    def on_partial_text(self, text: str):
+        if not self._config.enabled or text == self._partial_text:
+            return
+
+        self._partial_text = text
+        if self._stable_timer:
+            self._stable_timer.cancel()
+            self._stable_timer = None
+
+        if len(text.split()) >= self._config.min_words:
+            self._stable_timer = asyncio.get_event_loop().call_later(self._config.stable_sec, self._start, text)
+
+    # Returns the intention analyzed ahead of time if it is for about the same text, waiting for it if needed.
+    async def take(self, final_text: str) -> Optional[PlayerIntentionAnalyzer.Response]:
+        if self._stable_timer:
+            self._stable_timer.cancel()
+            self._stable_timer = None
+        self._partial_text = ''
+
+        task = self._task
+        text = self._text
+        self._task = None
+        self._text = None
+        if task is None or text is None:
+            return None
+
+        similarity = self.get_similarity(text, final_text)
+        if similarity < self._config.similarity_threshold:
+            task.cancel()
+            logger.debug(f"Speculative player intention is discarded, similarity={similarity:.2f}: '{text}' vs '{final_text}'")
+            self._add_miss('mismatch')
+            return None
+
+        try:
+            response = await task
+        except Exception as error:
+            logger.error(f"Speculative player intention analysis failed: {error}")
+            logger.debug(traceback.format_exc())
+            self._add_miss('failed')
+            return None
+
+        self.hits = self.hits + 1
+        logger.debug(f"Using speculative player intention for '{text}', similarity={similarity:.2f}")
+        return response
+
+    def get_stats(self):
+        return PlayerSpeechSpeculatorStats(hits=self.hits, misses=self.misses.copy())
+
+    @staticmethod
+    def get_similarity(a: str, b: str) -> float:
+        return difflib.SequenceMatcher(None, a.lower(), b.lower()).ratio()
+
+    def _start(self, text: str):
+        self._stable_timer = None
+
+        if self._task is not None:
+            if self._text == text:
+                return
+            self._task.cancel()
+            self._add_miss('replaced')
+
+        logger.debug(f"Speculatively analyzing player intention for '{text}'")
+        self._text = text
+        self._task = asyncio.get_event_loop().create_task(self._analyze(text))
+
+    def _add_miss(self, reason: str):
+        self.misses[reason] = self.misses.get(reason, 0) + 1
@@ -19,7 +19,8 @@ class DialogProvider:
 
         self.on_topic_story_item_update: Callable[[ActorRef], None] | None = None
 
-        consumer.register_handler(self._handle_event)
+        consumer.register_handler(
+            self._handle_event, ['dialog_open', 'dialog_update', 'dialog_close', 'get_local_player_response', 'player_state_delta'])
 
     async def _handle_event(self, event: Event):
         if event.data.type == 'dialog_open':
@@ -47,6 +48,9 @@ class DialogProvider:
             self.is_in_dialog = False
         elif event.data.type == 'get_local_player_response':
             self.is_in_dialog = event.data.player_data.in_dialog
+        elif event.data.type == 'player_state_delta':
+            if event.data.in_dialog is not None:
+                self.is_in_dialog = event.data.in_dialog
 
     # def _update_story_if_needed(self, actor: ActorRef, story: Story):
     #     is_story_changed = False
@@ -1,14 +1,33 @@
 import asyncio
+import time
+from typing import Optional
 from eventbus.data.env_data import EnvData
+from eventbus.event import Event
+from eventbus.event_consumer import EventConsumer
 from eventbus.rpc import Rpc
 from game.data.time import GameTime, Time
 from util.logger import Logger
+from util.state_delta import StateDelta
+
+logger = Logger(__name__)
 
 
 class EnvProvider:
-    def __init__(self, env_data: EnvData, rpc: Rpc) -> None:
+    POLL_INTERVAL_SEC = 15.0
+
+    # While the game pushes env_state_delta, polling only guards against lost deltas.
+    # Ashfall data is not pushed, so with Ashfall the env is still polled at POLL_INTERVAL_SEC.
+    POLL_FALLBACK_INTERVAL_SEC = 120.0
+
+    # The game pushes env_state_delta every second, even an empty one. Without any for this long polling is back to normal.
+    DELTA_TIMEOUT_SEC = 2.0
+
+    def __init__(self, env_data: EnvData, rpc: Rpc, consumer: EventConsumer) -> None:
         self._env: EnvData = env_data
         self._rpc = rpc
+        self._last_delta_at: Optional[float] = None
+
+        consumer.register_handler(self._handle_state_delta, ['env_state_delta'])
 
         asyncio.get_event_loop().create_task(self._update_env_loop())
 
@@ -21,11 +40,30 @@ class EnvProvider:
     def env(self):
         return self._env
 
+    async def _handle_state_delta(self, event: Event):
+        if event.data.type == 'env_state_delta':
+            self._last_delta_at = time.monotonic()
+            updated = StateDelta.merge(self._env, event.data)
+            if len(updated) > 0:
+                logger.debug(f"Env state delta updated {updated}")
+
+    def _get_poll_interval(self) -> float:
+        if self._env.ashfall is not None:
+            return EnvProvider.POLL_INTERVAL_SEC
+        if self._last_delta_at is None or time.monotonic() - self._last_delta_at > EnvProvider.DELTA_TIMEOUT_SEC:
+            return EnvProvider.POLL_INTERVAL_SEC
+        return EnvProvider.POLL_FALLBACK_INTERVAL_SEC
+
     async def _update_env_loop(self):
         Logger.set_ctx(f"EnvProvider")
 
+        # Wakes up at the shortest interval, so stopped deltas are noticed without waiting out the long one.
+        last_poll_at = time.monotonic()
         while True:
-            await asyncio.sleep(15.0)
+            await asyncio.sleep(EnvProvider.POLL_INTERVAL_SEC)
+            if time.monotonic() - last_poll_at < self._get_poll_interval():
+                continue
 
+            last_poll_at = time.monotonic()
             env_data = await self._rpc.get_env()
             self._env = env_data
@@ -0,0 +1,118 @@
+import asyncio
+import traceback
+from typing import Any, Callable, Coroutine, Optional
+
+from pydantic import BaseModel, Field
+
+from game.data.npc import Npc
+from game.data.story_item import StoryItemDataAlias
+from game.service.npc_services.npc_behavior_service import NpcBehaviorService
+from game.service.npc_services.npc_llm_pick_actor_service import NpcLlmPickActorService
+from game.service.npc_services.npc_speech_stream import NpcSpeechStream
+from tts.response import TtsResponse
+from util.logger import Logger
+
+logger = Logger(__name__)
+
+
+# Everything needed to play one turn of the story: who acts and, for an NPC, what it says and how it sounds.
+class NpcTurn:
+    def __init__(self, hearing_npcs: list[Npc], actor_pick_response: NpcLlmPickActorService.Response) -> None:
+        self.hearing_npcs = hearing_npcs
+        self.actor_pick_response = actor_pick_response
+
+        self.npc: Optional[Npc] = None
+        self.behavior_request: Optional[NpcBehaviorService.Request] = None
+        self.behavior_response: Optional[NpcBehaviorService.Response] = None
+
+        # Behavior response items after NPC intention analysis.
+        self.item_data_list: list[StoryItemDataAlias] = []
+
+        # Index in item_data_list to the audio converted ahead of time.
+        self.voiceovers: dict[int, TtsResponse] = {}
+
+        # The NPC line which is being said while it is generated.
+        self.speech_stream: Optional[NpcSpeechStream] = None
+
+
+class NpcTurnPipelineStats(BaseModel):
+    hits: int
+    misses: dict[str, int]
+
+
+# Prepares the next turn (actor pick, LLM response, TTS) while the current NPC line is still playing,
+# so the next speaker doesn't wait for the whole generation once the scene is unlocked.
+# The prepared turn is thrown away when anything changes the story before it is used.
+class NpcTurnPipeline:
+    class Config(BaseModel):
+        enabled: bool = Field(default=False)
+
+    def __init__(self, config: Config, prepare: Callable[[], Coroutine[Any, Any, Optional[NpcTurn]]]) -> None:
+        self._config = config
+        self._prepare = prepare
+
+        self._task: Optional[asyncio.Task[Optional[NpcTurn]]] = None
+
+        self.hits = 0
+        self.misses: dict[str, int] = {}
+
+    @property
+    def enabled(self):
+        return self._config.enabled
+
+    def start(self):
+        if not self._config.enabled:
+            return
+
+        self.invalidate('restarted')
+        self._task = asyncio.get_event_loop().create_task(self._prepare())
+
+    def invalidate(self, reason: str):
+        if self._task is None:
+            return
+
+        task = self._task
+        self._task = None
+        task.cancel()
+
+        logger.debug(f"Prepared NPC turn is discarded: {reason}")
+        self._add_miss(reason)
+
+    # Waits for the turn being prepared if it is not ready yet, that is still sooner than starting over.
+    # The turn may get discarded while waiting, then nothing is returned.
+    async def take(self) -> Optional[NpcTurn]:
+        task = self._task
+        if task is None:
+            return None
+
+        await asyncio.wait([task])
+        if self._task is not task:
+            return None
+        self._task = None
+
+        turn: Optional[NpcTurn] = None
+        error = task.exception()
+        if error is not None:
+            logger.error(f"Failed to prepare NPC turn: {error}")
+            logger.debug("".join(traceback.format_exception(error)))
+        else:
+            turn = task.result()
+
+        if turn is None:
+            self._add_miss('failed')
+            return None
+
+        self.hits = self.hits + 1
+        logger.info(f"Using prepared NPC turn for {turn.actor_pick_response.actor_to_act}, hit rate {self._format_hit_rate()}")
+        return turn
+
+    def get_stats(self):
+        return NpcTurnPipelineStats(hits=self.hits, misses=self.misses.copy())
+
+    def _add_miss(self, reason: str):
+        self.misses[reason] = self.misses.get(reason, 0) + 1
+        logger.debug(f"NPC turn pipeline hit rate {self._format_hit_rate()}")
+
+    def _format_hit_rate(self):
+        total = self.hits + sum(self.misses.values())
+        return f"{self.hits}/{total}"
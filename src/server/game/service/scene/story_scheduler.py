@@ -0,0 +1,81 @@
+import asyncio
+import traceback
+from typing import Any, Callable, Coroutine
+
+from pydantic import BaseModel, Field
+
+from util.logger import Logger
+
+logger = Logger(__name__)
+
+
+# Runs the story step when something relevant happened (new story item, scene unlock, end of NPC audio)
+# instead of polling: wakes coming in a burst are debounced into a single run, and the idle timeout
+# still runs the step from time to time so NPCs can make random comments in silence.
+class StoryScheduler:
+    class Config(BaseModel):
+        # Wakes within this window after the first one are handled by a single run.
+        debounce_sec: float = Field(default=0.05, ge=0.0)
+
+        # Runs the step after this much time without any wake, the same pace as the old one-second loop.
+        # A longer timeout such as 5 s saves idle runs but makes random comments in silence rarer.
+        idle_timeout_sec: float = Field(default=1.0, gt=0.0)
+
+    IDLE_REASON = 'idle'
+
+    def __init__(
+        self,
+        config: Config,
+        can_run: Callable[[], bool],
+        run: Callable[[], Coroutine[Any, Any, None]]
+    ) -> None:
+        self._config = config
+        self._can_run = can_run
+        self._run = run
+
+        self._wake = asyncio.Event()
+        self._wake_reasons: set[str] = set()
+        self._is_running = False
+
+        self.wakes: dict[str, int] = {}
+        self.runs = 0
+
+    @property
+    def is_running(self):
+        return self._is_running
+
+    def start(self):
+        asyncio.get_event_loop().create_task(self._loop())
+
+    def wake(self, reason: str):
+        self.wakes[reason] = self.wakes.get(reason, 0) + 1
+        self._wake_reasons.add(reason)
+        self._wake.set()
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._config.idle_timeout_sec)
+                if self._config.debounce_sec > 0:
+                    await asyncio.sleep(self._config.debounce_sec)
+            except TimeoutError:
+                self.wake(StoryScheduler.IDLE_REASON)
+
+            reasons = self._wake_reasons
+            self._wake_reasons = set()
+            self._wake.clear()
+
+            if not self._can_run():
+                continue
+
+            logger.debug(f"Story step is woken up by {','.join(sorted(reasons))}")
+
+            self._is_running = True
+            try:
+                await self._run()
+                self.runs = self.runs + 1
+            except Exception as error:
+                logger.error(f"Story step failed: {error}")
+                logger.debug(traceback.format_exc())
+            finally:
+                self._is_running = False
@@ -62,9 +62,9 @@ class StoryItemToHistoryConverter:
             case 'npc_trigger_dialog_topic':
                 return f"({delta_str}{initiator} рассказал{a} {target_dat} про {d.topic_name}) {d.topic_response}"
             case 'player_trigger_dialog_topic':
-                return f"({delta_str}{initiator} попросил{a} рассказать {target_acc} про {d.trigger_topic}) {d.original_text}"
+                return f"({delta_str}{initiator} попросил{a} рассказать {target_acc} про {d.trigger_topic}){' ' + d.original_text if d.original_text else ''}"
             case 'player_trigger_list_dialog_topics':
-                return f"({delta_str}{initiator} попросил{a} рассказать {target_acc} про специальные темы) {d.original_text}"
+                return f"({delta_str}{initiator} попросил{a} рассказать {target_acc} про специальные темы){' ' + d.original_text if d.original_text else ''}"
             case 'npc_attack':
                 return f"({delta_str}{initiator} решил{a} атаковать {target_acc})"
             case 'ashfall_eat_stew':
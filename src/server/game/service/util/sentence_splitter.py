@@ -0,0 +1,64 @@
+from typing import Optional
+
+
+# Cuts streamed text into sentences as it arrives.
+# A sentence ends with '.', '!', '?' or '…' (possibly repeated and followed by closing quotes) and whitespace,
+# outside of parentheses and brackets, which hold non-verbal comments and prefixes like "(Я сказал Fargoth)".
+class SentenceSplitter:
+    _ENDS = ".!?…"
+    _CLOSING = "\"'»”)]"
+
+    def __init__(self, min_chars: int = 1) -> None:
+        self._min_chars = min_chars
+        self._text = ''
+        self._scanned = 0
+        self._start = 0
+        self._depth = 0
+
+    # Returns the sentences completed by the delta, sentences shorter than min_chars are joined with the next one.
+    def add(self, delta: str) -> list[str]:
+        self._text = self._text + delta
+        sentences: list[str] = []
+
+        i = self._scanned
+        while i < len(self._text):
+            c = self._text[i]
+            if c in '([':
+                self._depth = self._depth + 1
+            elif c in ')]':
+                self._depth = max(0, self._depth - 1)
+            elif c in SentenceSplitter._ENDS and self._depth == 0:
+                end = i + 1
+                while end < len(self._text) and (self._text[end] in SentenceSplitter._ENDS or self._text[end] in SentenceSplitter._CLOSING):
+                    end = end + 1
+                if end == len(self._text):
+                    # More punctuation or the whitespace may come with the next delta.
+                    break
+
+                if self._text[end].isspace():
+                    sentence = self._cut(end)
+                    if sentence is not None:
+                        sentences.append(sentence)
+                i = end
+                continue
+            i = i + 1
+
+        self._scanned = i
+        return sentences
+
+    # Returns the rest of the text once the stream is over.
+    def flush(self) -> Optional[str]:
+        sentence = self._text[self._start:].strip()
+        self._text = ''
+        self._scanned = 0
+        self._start = 0
+        self._depth = 0
+        return sentence if len(sentence) > 0 else None
+
+    def _cut(self, end: int) -> Optional[str]:
+        sentence = self._text[self._start:end].strip()
+        if len(sentence) < self._min_chars:
+            return None
+
+        self._start = end
+        return sentence
@@ -1,13 +1,21 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from llm.message import LlmMessage
+from llm.request_pool import LlmRequestPriority
+from llm.token_usage import LlmTokenUsage
 
 
 class LlmBackendRequest(BaseModel):
     system_instructions: str
     history: list[LlmMessage]
     text: str
+    priority: LlmRequestPriority = Field(default='normal')
+
+    # Length of the system instructions beginning which stays the same from call to call,
+    # backends mark it for the provider's prompt cache.
+    system_instructions_stable_prefix_len: int = Field(default=0)
 
 
 class LlmBackendResponse(BaseModel):
@@ -15,6 +23,15 @@ class LlmBackendResponse(BaseModel):
 
 
 class AbstractLlmBackend(ABC):
+    def __init__(self) -> None:
+        self.token_usage = LlmTokenUsage()
+
     @abstractmethod
     async def send(self, request: LlmBackendRequest) -> LlmBackendResponse:
         pass
+
+    # Yields the response text in pieces as the model generates it.
+    # Backends without streaming yield the whole response at once.
+    async def stream(self, request: LlmBackendRequest) -> AsyncIterator[str]:
+        response = await self.send(request)
+        yield response.text
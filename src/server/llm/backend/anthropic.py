@@ -1,12 +1,14 @@
 import asyncio
 import time
-from typing import Any
+from typing import Any, AsyncIterator, Optional
 from util.logger import Logger
 
 from pydantic import BaseModel, Field
 from llm.backend.abstract import AbstractLlmBackend, LlmBackendRequest, LlmBackendResponse
+from llm.request_pool import LlmRequestPool
 
 import anthropic
+from anthropic.types import Usage
 
 logger = Logger(__name__)
 
@@ -16,47 +18,37 @@ class AnthropicLlmBackend(AbstractLlmBackend):
         api_key: str
         model_name: str
 
+        # With 'system' the instructions go to the system prompt, any other role sends them as the first message.
         system_instructions_role: str = Field(default='system')
         max_tokens: int = Field(default=1024)
         temperature: float = Field(default=0.7)
+        max_concurrent_requests: int = Field(default=4, ge=1)
+
+        # Cancelled requests close their connection right away, this only bounds a stuck one.
+        timeout_sec: float = Field(default=60.0)
+
+        # Marks the stable beginning of the system instructions with a cache breakpoint,
+        # the provider then reads it from its cache for a few minutes instead of processing it again.
+        prompt_caching: bool = Field(default=True)
 
     def __init__(self, config: Config) -> None:
         super().__init__()
 
         self._config = config
-        self._lock = asyncio.Lock()
+        self._pool = LlmRequestPool(self._config.max_concurrent_requests)
 
-        self._client = anthropic.Anthropic(api_key=self._config.api_key)
+        self._client = anthropic.AsyncAnthropic(api_key=self._config.api_key, timeout=self._config.timeout_sec)
 
     async def send(self, request: LlmBackendRequest) -> LlmBackendResponse:
-        await self._lock.acquire()
+        await self._pool.acquire(request.priority)
         try:
-            history: list[Any] = []
-
-            if len(request.system_instructions) > 0:
-                history.append({
-                    "role": self._config.system_instructions_role,
-                    "content": request.system_instructions
-                })
-
-            for m in request.history:
-                role = "user"
-                if m.role == 'user':
-                    role = "user"
-                elif m.role == 'model':
-                    role = "assistant"
-                else:
-                    raise Exception(f"Unknown role '{m.role}'")
-
-                history.append({
-                    "role": role,
-                    "content": m.text
-                })
+            (system, history) = self._build_prompt(request)
 
             t0 = time.time()
             logger.debug(f"Sent request to the model, waiting...")
-            response = self._client.messages.create(
+            response = await self._client.messages.create(
                 model=self._config.model_name,
+                system=system,
                 messages=history,
                 max_tokens=self._config.max_tokens,
                 temperature=self._config.temperature,
@@ -65,6 +57,7 @@ class AnthropicLlmBackend(AbstractLlmBackend):
             dt = time.time() - t0
             logger.debug(f"Response from the model received in {dt} sec")
             logger.debug(f"> {response}")
+            self._add_token_usage(response.usage, response.usage.output_tokens)
 
             text: str = ''
             if response.content and response.content[0].type == 'text':
@@ -76,5 +69,115 @@ class AnthropicLlmBackend(AbstractLlmBackend):
             return LlmBackendResponse(
                 text=text
             )
+        except asyncio.CancelledError:
+            logger.debug("Request to the model was cancelled")
+            raise
+        finally:
+            self._pool.release()
+
+    async def stream(self, request: LlmBackendRequest) -> AsyncIterator[str]:
+        await self._pool.acquire(request.priority)
+        try:
+            (system, history) = self._build_prompt(request)
+
+            t0 = time.time()
+            logger.debug("Sent streaming request to the model, waiting...")
+            stream = await self._client.messages.create(
+                model=self._config.model_name,
+                system=system,
+                messages=history,
+                max_tokens=self._config.max_tokens,
+                temperature=self._config.temperature,
+                stream=True,
+            )
+            usage: Optional[Usage] = None
+            output_tokens = 0
+            try:
+                is_first = True
+                async for event in stream:
+                    # Input tokens come with the first event, output tokens are updated with the last ones.
+                    if event.type == 'message_start':
+                        usage = event.message.usage
+                    elif event.type == 'message_delta':
+                        output_tokens = event.usage.output_tokens
+                    if event.type != 'content_block_delta' or event.delta.type != 'text_delta':
+                        continue
+                    if is_first:
+                        logger.debug(f"First piece of the response received in {time.time() - t0} sec")
+                        is_first = False
+                    yield event.delta.text
+            finally:
+                await stream.close()
+            self._add_token_usage(usage, output_tokens)
+            logger.debug(f"Streamed response from the model received in {time.time() - t0} sec")
+        except asyncio.CancelledError:
+            logger.debug("Streaming request to the model was cancelled")
+            raise
         finally:
-            self._lock.release()
+            self._pool.release()
+
+    def _add_token_usage(self, usage: Optional[Usage], output_tokens: int):
+        if usage is None:
+            return
+
+        cached_tokens = usage.cache_read_input_tokens or 0
+        cache_write_tokens = usage.cache_creation_input_tokens or 0
+
+        # Anthropic counts only the tokens after the last cache breakpoint as input tokens.
+        self.token_usage.add(
+            input_tokens=usage.input_tokens + cached_tokens + cache_write_tokens,
+            cached_input_tokens=cached_tokens,
+            cache_write_input_tokens=cache_write_tokens,
+            output_tokens=output_tokens
+        )
+
+    def _build_prompt(self, request: LlmBackendRequest):
+        system: Any = anthropic.NOT_GIVEN
+        history: list[Any] = []
+
+        system_content = self._build_system_content(request)
+        if len(system_content) > 0:
+            if self._config.system_instructions_role == 'system':
+                system = system_content
+            else:
+                history.append({
+                    "role": self._config.system_instructions_role,
+                    "content": system_content
+                })
+
+        for m in request.history:
+            role = "user"
+            if m.role == 'user':
+                role = "user"
+            elif m.role == 'model':
+                role = "assistant"
+            else:
+                raise Exception(f"Unknown role '{m.role}'")
+
+            history.append({
+                "role": role,
+                "content": m.text
+            })
+
+        return (system, history)
+
+    def _build_system_content(self, request: LlmBackendRequest):
+        content: list[Any] = []
+
+        stable_prefix_len = request.system_instructions_stable_prefix_len if self._config.prompt_caching else 0
+        stable_prefix = request.system_instructions[:stable_prefix_len]
+        rest = request.system_instructions[len(stable_prefix):]
+
+        if len(stable_prefix.strip()) > 0:
+            content.append({
+                "type": "text",
+                "text": stable_prefix,
+                "cache_control": {"type": "ephemeral"}
+            })
+        if len(rest.strip()) > 0:
+            content.append({
+                "type": "text",
+                "text": rest
+            })
+
+        return content
@@ -1,5 +1,41 @@
+import asyncio
+from typing import AsyncIterator
+
+from pydantic import BaseModel, Field
 from llm.backend.abstract import AbstractLlmBackend, LlmBackendRequest, LlmBackendResponse
+from llm.request_pool import LlmRequestPool
 
 class DummyLlmBackend(AbstractLlmBackend):
+    class Config(BaseModel):
+        # Emulates the time a real model takes to respond.
+        latency_sec: float = Field(default=0.0)
+        max_concurrent_requests: int = Field(default=4, ge=1)
+        response_text: str = Field(default="Hello, I am dummy LLM emulator.")
+
+    def __init__(self, config: Config) -> None:
+        super().__init__()
+
+        self._config = config
+        self._pool = LlmRequestPool(self._config.max_concurrent_requests)
+
     async def send(self, request: LlmBackendRequest) -> LlmBackendResponse:
-        return LlmBackendResponse(text="Hello, I am dummy LLM emulator.")
+        await self._pool.acquire(request.priority)
+        try:
+            if self._config.latency_sec > 0:
+                await asyncio.sleep(self._config.latency_sec)
+
+            return LlmBackendResponse(text=self._config.response_text)
+        finally:
+            self._pool.release()
+
+    # Yields the response word by word, latency_sec is spread over the words.
+    async def stream(self, request: LlmBackendRequest) -> AsyncIterator[str]:
+        await self._pool.acquire(request.priority)
+        try:
+            words = self._config.response_text.split(' ')
+            for (i, word) in enumerate(words):
+                if self._config.latency_sec > 0:
+                    await asyncio.sleep(self._config.latency_sec / len(words))
+                yield word if i == 0 else f" {word}"
+        finally:
+            self._pool.release()
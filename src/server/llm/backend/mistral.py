@@ -5,6 +5,7 @@ from util.logger import Logger
 
 from pydantic import BaseModel, Field
 from llm.backend.abstract import AbstractLlmBackend, LlmBackendRequest, LlmBackendResponse
+from llm.request_pool import LlmRequestPool
 
 from mistralai import Mistral
 
@@ -19,43 +20,27 @@ class MistralLlmBackend(AbstractLlmBackend):
         system_instructions_role: str = Field(default='system')
         max_tokens: int = Field(default=1024)
         temperature: float = Field(default=0.7)
+        max_concurrent_requests: int = Field(default=4, ge=1)
+
+        # Cancelled requests close their connection right away, this only bounds a stuck one.
+        timeout_sec: float = Field(default=60.0)
 
     def __init__(self, config: Config) -> None:
         super().__init__()
 
         self._config = config
-        self._lock = asyncio.Lock()
+        self._pool = LlmRequestPool(self._config.max_concurrent_requests)
 
-        self._client = Mistral(api_key=self._config.api_key)
+        self._client = Mistral(api_key=self._config.api_key, timeout_ms=round(self._config.timeout_sec * 1000))
 
     async def send(self, request: LlmBackendRequest) -> LlmBackendResponse:
-        await self._lock.acquire()
+        await self._pool.acquire(request.priority)
         try:
-            history: list[Any] = []
-
-            if len(request.system_instructions) > 0:
-                history.append({
-                    "role": self._config.system_instructions_role,
-                    "content": request.system_instructions
-                })
-
-            for m in request.history:
-                role = "user"
-                if m.role == 'user':
-                    role = "user"
-                elif m.role == 'model':
-                    role = "assistant"
-                else:
-                    raise Exception(f"Unknown role '{m.role}'")
-
-                history.append({
-                    "role": role,
-                    "content": m.text
-                })
+            history = self._build_history(request)
 
             t0 = time.time()
             logger.debug(f"Sent request to the model, waiting...")
-            response = self._client.chat.complete(
+            response = await self._client.chat.complete_async(
                 model=self._config.model_name,
                 messages=history,
                 max_tokens=self._config.max_tokens,
@@ -65,6 +50,12 @@ class MistralLlmBackend(AbstractLlmBackend):
             dt = time.time() - t0
             logger.debug(f"Response from the model received in {dt} sec")
             logger.debug(f"> {response}")
+            # Mistral does not report cached tokens.
+            self.token_usage.add(
+                input_tokens=response.usage.prompt_tokens or 0,
+                cached_input_tokens=0,
+                output_tokens=response.usage.completion_tokens or 0
+            )
 
             text: str = ''
             if response.choices and response.choices[0].message.content:
@@ -76,5 +67,33 @@ class MistralLlmBackend(AbstractLlmBackend):
             return LlmBackendResponse(
                 text=text
             )
+        except asyncio.CancelledError:
+            logger.debug("Request to the model was cancelled")
+            raise
         finally:
-            self._lock.release()
+            self._pool.release()
+
+    def _build_history(self, request: LlmBackendRequest):
+        history: list[Any] = []
+
+        if len(request.system_instructions) > 0:
+            history.append({
+                "role": self._config.system_instructions_role,
+                "content": request.system_instructions
+            })
+
+        for m in request.history:
+            role = "user"
+            if m.role == 'user':
+                role = "user"
+            elif m.role == 'model':
+                role = "assistant"
+            else:
+                raise Exception(f"Unknown role '{m.role}'")
+
+            history.append({
+                "role": role,
+                "content": m.text
+            })
+
+        return history
@@ -1,12 +1,14 @@
 import asyncio
 import time
-from typing import Any
+from typing import Any, AsyncIterator, Optional
 from util.logger import Logger
 
 from pydantic import BaseModel, Field
 from llm.backend.abstract import AbstractLlmBackend, LlmBackendRequest, LlmBackendResponse
+from llm.request_pool import LlmRequestPool
 
-from openai import OpenAI
+from openai import AsyncOpenAI
+from openai.types import CompletionUsage
 
 logger = Logger(__name__)
 
@@ -20,43 +22,27 @@ class OpenAiLlmBackend(AbstractLlmBackend):
         system_instructions_role: str = Field(default='system')
         max_tokens: int = Field(default=1024)
         temperature: float = Field(default=0.7)
+        max_concurrent_requests: int = Field(default=4, ge=1)
+
+        # Cancelled requests close their connection right away, this only bounds a stuck one.
+        timeout_sec: float = Field(default=60.0)
 
     def __init__(self, config: Config) -> None:
         super().__init__()
 
         self._config = config
-        self._lock = asyncio.Lock()
+        self._pool = LlmRequestPool(self._config.max_concurrent_requests)
 
-        self._client = OpenAI(api_key=self._config.api_key, base_url=self._config.base_url)
+        self._client = AsyncOpenAI(api_key=self._config.api_key, base_url=self._config.base_url, timeout=self._config.timeout_sec)
 
     async def send(self, request: LlmBackendRequest) -> LlmBackendResponse:
-        await self._lock.acquire()
+        await self._pool.acquire(request.priority)
         try:
-            history: list[Any] = []
-
-            if len(request.system_instructions) > 0:
-                history.append({
-                    "role": self._config.system_instructions_role,
-                    "content": request.system_instructions
-                })
-
-            for m in request.history:
-                role = "user"
-                if m.role == 'user':
-                    role = "user"
-                elif m.role == 'model':
-                    role = "assistant"
-                else:
-                    raise Exception(f"Unknown role '{m.role}'")
-
-                history.append({
-                    "role": role,
-                    "content": m.text
-                })
+            history = self._build_history(request)
 
             t0 = time.time()
             logger.debug(f"Sent request to the model, waiting...")
-            response = self._client.chat.completions.create(
+            response = await self._client.chat.completions.create(
                 model=self._config.model_name,
                 messages=history,
                 max_tokens=self._config.max_tokens,
@@ -66,6 +52,7 @@ class OpenAiLlmBackend(AbstractLlmBackend):
             dt = time.time() - t0
             logger.debug(f"Response from the model received in {dt} sec")
             logger.debug(f"> {response}")
+            self._add_token_usage(response.usage)
 
             text = response.choices[0].message.content
             if text:
@@ -77,5 +64,85 @@ class OpenAiLlmBackend(AbstractLlmBackend):
             return LlmBackendResponse(
                 text=text
             )
+        except asyncio.CancelledError:
+            logger.debug("Request to the model was cancelled")
+            raise
+        finally:
+            self._pool.release()
+
+    async def stream(self, request: LlmBackendRequest) -> AsyncIterator[str]:
+        await self._pool.acquire(request.priority)
+        try:
+            history = self._build_history(request)
+
+            t0 = time.time()
+            logger.debug("Sent streaming request to the model, waiting...")
+            stream = await self._client.chat.completions.create(
+                model=self._config.model_name,
+                messages=history,
+                max_tokens=self._config.max_tokens,
+                temperature=self._config.temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            try:
+                is_first = True
+                async for chunk in stream:
+                    # Usage comes with the last chunk, which has no choices.
+                    if chunk.usage is not None:
+                        self._add_token_usage(chunk.usage)
+                    if len(chunk.choices) == 0 or not chunk.choices[0].delta.content:
+                        continue
+                    if is_first:
+                        logger.debug(f"First piece of the response received in {time.time() - t0} sec")
+                        is_first = False
+                    yield chunk.choices[0].delta.content
+            finally:
+                await stream.close()
+            logger.debug(f"Streamed response from the model received in {time.time() - t0} sec")
+        except asyncio.CancelledError:
+            logger.debug("Streaming request to the model was cancelled")
+            raise
         finally:
-            self._lock.release()
+            self._pool.release()
+
+    def _add_token_usage(self, usage: Optional[CompletionUsage]):
+        if usage is None:
+            return
+
+        cached_tokens = 0
+        if usage.prompt_tokens_details and usage.prompt_tokens_details.cached_tokens:
+            cached_tokens = usage.prompt_tokens_details.cached_tokens
+
+        self.token_usage.add(
+            input_tokens=usage.prompt_tokens,
+            cached_input_tokens=cached_tokens,
+            output_tokens=usage.completion_tokens
+        )
+
+    # The provider caches the longest prompt prefix it has seen recently by itself,
+    # so the system instructions go first and start with their stable part.
+    def _build_history(self, request: LlmBackendRequest):
+        history: list[Any] = []
+
+        if len(request.system_instructions) > 0:
+            history.append({
+                "role": self._config.system_instructions_role,
+                "content": request.system_instructions
+            })
+
+        for m in request.history:
+            role = "user"
+            if m.role == 'user':
+                role = "user"
+            elif m.role == 'model':
+                role = "assistant"
+            else:
+                raise Exception(f"Unknown role '{m.role}'")
+
+            history.append({
+                "role": role,
+                "content": m.text
+            })
+
+        return history
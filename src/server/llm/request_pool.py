@@ -0,0 +1,57 @@
+import asyncio
+import heapq
+import itertools
+from typing import Literal
+
+LlmRequestPriority = Literal['high', 'normal', 'low']
+
+_PRIORITY_ORDER: dict[LlmRequestPriority, int] = {'high': 0, 'normal': 1, 'low': 2}
+
+
+# Bounds the number of requests a backend sends at once.
+# Waiting requests get a slot by priority and, within the same priority, in the order they came.
+class LlmRequestPool:
+    def __init__(self, max_concurrent_requests: int) -> None:
+        if max_concurrent_requests < 1:
+            raise Exception(f"max_concurrent_requests must be at least 1, got {max_concurrent_requests}")
+
+        self._max_concurrent_requests = max_concurrent_requests
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+
+        self.max_waiting = 0
+
+    @property
+    def active(self):
+        return self._active
+
+    @property
+    def waiting(self):
+        return len(list(filter(lambda w: not w[2].done(), self._waiters)))
+
+    async def acquire(self, priority: LlmRequestPriority = 'normal'):
+        if self._active < self._max_concurrent_requests and self.waiting == 0:
+            self._active = self._active + 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiters, (_PRIORITY_ORDER[priority], next(self._counter), future))
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot was handed over right before the cancellation, pass it on.
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        while len(self._waiters) > 0:
+            (_, _, future) = heapq.heappop(self._waiters)
+            if not future.done():
+                # The slot goes to the waiter as is, the number of active requests stays the same.
+                future.set_result(None)
+                return
+
+        self._active = self._active - 1
@@ -1,28 +1,63 @@
+from typing import AsyncIterator
 from llm.llm_logger import LlmLogger
 from util.logger import Logger
 from llm.backend.abstract import AbstractLlmBackend, LlmBackendRequest
 from llm.message import LlmMessage
+from llm.request_pool import LlmRequestPriority
 
 logger = Logger(__name__)
 
 
 class LlmSession:
-    def __init__(self, backend: AbstractLlmBackend, llm_logger: LlmLogger | None) -> None:
+    def __init__(self, backend: AbstractLlmBackend, llm_logger: LlmLogger | None, priority: LlmRequestPriority = 'normal') -> None:
         self._backend = backend
         self._llm_logger = llm_logger
+        self._priority = priority
 
         self._system_instructions = ''
+        self._system_instructions_stable_prefix_len = 0
         self._messages: list[LlmMessage] = []
 
-    def reset(self, *, system_instructions: str, messages: list[LlmMessage]):
+    # The system instructions may start with a part which is the same from call to call,
+    # its length lets the backend use the provider's prompt cache for it.
+    def reset(self, *, system_instructions: str, messages: list[LlmMessage], system_instructions_stable_prefix_len: int = 0):
         self._system_instructions = system_instructions
+        self._system_instructions_stable_prefix_len = system_instructions_stable_prefix_len
         self._messages = messages
 
     async def send_message(self, *, user_text: str, log_name: str | None = None, log_context: str | None = None) -> str:
+        request = self._create_request(user_text)
+
+        logger.info(f"< {user_text}")
+        response = await self._backend.send(request)
+        logger.info(f"> {response.text}")
+
+        self._add_response(user_text, response.text, log_name, log_context)
+        return response.text
+
+    # Like send_message(), yields the response text in pieces as the model generates it.
+    # The response is added to the session once the stream is over.
+    async def stream_message(self, *, user_text: str, log_name: str | None = None, log_context: str | None = None) -> AsyncIterator[str]:
+        request = self._create_request(user_text)
+
+        logger.info(f"< {user_text}")
+        pieces: list[str] = []
+        async for piece in self._backend.stream(request):
+            pieces.append(piece)
+            yield piece
+
+        text = ''.join(pieces).strip()
+        logger.info(f"> {text}")
+
+        self._add_response(user_text, text, log_name, log_context)
+
+    def _create_request(self, user_text: str):
         request = LlmBackendRequest(
             system_instructions=self._system_instructions,
             history=self._messages,
-            text=user_text
+            text=user_text,
+            priority=self._priority,
+            system_instructions_stable_prefix_len=self._system_instructions_stable_prefix_len
         )
 
         logger.debug(f"[SYSTEM:0] {self._system_instructions}")
@@ -34,21 +69,18 @@ class LlmSession:
                 logger.debug(f"[MODEL:{message_index}] {m.text}")
             message_index = message_index + 1
 
-        logger.info(f"< {user_text}")
-        response = await self._backend.send(request)
-        logger.info(f"> {response.text}")
+        return request
 
+    def _add_response(self, user_text: str, response_text: str, log_name: str | None, log_context: str | None):
         if self._llm_logger:
             self._llm_logger.log(
                 system_instructions=self._system_instructions,
                 history=self._messages,
                 user_message=user_text,
-                model_response=response.text,
+                model_response=response_text,
                 log_name=log_name,
                 log_context=log_context
             )
 
         self._messages.append(LlmMessage(role='user', text=user_text))
-        self._messages.append(LlmMessage(role='model', text=response.text))
-
-        return response.text
+        self._messages.append(LlmMessage(role='model', text=response_text))
@@ -9,6 +9,7 @@ from typing import Literal, Optional, Union
 from pydantic import BaseModel, Field
 from llm.backend.abstract import AbstractLlmBackend
 from llm.backend.dummy import DummyLlmBackend
+from llm.request_pool import LlmRequestPriority
 from llm.session import LlmSession
 from util.colored_lines import green
 
@@ -18,6 +19,7 @@ class LlmSystem:
     class Config(BaseModel):
         class Dummy(BaseModel):
             type: Literal['dummy']
+            dummy: DummyLlmBackend.Config = Field(default=DummyLlmBackend.Config())
 
         class OpenAi(BaseModel):
             type: Literal['openai']
@@ -50,7 +52,7 @@ class LlmSystem:
         backend: AbstractLlmBackend
         if self._config.system.type == 'dummy':
             logger.info(f"LLM system is set to {green('dummy')}")
-            backend = DummyLlmBackend()
+            backend = DummyLlmBackend(self._config.system.dummy)
         elif self._config.system.type == 'openai':
             logger.info(f"LLM system is set to {green('openai')}")
             backend = OpenAiLlmBackend(self._config.system.openai)
@@ -68,5 +70,9 @@ class LlmSystem:
 
         return backend
 
-    def create_session(self):
-        return LlmSession(self._backend, self._llm_logger)
+    def get_token_usage_stats(self):
+        return self._backend.token_usage.get_stats()
+
+    # Requests from sessions with a higher priority are sent first when the backend is busy.
+    def create_session(self, priority: LlmRequestPriority = 'normal'):
+        return LlmSession(self._backend, self._llm_logger, priority)
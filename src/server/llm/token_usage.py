@@ -0,0 +1,52 @@
+from pydantic import BaseModel
+
+from util.logger import Logger
+
+logger = Logger(__name__)
+
+
+class LlmTokenUsageStats(BaseModel):
+    requests: int
+
+    # Input tokens include the cached ones, which the provider reads from its prompt cache at a lower price.
+    input_tokens: int
+    cached_input_tokens: int
+    cache_write_input_tokens: int
+
+    output_tokens: int
+
+
+# Tokens of the requests sent by a backend, as reported by the provider.
+class LlmTokenUsage:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.input_tokens = 0
+        self.cached_input_tokens = 0
+        self.cache_write_input_tokens = 0
+        self.output_tokens = 0
+
+    def add(self, *, input_tokens: int, cached_input_tokens: int, output_tokens: int, cache_write_input_tokens: int = 0):
+        self.requests = self.requests + 1
+        self.input_tokens = self.input_tokens + input_tokens
+        self.cached_input_tokens = self.cached_input_tokens + cached_input_tokens
+        self.cache_write_input_tokens = self.cache_write_input_tokens + cache_write_input_tokens
+        self.output_tokens = self.output_tokens + output_tokens
+
+        logger.info(
+            f"Input tokens: {input_tokens - cached_input_tokens} uncached, {cached_input_tokens} cached, "
+            f"{cache_write_input_tokens} written to cache; output tokens: {output_tokens}; "
+            f"cached {self._format_cached_share()} of all input tokens")
+
+    def get_stats(self):
+        return LlmTokenUsageStats(
+            requests=self.requests,
+            input_tokens=self.input_tokens,
+            cached_input_tokens=self.cached_input_tokens,
+            cache_write_input_tokens=self.cache_write_input_tokens,
+            output_tokens=self.output_tokens
+        )
+
+    def _format_cached_share(self):
+        if self.input_tokens == 0:
+            return "0%"
+        return f"{round(self.cached_input_tokens / self.input_tokens * 100)}%"
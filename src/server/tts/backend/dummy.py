@@ -1,6 +1,37 @@
+import asyncio
+from typing import Optional
+
+from pydantic import BaseModel, Field
 from tts.backend.abstract import AbstractTtsBackend, TtsBackendRequest, TtsBackendResponse
 
+# MPEG-1 Layer III frame header: 32 kbps, 44100 Hz, mono. Such frame is 104 bytes long and lasts 1152 samples.
+_SILENT_MP3_FRAME = b'\xff\xfb\x10\xc4' + bytes(100)
+_SILENT_MP3_FRAME_SEC = 1152 / 44100
+
 
 class DummyTtsBackend(AbstractTtsBackend):
+    class Config(BaseModel):
+        # Emulates the time a real TTS takes to respond.
+        latency_sec: float = Field(default=0.0)
+
+        # When set, a silent mp3 of this duration is written instead of producing no voiceover,
+        # so the game receives npc_say_mp3 as with a real TTS.
+        audio_duration_sec: Optional[float] = Field(default=None)
+
+    def __init__(self, config: Config) -> None:
+        super().__init__()
+
+        self._config = config
+
     async def convert(self, request: TtsBackendRequest) -> TtsBackendResponse | None:
-        return None
+        if self._config.latency_sec > 0:
+            await asyncio.sleep(self._config.latency_sec)
+
+        if self._config.audio_duration_sec is None:
+            return None
+
+        frames_count = max(1, round(self._config.audio_duration_sec / _SILENT_MP3_FRAME_SEC))
+        with open(request.file_path, 'wb') as f:
+            f.write(_SILENT_MP3_FRAME * frames_count)
+
+        return TtsBackendResponse(file_path=request.file_path)
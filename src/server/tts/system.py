@@ -24,6 +24,7 @@ class TtsSystem:
 
         class Dummy(BaseModel):
             type: Literal['dummy']
+            dummy: DummyTtsBackend.Config = Field(default=DummyTtsBackend.Config())
 
         class Elevenlabs(BaseModel):
             type: Literal['elevenlabs']
@@ -117,7 +118,7 @@ class TtsSystem:
         backend: AbstractTtsBackend
         if system.type == 'dummy':
             logger.info(f"Text-to-speech system is set to {green('dummy')}")
-            backend = DummyTtsBackend()
+            backend = DummyTtsBackend(system.dummy)
         elif system.type == 'elevenlabs':
             logger.info(f"Text-to-speech system is set to {green('ElevenLabs')}")
             backend = ElevenlabsTtsBackend(system.elevenlabs)
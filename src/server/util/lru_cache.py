@@ -0,0 +1,36 @@
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+V = TypeVar('V')
+
+
+# Keeps up to max_size values, the least recently used one is dropped first. With max_size 0 nothing is kept.
+class LruCache(Generic[V]):
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._values: OrderedDict[Hashable, V] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_create(self, key: Hashable, create: Callable[[], V]) -> V:
+        if key in self._values:
+            self.hits = self.hits + 1
+            self._values.move_to_end(key)
+            return self._values[key]
+
+        self.misses = self.misses + 1
+        value = create()
+        if self._max_size > 0:
+            self._values[key] = value
+            if len(self._values) > self._max_size:
+                self._values.popitem(last=False)
+                self.evictions = self.evictions + 1
+        return value
+
+    def clear(self):
+        self._values.clear()
+
+    def __len__(self):
+        return len(self._values)
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+
+
+class StateDelta:
+    # Fields of the delta event which are not part of the state itself.
+    _SERVICE_FIELDS = {'type', 'cleared'}
+
+    # Copies only the fields the game actually sent, so an omitted field keeps its current value.
+    # Returns names of the updated fields.
+    @staticmethod
+    def merge(state: BaseModel, delta: BaseModel) -> list[str]:
+        updated: list[str] = []
+
+        for field in delta.model_fields_set - StateDelta._SERVICE_FIELDS:
+            if field in type(state).model_fields:
+                setattr(state, field, getattr(delta, field))
+                updated.append(field)
+
+        for field in getattr(delta, 'cleared', []):
+            if field in type(state).model_fields:
+                setattr(state, field, None)
+                updated.append(field)
+
+        return updated
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+mutagen_mp3 = pytest.importorskip("mutagen.mp3")
+
+from llm.backend.abstract import LlmBackendRequest
+from llm.backend.dummy import DummyLlmBackend
+from tts.backend.abstract import TtsBackendRequest
+from tts.backend.dummy import DummyTtsBackend
+from tts.voice import Voice
+
+
+def _tts_request(file_path: str) -> TtsBackendRequest:
+    return TtsBackendRequest(
+        text="Привет",
+        voice=Voice(female=False, accent='none', elevenlabs=Voice.Elevenlabs()),
+        file_path=file_path
+    )
+
+
+def test_dummy_tts_writes_silent_mp3_of_requested_duration(tmp_path):
+    backend = DummyTtsBackend(DummyTtsBackend.Config(audio_duration_sec=2.0))
+
+    response = asyncio.run(backend.convert(_tts_request(str(tmp_path / "tts_0.mp3"))))
+
+    assert response is not None
+    assert mutagen_mp3.MP3(response.file_path).info.length == pytest.approx(2.0, abs=0.05)
+
+
+def test_dummy_tts_without_audio_produces_no_voiceover(tmp_path):
+    backend = DummyTtsBackend(DummyTtsBackend.Config())
+
+    assert asyncio.run(backend.convert(_tts_request(str(tmp_path / "tts_0.mp3")))) is None
+
+
+def test_dummy_llm_emulates_latency():
+    backend = DummyLlmBackend(DummyLlmBackend.Config(latency_sec=0.05))
+
+    async def run():
+        loop = asyncio.get_event_loop()
+        t0 = loop.time()
+        response = await backend.send(LlmBackendRequest(system_instructions='', history=[], text='hi'))
+        return (response, loop.time() - t0)
+
+    (response, elapsed) = asyncio.run(run())
+    assert len(response.text) > 0
+    assert elapsed >= 0.05
@@ -0,0 +1,216 @@
+import asyncio
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+
+from eventbus.backend.mwse_tcp import MwseTcpEventBusBackend
+from eventbus.bus import EventBus
+from eventbus.data.actor_ref import ActorRef
+from eventbus.event import Event
+from eventbus.event_data.event_data_from_game import EventDataFromGame
+from eventbus.event_data.event_data_from_server import EventDataFromServer
+from eventbus.event_shards import EventShardingRule
+from eventbus.priority_event_queue import EventCoalesceRule, EventPriorityClass
+
+
+def _create_event_bus(**kwargs) -> EventBus:
+    config = dict(
+        system=EventBus.Config.MwseTcp(
+            type='mwse_tcp',
+            mwse_tcp=MwseTcpEventBusBackend.Config(port=0, encoding='cp1251')
+        ),
+        producers=1,
+        consumers=1,
+        queue_max_size=100,
+        queue_overflow='drop_oldest'
+    )
+    config.update(kwargs)
+    return EventBus(EventBus.Config(**config))
+
+
+async def _drain_consumer(bus: EventBus):
+    consumer = asyncio.create_task(bus._consumer())
+    for _ in range(0, 10):
+        await asyncio.sleep(0)
+    consumer.cancel()
+
+
+def test_typed_handlers_receive_only_their_event_types():
+    async def run():
+        bus = _create_event_bus()
+        received: list[tuple[str, str]] = []
+
+        async def all_events(event: Event):
+            received.append(('all', event.data.type))
+
+        async def game_loaded_only(event: Event):
+            received.append(('typed', event.data.type))
+
+        bus.register_handler(all_events)
+        bus.register_handler(game_loaded_only, ['game_loaded'])
+
+        bus._handle_event_from_game(Event(data=EventDataFromGame.GameLoaded(type='game_loaded')))
+        bus._handle_event_from_game(Event(data=EventDataFromGame.CombatStopped(type='combat_stopped')))
+        await _drain_consumer(bus)
+
+        assert received == [
+            ('all', 'game_loaded'),
+            ('typed', 'game_loaded'),
+            ('all', 'combat_stopped'),
+        ]
+
+    asyncio.run(run())
+
+
+def test_priority_lanes_drain_first_and_overflow_separately():
+    async def run():
+        bus = _create_event_bus(
+            priority_classes=[
+                EventPriorityClass(name='urgent', types=['game_*'], queue_max_size=1, queue_overflow='drop_newest')
+            ]
+        )
+        received: list[str] = []
+
+        async def handler(event: Event):
+            received.append(event.data.type)
+
+        bus.register_handler(handler)
+
+        bus._handle_event_from_game(Event(data=EventDataFromGame.CombatStopped(type='combat_stopped')))
+        bus._handle_event_from_game(Event(data=EventDataFromGame.GameLoaded(type='game_loaded')))
+        bus._handle_event_from_game(Event(data=EventDataFromGame.GameLoaded(type='game_loaded')))
+
+        stats = {s.priority_class: s for s in bus.get_queues_stats() if s.direction == 'incoming'}
+        assert list(stats.keys()) == ['urgent', 'default']
+        assert (stats['urgent'].depth, stats['urgent'].dropped) == (1, 1)
+        assert (stats['default'].depth, stats['default'].dropped) == (1, 0)
+
+        await _drain_consumer(bus)
+
+        assert received == ['game_loaded', 'combat_stopped']
+
+    asyncio.run(run())
+
+
+def test_coalescible_outgoing_event_replaces_queued_one():
+    async def run():
+        bus = _create_event_bus(coalesce=[
+            EventCoalesceRule(type='update_player_book', key_fields=['player_book_name']),
+            EventCoalesceRule(type='stt_recognition_update')
+        ])
+
+        def book(name: str, content: str):
+            return Event(data=EventDataFromServer.UpdatePlayerBook(
+                type='update_player_book', player_book_name=name, player_book_content=content))
+
+        bus.produce_event(book('a', 'v1'))
+        bus.produce_event(Event(data=EventDataFromServer.SttRecognitionUpdate(type='stt_recognition_update', text='he')))
+        bus.produce_event(book('b', 'v1'))
+        bus.produce_event(book('a', 'v2'))
+        bus.produce_event(Event(data=EventDataFromServer.SttRecognitionUpdate(type='stt_recognition_update', text='hello')))
+
+        queue = bus._events_to_produce_to_game
+        assert queue.qsize() == 3
+        assert queue.get_stats()[0].coalesced == 2
+
+        events = [await queue.get() for _ in range(0, 3)]
+        assert [(e.data.type, getattr(e.data, 'player_book_content', None) or getattr(e.data, 'text', None))
+                for e in events] == [
+            ('update_player_book', 'v2'),
+            ('stt_recognition_update', 'hello'),
+            ('update_player_book', 'v1'),
+        ]
+
+        # Once delivered, the next event with the same key is queued again.
+        bus.produce_event(book('a', 'v3'))
+        assert queue.qsize() == 1
+
+    asyncio.run(run())
+
+
+def test_sharded_events_keep_order_per_actor_and_run_in_parallel_across_actors():
+    async def run():
+        bus = _create_event_bus(shards=4, shard_keys=[
+            EventShardingRule(types=['npc_death'], key_fields=['actor.ref_id']),
+            EventShardingRule(types=['dialog_*'], key_fields=['npc_ref.ref_id']),
+        ])
+        log: list[str] = []
+        release_first = asyncio.Event()
+
+        async def handler(event: Event):
+            ref_id = event.data.actor.ref_id if event.data.type == 'npc_death' else event.data.npc_ref.ref_id
+            log.append(f"start {event.data.type} {ref_id}")
+            if event.data.type == 'dialog_open':
+                await release_first.wait()
+            log.append(f"end {event.data.type} {ref_id}")
+
+        bus.register_handler(handler, ['npc_death', 'dialog_open'])
+
+        def actor(ref_id: str) -> ActorRef:
+            return ActorRef(ref_id=ref_id, type='npc', name=ref_id, female=False)
+
+        # Another actor which surely lands on a different shard.
+        other = next(f"npc_{i}" for i in range(0, 100)
+                     if bus._shards.get_shard_index((f"npc_{i}",)) != bus._shards.get_shard_index(("fargoth",)))
+
+        bus._handle_event_from_game(Event(data=EventDataFromGame.DialogOpen(type='dialog_open', npc_ref=actor('fargoth'), topics=[])))
+        bus._handle_event_from_game(Event(data=EventDataFromGame.NpcDeath(type='npc_death', actor=actor('fargoth'))))
+        bus._handle_event_from_game(Event(data=EventDataFromGame.NpcDeath(type='npc_death', actor=actor(other))))
+
+        bus._shards.start()
+        await _drain_consumer(bus)
+
+        assert log == ["start dialog_open fargoth", f"start npc_death {other}", f"end npc_death {other}"]
+        lagging = [s for s in bus.get_shards_stats() if s.depth > 0]
+        assert len(lagging) == 1 and lagging[0].lag_ms >= 0
+
+        release_first.set()
+        for _ in range(0, 10):
+            await asyncio.sleep(0)
+
+        assert log[3:] == ["end dialog_open fargoth", "start npc_death fargoth", "end npc_death fargoth"]
+        assert sum(s.processed for s in bus.get_shards_stats()) == 3
+
+    asyncio.run(run())
+
+
+def test_shards_apply_priority_class_bounds_and_overflow():
+    async def run():
+        bus = _create_event_bus(
+            shards=1,
+            shard_keys=[
+                EventShardingRule(types=['npc_death'], key_fields=['actor.ref_id']),
+                EventShardingRule(types=['dialog_*'], key_fields=['npc_ref.ref_id']),
+            ],
+            queue_max_size=1,
+            queue_overflow='drop_newest',
+            priority_classes=[EventPriorityClass(name='dialog', types=['dialog_*'], queue_max_size=2, queue_overflow='drop_oldest')]
+        )
+        handled: list[str] = []
+
+        async def handler(event: Event):
+            handled.append(f"{event.data.type} {event.data.actor.ref_id if event.data.type == 'npc_death' else event.data.npc_ref.ref_id}")
+
+        bus.register_handler(handler, ['npc_death', 'dialog_open'])
+
+        def actor(ref_id: str) -> ActorRef:
+            return ActorRef(ref_id=ref_id, type='npc', name=ref_id, female=False)
+
+        # Events are routed one by one, so the incoming queue itself never overflows.
+        for ref_id in ['a', 'b', 'c']:
+            for event in [Event(data=EventDataFromGame.DialogOpen(type='dialog_open', npc_ref=actor(ref_id), topics=[])),
+                          Event(data=EventDataFromGame.NpcDeath(type='npc_death', actor=actor(ref_id)))]:
+                bus._handle_event_from_game(event)
+                assert bus._shards.put_nowait(await bus._events_consumed_from_game.get())
+
+        [stats] = bus.get_shards_stats()
+        assert (stats.depth, stats.dropped) == (3, 3)
+
+        bus._shards.start()
+        for _ in range(0, 10):
+            await asyncio.sleep(0)
+
+        assert handled == ["npc_death a", "dialog_open b", "dialog_open c"]
+
+    asyncio.run(run())
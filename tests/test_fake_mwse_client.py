@@ -0,0 +1,131 @@
+import asyncio
+import socket
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+pytest.importorskip("msgpack")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from eventbus.backend.mwse_tcp import MwseTcpEventBusBackend
+from eventbus.backend.mwse_tcp_codec import JsonEventCodec
+from eventbus.backend.mwse_tcp_recorder import RecordedFrame
+from eventbus.data.actor_ref import ActorRef
+from eventbus.event import Event
+from eventbus.event_data.event_data_from_game import EventDataFromGame
+from eventbus.event_data.event_data_from_server import EventDataFromServer
+from eventbus.event_data.event_data_rpc import EventDataRpc
+from fake_mwse_client import FakeMwseClient, ScriptedWorld
+
+
+def test_scripted_world_answers_rpc_requests():
+    world = ScriptedWorld.sample(npcs_count=3)
+    npc = world.npcs[1]
+
+    response = world.answer(Event(data=EventDataRpc.GetNpcRequest(type='get_npc_request', npc_ref_id=npc.ref_id)))
+    assert response is not None and response.data == EventDataRpc.GetNpcResponse(type='get_npc_response', npc_data=npc)
+
+    response = world.answer(Event(data=EventDataRpc.GetActorsNearbyRequest(
+        type='get_actors_nearby_request', actor_ref_id=npc.ref_id, radius_ingame=None, test_line_of_sight=True)))
+    assert response is not None and response.data.type == 'get_actors_nearby_response'
+    assert sorted(a.actor_ref.ref_id for a in response.data.actors) == sorted([world.npcs[0].ref_id, world.npcs[2].ref_id])
+
+    response = world.answer(Event(data=EventDataRpc.GetLocalPlayerFastRequest(type='get_local_player_fast_request')))
+    assert response is not None and response.data.type == 'get_local_player_fast_response'
+
+    assert world.answer(Event(data=EventDataRpc.GetNpcRequest(type='get_npc_request', npc_ref_id='missing'))) is None
+
+
+def test_fake_client_replays_and_answers_over_tcp():
+    async def run():
+        codec = JsonEventCodec('cp1251')
+        received: list[Event] = []
+        done = asyncio.Event()
+
+        async def read_event(reader: asyncio.StreamReader) -> Event:
+            size = struct.unpack('>I', await reader.readexactly(4))[0]
+            return codec.decode(await reader.readexactly(size))
+
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            received.append(await read_event(reader))
+
+            request = Event(data=EventDataRpc.GetEnvRequest(type='get_env_request'))
+            request.event_id = 42
+            body = codec.encode(request)
+            writer.write(struct.pack('>I', len(body)) + body)
+
+            received.append(await read_event(reader))
+            done.set()
+
+        server = await asyncio.start_server(handle, 'localhost', 0)
+        port = server.sockets[0].getsockname()[1]
+
+        world = ScriptedWorld.sample(npcs_count=2)
+        client = FakeMwseClient(world)
+        await client.connect('localhost', port)
+
+        frames = [
+            RecordedFrame(t=0.0, dir='in', peer='p', event=Event(data=EventDataFromGame.GameLoaded(type='game_loaded'))),
+            RecordedFrame(t=0.1, dir='out', peer='*', event=Event(data=EventDataRpc.GetEnvRequest(type='get_env_request'))),
+        ]
+        assert await client.replay(frames, speed=0) == 1
+
+        await asyncio.wait_for(done.wait(), 5)
+        await client.close()
+        server.close()
+
+        assert received[0].data.type == 'game_loaded'
+        assert received[1].data == EventDataRpc.GetEnvResponse(type='get_env_response', env_data=world.env)
+        assert received[1].response_to_event_id == 42
+        assert client.rpc_answered == 1
+
+    asyncio.run(run())
+
+
+def test_rpc_goes_to_one_game_client_and_observers_get_subscribed_events():
+    async def run():
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(('localhost', 0))
+            port = s.getsockname()[1]
+
+        backend = MwseTcpEventBusBackend(MwseTcpEventBusBackend.Config(port=port, encoding='cp1251'))
+        received_by_server: list[Event] = []
+        backend.start(received_by_server.append)
+        await asyncio.sleep(0.05)
+
+        world = ScriptedWorld.sample(npcs_count=2)
+        stale_game = FakeMwseClient(world)
+        game = FakeMwseClient(world, client_name='game')
+        observer = FakeMwseClient(world, codec='msgpack', role='observer', client_name='overlay',
+                                  subscribe=['npc_*', 'dialog_text_submit'])
+        for client in [stale_game, game, observer]:
+            await client.connect('localhost', port)
+            # Handshake must be processed before the next client connects to keep the order.
+            await asyncio.sleep(0.05)
+
+        request = Event(data=EventDataRpc.GetEnvRequest(type='get_env_request'))
+        request.event_id = 1
+        backend.publish_event_to_game(request)
+        backend.publish_event_to_game(Event(data=EventDataFromServer.NpcRemoveSound(type='npc_remove_sound', npc_ref_id='npc')))
+        backend.publish_event_to_game(Event(data=EventDataFromServer.TurnActorsTo(
+            type='turn_actors_to', actor_ref_ids=[], target_ref_id='npc')))
+        await stale_game.send(Event(data=EventDataFromGame.DialogTextSubmit(
+            type='dialog_text_submit', actor_ref=ActorRef(ref_id='npc_1', type='npc', name='Фаргот', female=False), text='Привет')))
+        await asyncio.sleep(0.2)
+
+        stats = {s.client_name: s for s in backend.get_clients_stats()}
+        assert stats['overlay'].role == 'observer' and stats['overlay'].codec == 'msgpack'
+
+        for client in [stale_game, game, observer]:
+            await client.close()
+
+        assert stale_game.received_by_type == {'npc_remove_sound': 1, 'turn_actors_to': 1}
+        assert game.received_by_type == {'get_env_request': 1, 'npc_remove_sound': 1, 'turn_actors_to': 1}
+        assert observer.received_by_type == {'npc_remove_sound': 1, 'dialog_text_submit': 1}
+        assert sorted(e.data.type for e in received_by_server) == ['dialog_text_submit', 'get_env_response']
+
+    asyncio.run(run())
@@ -0,0 +1,184 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+
+# The game master pulls in the keyboard listener and the audio backends.
+try:
+    from app.app_config import AppConfig
+    from game.game_master import GameMaster
+except (ImportError, OSError) as error:
+    pytest.skip(f"game master can't be imported: {error}", allow_module_level=True)
+
+from eventbus.data.actor_ref import ActorRef
+from eventbus.data.position import Position
+from game.data.player_ref_looked_at import PlayerRefLookedAt
+from game.service.player_services.player_intention_analyzer import PlayerIntentionAnalyzer
+from game.service.story_item.story_item_to_history import StoryItemToHistoryConverter
+from util.now_ms import now_ms
+
+_PLAYER = ActorRef(ref_id='player', type='player', name='Nerevar', female=False)
+_FARGOTH = ActorRef(ref_id='fargoth00000000', type='npc', name='Fargoth', female=False)
+
+
+class _FakeSpeakerService:
+    def __init__(self) -> None:
+        self.shut_up_calls = 0
+        self.scene_locked = False
+
+    def add_scene_unlock_listener(self, listener):
+        pass
+
+    # Keeps the story scheduler from running the step, tests run it themselves.
+    def is_scene_locked(self):
+        return True
+
+    def lock_scene(self):
+        self.scene_locked = True
+        return 1
+
+    def unlock_scene(self):
+        self.scene_locked = False
+
+    def is_scene_locked_at(self, generation: int):
+        return self.scene_locked
+
+    async def npcs_shut_up(self, predicate):
+        self.shut_up_calls = self.shut_up_calls + 1
+        self.scene_locked = False
+
+
+def _create_game_master(player_intention: PlayerIntentionAnalyzer.Response, intention_ready: Optional[asyncio.Event] = None):
+    config = AppConfig.get_default()
+    config.player_intention.parallel = True
+
+    async def analyze_player_intention(text, known_topics, target):
+        if intention_ready:
+            await intention_ready.wait()
+        await asyncio.sleep(0.01)
+        return player_intention
+
+    async def get_npc(ref_id):
+        return SimpleNamespace(actor_ref=_FARGOTH, npc_data=SimpleNamespace(name=_FARGOTH.name))
+
+    async def get_npcs_who_can_hear_another_actor(actor_ref):
+        return []
+
+    async def publish_events_from_items(item_data_list, npc_ref):
+        pass
+
+    story: list = []
+    speaker_service = _FakeSpeakerService()
+    game_master = GameMaster(
+        config,
+        SimpleNamespace(produce_event=lambda event: None),  # type: ignore
+        SimpleNamespace(register_handler=lambda handler, types: None),  # type: ignore
+        SimpleNamespace(local_player=SimpleNamespace(actor_ref=_PLAYER)),  # type: ignore
+        SimpleNamespace(add_items_to_personal_story=story.extend),  # type: ignore
+        SimpleNamespace(is_in_dialog=True, npc_ref=_FARGOTH, topics=[]),  # type: ignore
+        SimpleNamespace(),  # type: ignore
+        SimpleNamespace(get_npc=get_npc, get_npcs_who_can_hear_another_actor=get_npcs_who_can_hear_another_actor),  # type: ignore
+        SimpleNamespace(),  # type: ignore
+        speaker_service,  # type: ignore
+        SimpleNamespace(add_items_to_personal_stories=lambda npcs, item_data_list: None),  # type: ignore
+        SimpleNamespace(publish_events_from_items=publish_events_from_items),  # type: ignore
+        SimpleNamespace(analyze_player_intention=analyze_player_intention),  # type: ignore
+        SimpleNamespace(),  # type: ignore
+        SimpleNamespace(sanitize=lambda text: text),  # type: ignore
+        SimpleNamespace(),  # type: ignore
+        SimpleNamespace()  # type: ignore
+    )
+    return (game_master, story, speaker_service)
+
+
+def test_parallel_intention_interrupts_npcs_and_does_not_repeat_the_line():
+    async def main():
+        (game_master, story, speaker_service) = _create_game_master(
+            PlayerIntentionAnalyzer.Response(trigger_dialog_topic='слухи'))
+
+        await game_master._on_local_player_speak("Расскажи мне последние слухи")
+
+        assert [d.type for d in story] == ['say_processed', 'player_trigger_dialog_topic']
+        assert speaker_service.shut_up_calls == 1
+        assert (game_master._parallel_intention_lines, game_master._parallel_intention_rollbacks) == (1, 1)
+
+        # The line is already in the story as say_processed.
+        lines = [StoryItemToHistoryConverter.convert_item_to_line('npc_story', _FARGOTH, d) for d in story]
+        assert sum(line.count("последние слухи") for line in lines) == 1
+
+    asyncio.run(main())
+
+
+def test_parallel_intention_without_intent_adds_nothing_after_the_line():
+    async def main():
+        (game_master, story, speaker_service) = _create_game_master(PlayerIntentionAnalyzer.Response())
+
+        await game_master._on_local_player_speak("Хорошая сегодня погода")
+
+        assert [d.type for d in story] == ['say_processed']
+        assert speaker_service.shut_up_calls == 0
+        assert (game_master._parallel_intention_lines, game_master._parallel_intention_rollbacks) == (1, 0)
+
+    asyncio.run(main())
+
+
+def test_parallel_intention_adds_pointed_ref_once():
+    async def main():
+        (game_master, story, speaker_service) = _create_game_master(
+            PlayerIntentionAnalyzer.Response(npc_stop_follow=True))
+        game_master._player_speak_listener._player_last_ref_looked_at = PlayerRefLookedAt(
+            ref_id='chest00000000',
+            object_type=0,
+            name='Сундук',
+            owner=None,
+            position=Position(x=0, y=0, z=0),
+            last_update_ms=now_ms()
+        )
+
+        await game_master._on_local_player_speak("Подожди здесь, я посмотрю этот сундук")
+
+        assert [d.type for d in story] == ['say_processed', 'player_points_at_ref', 'npc_stop_follow']
+        assert speaker_service.shut_up_calls == 0
+
+    asyncio.run(main())
+
+
+def test_rolled_back_line_cancels_npc_response_being_generated():
+    async def main():
+        intention_ready = asyncio.Event()
+        (game_master, story, speaker_service) = _create_game_master(
+            PlayerIntentionAnalyzer.Response(trigger_dialog_topic='слухи'), intention_ready)
+        generation_cancelled = False
+
+        async def prepare_npc_turn(scene_lock_generation_id):
+            nonlocal generation_cancelled
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                generation_cancelled = True
+                raise
+
+        game_master._prepare_npc_turn = prepare_npc_turn  # type: ignore
+
+        speak = asyncio.create_task(game_master._on_local_player_speak("Расскажи мне последние слухи"))
+        await asyncio.sleep(0.01)
+        assert [d.type for d in story] == ['say_processed']
+
+        # An NPC starts reacting to the plain line, the step holds the story until the response is ready.
+        step = asyncio.create_task(game_master._determine_npc_to_act_and_act())
+        await asyncio.sleep(0.01)
+        assert speaker_service.scene_locked
+
+        intention_ready.set()
+        await asyncio.wait_for(speak, 1)
+        await asyncio.wait_for(step, 1)
+
+        assert generation_cancelled
+        assert [d.type for d in story] == ['say_processed', 'player_trigger_dialog_topic']
+        assert not speaker_service.scene_locked
+        assert not game_master._publish_lock.locked()
+
+    asyncio.run(main())
@@ -0,0 +1,217 @@
+import asyncio
+import gc
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+openai = pytest.importorskip("openai")
+
+from llm.backend.abstract import LlmBackendRequest
+from llm.backend.openai import OpenAiLlmBackend
+from llm.backend.qwen import QwenLlmBackend
+from llm.message import LlmMessage
+
+_LATENCY_SEC = 0.5
+_STREAM_PIECES = ["Hello", " there.", " General", " Kenobi."]
+_STREAM_PIECE_SEC = 0.1
+_USAGE = {"prompt_tokens": 1200, "completion_tokens": 5, "total_tokens": 1205, "prompt_tokens_details": {"cached_tokens": 1024}}
+
+
+# Stand-in for an OpenAI compatible API which takes a while to answer.
+class _SlowChatCompletionsHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        if request.get('stream'):
+            self._stream(request.get('stream_options', {}).get('include_usage', False))
+            return
+
+        time.sleep(_LATENCY_SEC)
+
+        body = json.dumps({
+            "id": "chatcmpl-0",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "stand-in",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": " Hello there. "}, "finish_reason": "stop"}],
+            "usage": _USAGE,
+        }).encode('utf-8')
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _stream(self, include_usage: bool):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        for piece in _STREAM_PIECES:
+            time.sleep(_STREAM_PIECE_SEC)
+            chunk = {
+                "id": "chatcmpl-0",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "stand-in",
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+        if include_usage:
+            chunk = {"id": "chatcmpl-0", "object": "chat.completion.chunk", "created": 0, "model": "stand-in", "choices": [], "usage": _USAGE}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _SlowChatCompletionsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _request():
+    return LlmBackendRequest(system_instructions="You are a guard.", history=[LlmMessage(role='user', text="Hi")], text="Hi")
+
+
+# Returns the longest time the loop was late to wake up a 10 ms ticker while the coroutine ran.
+# Objects left by earlier tests are frozen, a full collection of them would show up as lag.
+async def _max_loop_lag(coro):
+    max_lag = 0.0
+    done = False
+    gc.collect()
+    gc.freeze()
+
+    async def tick():
+        nonlocal max_lag
+        while not done:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.01)
+            max_lag = max(max_lag, time.perf_counter() - t0 - 0.01)
+
+    ticker = asyncio.create_task(tick())
+    await asyncio.sleep(0)
+    try:
+        result = await coro
+    finally:
+        done = True
+        await ticker
+        gc.unfreeze()
+    return (result, max_lag)
+
+
+@pytest.mark.parametrize("create_backend", [
+    lambda url: OpenAiLlmBackend(OpenAiLlmBackend.Config(base_url=url, api_key='test', model_name='stand-in')),
+    lambda url: QwenLlmBackend(QwenLlmBackend.Config(base_url=url, api_key='test', model_name='stand-in')),
+])
+def test_llm_backend_does_not_block_event_loop(base_url, create_backend):
+    async def main():
+        backend = create_backend(base_url)
+
+        t0 = time.perf_counter()
+        (response, max_lag) = await _max_loop_lag(backend.send(_request()))
+
+        assert response.text == "Hello there."
+        assert time.perf_counter() - t0 >= _LATENCY_SEC
+        assert max_lag < _LATENCY_SEC / 5
+
+    asyncio.run(main())
+
+
+def test_llm_backend_send_can_be_cancelled(base_url):
+    async def main():
+        backend = OpenAiLlmBackend(OpenAiLlmBackend.Config(base_url=base_url, api_key='test', model_name='stand-in'))
+
+        task = asyncio.create_task(backend.send(_request()))
+        await asyncio.sleep(0.1)
+
+        t0 = time.perf_counter()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert time.perf_counter() - t0 < _LATENCY_SEC / 5
+
+        # The backend is usable again right away.
+        response = await asyncio.wait_for(backend.send(_request()), timeout=_LATENCY_SEC * 4)
+        assert response.text == "Hello there."
+
+    asyncio.run(main())
+
+
+def test_llm_backend_streams_response_pieces(base_url):
+    async def main():
+        backend = OpenAiLlmBackend(OpenAiLlmBackend.Config(base_url=base_url, api_key='test', model_name='stand-in'))
+
+        t0 = time.perf_counter()
+        pieces: list[str] = []
+        received_at: list[float] = []
+        async for piece in backend.stream(_request()):
+            pieces.append(piece)
+            received_at.append(time.perf_counter() - t0)
+
+        assert pieces == _STREAM_PIECES
+        # The first piece comes long before the whole response.
+        assert received_at[-1] - received_at[0] >= _STREAM_PIECE_SEC * (len(_STREAM_PIECES) - 1) * 0.8
+
+    asyncio.run(main())
+
+
+def test_llm_backend_records_cached_input_tokens(base_url):
+    async def main():
+        backend = OpenAiLlmBackend(OpenAiLlmBackend.Config(base_url=base_url, api_key='test', model_name='stand-in'))
+
+        await backend.send(_request())
+        async for _ in backend.stream(_request()):
+            pass
+
+        stats = backend.token_usage.get_stats()
+        assert stats.requests == 2
+        assert stats.input_tokens == 2400
+        assert stats.cached_input_tokens == 2048
+        assert stats.output_tokens == 10
+
+    asyncio.run(main())
+
+
+def test_anthropic_backend_marks_stable_system_instructions_for_caching():
+    anthropic = pytest.importorskip("anthropic")
+    from llm.backend.anthropic import AnthropicLlmBackend
+
+    stable_prefix = "You are a guard.\n\n"
+    request = LlmBackendRequest(
+        system_instructions=f"{stable_prefix}It is raining.",
+        history=[LlmMessage(role='user', text="Hi")],
+        text="Hi",
+        system_instructions_stable_prefix_len=len(stable_prefix)
+    )
+
+    backend = AnthropicLlmBackend(AnthropicLlmBackend.Config(api_key='test', model_name='stand-in'))
+    (system, history) = backend._build_prompt(request)
+    assert system == [
+        {"type": "text", "text": stable_prefix, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "It is raining."},
+    ]
+    assert history == [{"role": "user", "content": "Hi"}]
+
+    backend._add_token_usage(anthropic.types.Usage(input_tokens=50, output_tokens=0, cache_read_input_tokens=1000), 5)
+    stats = backend.token_usage.get_stats()
+    assert (stats.input_tokens, stats.cached_input_tokens, stats.output_tokens) == (1050, 1000, 5)
+
+    backend = AnthropicLlmBackend(AnthropicLlmBackend.Config(api_key='test', model_name='stand-in', prompt_caching=False))
+    (system, _) = backend._build_prompt(request)
+    assert system == [{"type": "text", "text": f"{stable_prefix}It is raining."}]
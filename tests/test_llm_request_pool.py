@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+
+from llm.backend.abstract import LlmBackendRequest
+from llm.backend.dummy import DummyLlmBackend
+from llm.request_pool import LlmRequestPool
+
+
+def test_request_pool_orders_waiters_by_priority_then_arrival():
+    async def main():
+        pool = LlmRequestPool(2)
+        order: list[str] = []
+
+        async def request(name: str, priority):
+            await pool.acquire(priority)
+            try:
+                order.append(name)
+                await asyncio.sleep(0.01)
+            finally:
+                pool.release()
+
+        tasks = [
+            asyncio.create_task(request("first", 'low')),
+            asyncio.create_task(request("second", 'low')),
+            asyncio.create_task(request("low_1", 'low')),
+            asyncio.create_task(request("normal_1", 'normal')),
+            asyncio.create_task(request("low_2", 'low')),
+            asyncio.create_task(request("high", 'high')),
+            asyncio.create_task(request("normal_2", 'normal')),
+        ]
+        await asyncio.sleep(0)
+        assert pool.active == 2
+        assert pool.waiting == 5
+
+        await asyncio.gather(*tasks)
+
+        assert order == ["first", "second", "high", "normal_1", "normal_2", "low_1", "low_2"]
+        assert pool.active == 0
+        assert pool.max_waiting == 5
+
+    asyncio.run(main())
+
+
+def test_request_pool_skips_cancelled_waiters():
+    async def main():
+        pool = LlmRequestPool(1)
+
+        await pool.acquire()
+        cancelled = asyncio.create_task(pool.acquire('high'))
+        waiting = asyncio.create_task(pool.acquire('low'))
+        await asyncio.sleep(0)
+
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert pool.waiting == 1
+
+        pool.release()
+        await asyncio.wait_for(waiting, timeout=1.0)
+        assert pool.active == 1
+
+        pool.release()
+        assert pool.active == 0
+
+    asyncio.run(main())
+
+
+def test_request_pool_passes_on_slot_handed_to_cancelled_waiter():
+    async def main():
+        pool = LlmRequestPool(1)
+
+        await pool.acquire()
+        first = asyncio.create_task(pool.acquire())
+        second = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0)
+
+        # The slot is handed to the first waiter, which is cancelled before it runs.
+        pool.release()
+        first.cancel()
+
+        await asyncio.wait_for(second, timeout=1.0)
+        assert first.cancelled()
+        assert pool.active == 1
+
+    asyncio.run(main())
+
+
+def test_llm_backend_overlaps_requests_up_to_max_concurrent():
+    async def main():
+        request = LlmBackendRequest(system_instructions='', history=[], text='')
+
+        for (max_concurrent_requests, expected_batches) in [(1, 4), (4, 1)]:
+            backend = DummyLlmBackend(DummyLlmBackend.Config(latency_sec=0.05, max_concurrent_requests=max_concurrent_requests))
+
+            t0 = time.perf_counter()
+            await asyncio.gather(*[backend.send(request) for _ in range(0, 4)])
+            elapsed = time.perf_counter() - t0
+
+            assert 0.05 * expected_batches <= elapsed < 0.05 * expected_batches + 0.1
+
+    asyncio.run(main())
@@ -0,0 +1,310 @@
+import asyncio
+import gzip
+import socket
+import struct
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+pytest.importorskip("msgpack")
+
+from eventbus.backend.mwse_tcp import MwseTcpEventBusBackend, _ActiveClient
+from eventbus.backend.mwse_tcp_codec import JsonEventCodec, MsgpackEventCodec, try_parse_handshake_request
+from eventbus.backend.mwse_tcp_frame_parser import MwseTcpFrameParser
+from eventbus.backend.mwse_tcp_recorder import MwseTcpRecorder
+from eventbus.data.actor_ref import ActorRef
+from eventbus.event import Event
+from eventbus.event_data.event_data_from_game import EventDataFromGame
+from eventbus.event_data.event_data_rpc import EventDataRpc
+
+
+class FakeTransport:
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.writes = 0
+        self.closed = False
+
+    def write(self, data: bytes):
+        self.data.extend(data)
+        self.writes = self.writes + 1
+
+    def close(self):
+        self.closed = True
+
+    def get_write_buffer_size(self):
+        return 0
+
+
+def _sample_event() -> Event:
+    event = Event(data=EventDataFromGame.CrimeWitnessed(
+        type='crime_witnessed',
+        crime_type='theft',
+        value=10,
+        position=(1.0, 2.0, 3.0),
+        witness=ActorRef(ref_id='npc_1', type='npc', name='Фаргот', female=False)
+    ))
+    event.event_id = 7
+    return event
+
+
+@pytest.mark.parametrize("codec", [JsonEventCodec('cp1251'), MsgpackEventCodec()])
+def test_codec_roundtrip(codec):
+    event = _sample_event()
+
+    decoded = codec.decode(codec.encode(event))
+
+    assert decoded == event
+
+
+def test_handshake_request_is_detected_only_for_handshake_frames():
+    assert try_parse_handshake_request(b'{"type": "handshake_request", "codecs": ["msgpack"]}', 'cp1251') is not None
+    assert try_parse_handshake_request(b'{"event_id": 1, "data": {"type": "game_loaded"}}', 'cp1251') is None
+    assert try_parse_handshake_request(b'\x82\xa4data', 'cp1251') is None
+
+
+def test_handshake_switches_client_codec():
+    backend = MwseTcpEventBusBackend(MwseTcpEventBusBackend.Config(port=0, encoding='cp1251', codecs=['msgpack', 'json']))
+    transport = FakeTransport()
+    client = _ActiveClient(peer_name='test', transport=transport, codec=JsonEventCodec('cp1251'))  # type: ignore
+
+    request = try_parse_handshake_request(b'{"type": "handshake_request", "codecs": ["cbor", "msgpack"]}', 'cp1251')
+    assert request is not None
+    backend._handle_handshake(client, request)
+
+    frame = client.pending_frames[0]
+    size = struct.unpack('>I', frame[0:4])[0]
+    assert frame[4:4 + size] == b'{"type":"handshake_response","codec":"msgpack"}'
+    assert client.codec.name == 'msgpack'
+
+
+def test_ready_frames_are_coalesced_into_one_write():
+    async def run():
+        backend = MwseTcpEventBusBackend(MwseTcpEventBusBackend.Config(port=0, encoding='cp1251'))
+        transport = FakeTransport()
+        client = _ActiveClient(peer_name='test', transport=transport, codec=JsonEventCodec('cp1251'))  # type: ignore
+        backend._active_clients.append(client)
+
+        for _ in range(0, 10):
+            backend.publish_event_to_game(_sample_event())
+
+        sender = asyncio.create_task(backend._send_frames_to_client(client))
+        await asyncio.sleep(0)
+        sender.cancel()
+
+        assert transport.writes == 1
+        assert len(client.pending_frames) == 0
+
+        stats = backend.get_clients_stats()[0]
+        assert stats.frames_sent == 10
+        assert stats.bytes_sent == len(transport.data)
+        assert stats.queued_frames == 0
+
+        decoded = JsonEventCodec('cp1251').decode(bytes(transport.data[4:4 + struct.unpack('>I', transport.data[0:4])[0]]))
+        assert decoded == _sample_event()
+
+    asyncio.run(run())
+
+
+def test_client_is_disconnected_when_sending_fails():
+    class BrokenTransport(FakeTransport):
+        def write(self, data: bytes):
+            raise OSError("broken pipe")
+
+    async def run():
+        backend = MwseTcpEventBusBackend(MwseTcpEventBusBackend.Config(port=0, encoding='cp1251'))
+        transport = BrokenTransport()
+        client = _ActiveClient(peer_name='test', transport=transport, codec=JsonEventCodec('cp1251'))  # type: ignore
+        backend._active_clients.append(client)
+
+        backend.publish_event_to_game(_sample_event())
+        sender = asyncio.create_task(backend._send_frames_to_client(client))
+        await asyncio.sleep(0)
+
+        assert sender.done()
+        assert transport.closed
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("codec", [JsonEventCodec('cp1251'), MsgpackEventCodec()])
+def test_codec_two_phase_decode(codec):
+    event = _sample_event()
+
+    (header, payload) = codec.decode_header(codec.encode(event))
+    assert (header.type, header.event_id, header.response_to_event_id) == ('crime_witnessed', 7, None)
+    assert codec.decode_payload(header.type, payload) == event
+
+
+def test_json_header_peek_skips_nested_types():
+    # The mod's JSON encoder does not keep key order, nested "type" may come first.
+    text = ('{"data": {"witness": {"ref_id": "npc_1", "type": "npc", "name": "\\"type\\": \\"game_loaded\\"", "female": false}, '
+            '"type": "crime_witnessed", "crime_type": "theft", "value": 10, "position": [1.0, 2.0, 3.0]}, "event_id": 3}')
+
+    (header, _) = JsonEventCodec('cp1251').decode_header(text.encode('cp1251'))
+
+    assert (header.type, header.event_id, header.response_to_event_id) == ('crime_witnessed', 3, None)
+
+
+def test_events_without_handlers_are_not_fully_decoded():
+    backend = MwseTcpEventBusBackend(MwseTcpEventBusBackend.Config(port=0, encoding='cp1251'))
+    received: list[Event] = []
+    backend._callback_for_event_from_game = received.append
+    backend._is_event_type_needed = lambda event_type: event_type == 'game_loaded'
+    client = _ActiveClient(peer_name='test', transport=FakeTransport(), codec=JsonEventCodec('cp1251'))  # type: ignore
+    client.is_first_frame = False
+
+    with memoryview(JsonEventCodec('cp1251').encode(_sample_event())) as view:
+        backend._handle_frame(client, view)
+    with memoryview(b'{"event_id": 8, "data": {"type": "game_loaded"}}') as view:
+        backend._handle_frame(client, view)
+
+    assert [e.data.type for e in received] == ['game_loaded']
+    stats = {s.type: s for s in backend.get_decode_stats()}
+    assert (stats['crime_witnessed'].decoded, stats['crime_witnessed'].skipped) == (0, 1)
+    assert (stats['game_loaded'].decoded, stats['game_loaded'].skipped) == (1, 0)
+
+
+def test_rpc_requests_go_to_game_while_new_client_has_not_sent_handshake():
+    backend = MwseTcpEventBusBackend(MwseTcpEventBusBackend.Config(port=0, encoding='cp1251'))
+    backend._callback_for_event_from_game = lambda event: None
+    game = _ActiveClient(peer_name='game', transport=FakeTransport(), codec=JsonEventCodec('cp1251'))  # type: ignore
+    observer = _ActiveClient(peer_name='observer', transport=FakeTransport(), codec=JsonEventCodec('cp1251'))  # type: ignore
+
+    # The mod sends no handshake, its first frame is a usual event.
+    backend._active_clients.append(game)
+    with memoryview(b'{"event_id": 1, "data": {"type": "game_loaded"}}') as view:
+        backend._handle_frame(game, view)
+
+    # Until its handshake arrives the observer looks like a game too.
+    backend._active_clients.append(observer)
+    backend.publish_event_to_game(Event(event_id=2, data=EventDataRpc.GetEnvRequest(type='get_env_request')))
+
+    assert len(game.pending_frames) == 1
+    assert len(observer.pending_frames) == 0
+
+    with memoryview(b'{"type": "handshake_request", "role": "observer", "codecs": ["json"]}') as view:
+        backend._handle_frame(observer, view)
+    assert observer.role == 'observer'
+    assert backend._get_authoritative_game_client() is game
+
+
+def test_rpc_requests_go_to_pending_client_without_confirmed_game():
+    backend = MwseTcpEventBusBackend(MwseTcpEventBusBackend.Config(port=0, encoding='cp1251'))
+    game = _ActiveClient(peer_name='game', transport=FakeTransport(), codec=JsonEventCodec('cp1251'))  # type: ignore
+    backend._active_clients.append(game)
+
+    backend.publish_event_to_game(Event(event_id=1, data=EventDataRpc.GetEnvRequest(type='get_env_request')))
+
+    assert len(game.pending_frames) == 1
+
+
+def _frame(msg_bytes: bytes) -> bytes:
+    return struct.pack('>I', len(msg_bytes)) + msg_bytes
+
+
+def test_frame_parser_handles_many_and_split_frames():
+    frames: list[bytes] = []
+    parser = MwseTcpFrameParser(lambda view: frames.append(bytes(view)), max_frame_size=1024)
+
+    stream = _frame(b'a') + _frame(b'') + _frame(b'bc' * 100) + _frame(b'd')
+    parser.feed(stream[0:3])
+    parser.feed(stream[3:20])
+    parser.feed(stream[20:])
+
+    assert frames == [b'a', b'', b'bc' * 100, b'd']
+    assert parser.buffered_bytes == 0
+
+    with pytest.raises(Exception, match="above the limit"):
+        parser.feed(_frame(b'x' * 2000))
+
+
+def test_server_decodes_frames_from_one_chunk():
+    async def run():
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(('localhost', 0))
+            port = s.getsockname()[1]
+
+        backend = MwseTcpEventBusBackend(MwseTcpEventBusBackend.Config(port=port, encoding='cp1251'))
+        received: list[Event] = []
+        backend.start(received.append)
+
+        for _ in range(0, 50):
+            try:
+                reader, writer = await asyncio.open_connection('localhost', port)
+                break
+            except OSError:
+                await asyncio.sleep(0.05)
+
+        msg_bytes = JsonEventCodec('cp1251').encode(_sample_event())
+        stream = _frame(msg_bytes) * 3
+        writer.write(stream + stream[0:10])
+        await writer.drain()
+        await asyncio.sleep(0.05)
+        writer.write(stream[10:len(msg_bytes) + 4])
+        await writer.drain()
+
+        for _ in range(0, 50):
+            if len(received) == 4:
+                break
+            await asyncio.sleep(0.01)
+        assert received == [_sample_event()] * 4
+
+        backend.publish_event_to_game(_sample_event())
+        size = struct.unpack('>I', await reader.readexactly(4))[0]
+        assert JsonEventCodec('cp1251').decode(await reader.readexactly(size)) == _sample_event()
+
+        writer.close()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("file_name", ["session.jsonl", "session.jsonl.gz"])
+def test_recorder_writes_readable_session(tmp_path, file_name):
+    path = str(tmp_path / file_name)
+    recorder = MwseTcpRecorder(path)
+    recorder.record('in', '127.0.0.1:1', _sample_event())
+    recorder.record('out', '*', _sample_event())
+    recorder.close()
+
+    frames = list(MwseTcpRecorder.read(path))
+
+    assert [f.dir for f in frames] == ['in', 'out']
+    assert frames[0].t <= frames[1].t
+    assert frames[0].event == _sample_event()
+
+
+def test_recorder_reads_unclosed_gzip_session(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    recorder = MwseTcpRecorder(path)
+    recorder.record('in', '127.0.0.1:1', _sample_event())
+    recorder.record('out', '*', _sample_event())
+    recorder._file.flush()
+
+    # What is on disk if the server is killed: flushed frames without the gzip trailer.
+    crashed_path = str(tmp_path / "crashed.jsonl.gz")
+    with open(path, 'rb') as src, open(crashed_path, 'wb') as dst:
+        dst.write(src.read())
+    recorder.close()
+
+    frames = list(MwseTcpRecorder.read(crashed_path))
+    assert [f.dir for f in frames] == ['in', 'out']
+
+
+def test_server_closes_recorder_on_shutdown(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+
+    async def run():
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(('localhost', 0))
+            port = s.getsockname()[1]
+
+        backend = MwseTcpEventBusBackend(MwseTcpEventBusBackend.Config(port=port, encoding='cp1251', record_path=path))
+        backend.start(lambda event: None)
+        await asyncio.sleep(0.05)
+        backend.publish_event_to_game(_sample_event())
+
+    # asyncio.run() cancels the server task on the way out.
+    asyncio.run(run())
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        assert len(f.read().splitlines()) == 1
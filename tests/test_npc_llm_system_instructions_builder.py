@@ -0,0 +1,91 @@
+import random
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from eventbus.data.actor_ref import ActorRef
+from game.data.npc import Npc
+from game.data.npc_behavior import NpcBehavior
+from game.data.npc_personality import NpcPersonality
+from game.data.story import Story
+from game.i18n.i18n import I18n
+from game.service.npc_services.npc_llm_system_instructions_builder import NpcLlmSystemInstructionsBuilder
+from llm.message import LlmMessage
+from sample_traffic import sample_env_data, sample_npc_data, sample_player_data
+from tts.voice import Voice
+
+
+def _npc(index: int):
+    npc_data = sample_npc_data(index)
+    return Npc(
+        actor_ref=ActorRef(ref_id=npc_data.ref_id, type='npc', name=npc_data.name, female=npc_data.female),
+        npc_data=npc_data,
+        personality=NpcPersonality(
+            background="Родился в Сейда Нин и никогда не покидал его.",
+            voice=Voice(female=npc_data.female, accent='none', elevenlabs=Voice.Elevenlabs())
+        ),
+        personal_story=Story(),
+        behavior=NpcBehavior(last_processed_story_item_id=None, relation_to_other_npc={})
+    )
+
+
+def _builder(env, section_cache_size: int = 1024):
+    return NpcLlmSystemInstructionsBuilder(
+        NpcLlmSystemInstructionsBuilder.Config(section_cache_size=section_cache_size),
+        SimpleNamespace(local_player=SimpleNamespace(player_data=sample_player_data())),  # type: ignore
+        env,
+        SimpleNamespace(dropped_items=[]),  # type: ignore
+        SimpleNamespace(get_cell_name=lambda name: name),  # type: ignore
+        I18n(),
+        SimpleNamespace(pois=[])  # type: ignore
+    )
+
+
+def test_system_instructions_start_with_part_stable_between_turns():
+    env = SimpleNamespace(env=sample_env_data(random.Random(1)))
+    builder = _builder(env)
+    npc = _npc(0)
+
+    first = builder.build(npc, [_npc(1)], [LlmMessage(role='user', text="Привет")])
+
+    env.env = sample_env_data(random.Random(2)).model_copy(update={'current_weather': "Ash storm"})
+    npc.npc_data.player_distance = npc.npc_data.player_distance + 500
+    second = builder.build(npc, [_npc(1), _npc(2)], [LlmMessage(role='user', text="Привет"), LlmMessage(role='user', text="Как дела?")])
+
+    stable_prefix = first.text[:first.stable_prefix_len]
+    assert second.text[:second.stable_prefix_len] == stable_prefix
+    assert "# ПРАВИЛА" in stable_prefix
+    assert "Текущая погода" not in stable_prefix
+    assert "Ash storm" in second.text[second.stable_prefix_len:]
+    assert second.text.endswith("Как дела?")
+
+
+def test_memoized_sections_follow_changed_inputs():
+    env = SimpleNamespace(env=sample_env_data(random.Random(1)))
+    builder = _builder(env)
+    npcs = [_npc(i) for i in range(0, 4)]
+    messages = [LlmMessage(role='user', text="Привет")]
+
+    for npc in npcs:
+        builder.build(npc, [other for other in npcs if other is not npc], messages)
+    misses = builder.get_stats().section_misses
+
+    # Nothing changed, every section comes from the cache.
+    builder.build(npcs[0], npcs[1:], messages)
+    assert builder.get_stats().section_misses == misses
+
+    npcs[1].npc_data.position = npcs[1].npc_data.position.model_copy(update={'x': npcs[1].npc_data.position.x + 1000})
+    npcs[0].npc_data.equipped = npcs[0].npc_data.equipped[1:]
+    npcs[0].npc_data.player_distance = npcs[0].npc_data.player_distance + 500
+    npcs[0].behavior.relation_to_other_npc[npcs[2].actor_ref.ref_id] = 95
+
+    for npc in npcs:
+        other_npcs = [other for other in npcs if other is not npc]
+        assert builder.build(npc, other_npcs, messages) == _builder(env, 0).build(npc, other_npcs, messages)
+    assert builder.get_stats().section_hits > 0
@@ -0,0 +1,124 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+
+from eventbus.data.actor_ref import ActorRef
+from game.service.npc_services.npc_speech_stream import NpcSpeechStream
+from llm.backend.dummy import DummyLlmBackend
+from llm.system import LlmSystem
+
+_ACTOR = ActorRef(ref_id='fargoth00000000', type='npc', name='Fargoth', female=False)
+
+
+class _FakeSpeaker:
+    def __init__(self, tts_sec: float = 0.01) -> None:
+        self.tts_sec = tts_sec
+        self.holder: Optional[ActorRef] = _ACTOR
+        self.said: list[str] = []
+        self.released = 0
+
+    async def prepare_voiceover(self, npc, text: str):
+        await asyncio.sleep(self.tts_sec)
+        return SimpleNamespace(file_path=f"{text}.mp3") if text != "тишина." else None
+
+    def is_scene_locked_by(self, holder: ActorRef):
+        return self.holder == holder
+
+    async def say(self, npc, text: str, target, voiceover, hold_scene: bool = False):
+        assert hold_scene
+        if voiceover is None:
+            return None
+        self.said.append(text)
+        return 1.0
+
+    def release_scene_after_speech(self, npc):
+        self.released = self.released + 1
+
+
+def _create(speaker: _FakeSpeaker, min_part_chars: int = 1):
+    config = NpcSpeechStream.Config(enabled=True, min_part_chars=min_part_chars)
+    return NpcSpeechStream(config, SimpleNamespace(actor_ref=_ACTOR), speaker, lambda text: text.replace("trigger_insult", "").strip())  # type: ignore
+
+
+def test_npc_speech_stream_says_sentences_before_the_line_is_generated():
+    async def main():
+        speaker = _FakeSpeaker()
+        stream = _create(speaker)
+
+        stream.add_text("Привет, чужеземец. Как")
+        await asyncio.sleep(0.05)
+        # The first sentence is said while the rest is still being generated.
+        assert speaker.said == ["Привет, чужеземец."]
+        assert speaker.released == 0
+
+        stream.add_text(" дела? trigger_insult Уходи")
+        stream.finish()
+        assert await stream.wait_started()
+        await asyncio.sleep(0.05)
+
+        assert speaker.said == ["Привет, чужеземец.", "Как дела?", "Уходи"]
+        assert speaker.released == 1
+        # Every part is 1 s long.
+        assert await stream.wait_finished() == 3.0
+
+    asyncio.run(main())
+
+
+def test_npc_speech_stream_stops_when_scene_is_taken_over():
+    async def main():
+        speaker = _FakeSpeaker()
+        stream = _create(speaker)
+
+        stream.add_text("Первое предложение. ")
+        await asyncio.sleep(0.05)
+        speaker.holder = None
+        stream.add_text("Второе предложение. Третье.")
+        stream.finish()
+        await asyncio.sleep(0.05)
+
+        assert speaker.said == ["Первое предложение."]
+        assert speaker.released == 0
+
+    asyncio.run(main())
+
+
+def test_npc_speech_stream_leaves_scene_as_is_when_nothing_is_said():
+    async def main():
+        speaker = _FakeSpeaker()
+
+        empty = _create(speaker)
+        empty.add_text("trigger_insult")
+        empty.finish()
+        assert not await empty.wait_started()
+
+        silent = _create(speaker)
+        silent.add_text("тишина.")
+        silent.finish()
+        assert not await silent.wait_started()
+        assert await silent.wait_finished() is None
+
+        assert speaker.said == []
+        assert speaker.released == 0
+
+    asyncio.run(main())
+
+
+def test_llm_session_streams_message():
+    async def main():
+        llm = LlmSystem(LlmSystem.Config(system=LlmSystem.Config.Dummy(
+            type='dummy', dummy=DummyLlmBackend.Config(latency_sec=0.05, response_text="Раз два. Три."))))
+        session = llm.create_session()
+        session.reset(system_instructions="", messages=[])
+
+        pieces: list[str] = []
+        async for piece in session.stream_message(user_text="Привет"):
+            pieces.append(piece)
+
+        assert pieces == ["Раз", " два.", " Три."]
+        assert session._messages[-1].text == "Раз два. Три."
+
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+import asyncio
+from typing import Optional
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+
+from eventbus.data.actor_ref import ActorRef
+from game.service.npc_services.npc_llm_pick_actor_service import NpcLlmPickActorService
+from game.service.scene.npc_turn_pipeline import NpcTurn, NpcTurnPipeline
+
+
+def _create_turn():
+    actor = ActorRef(ref_id='fargoth00000000', type='npc', name='Fargoth', female=False)
+    return NpcTurn([], NpcLlmPickActorService.Response(actor, '', pass_reason_to_npc=False))
+
+
+def test_npc_turn_pipeline_is_noop_when_disabled():
+    async def main():
+        prepared = 0
+
+        async def prepare():
+            nonlocal prepared
+            prepared = prepared + 1
+            return _create_turn()
+
+        pipeline = NpcTurnPipeline(NpcTurnPipeline.Config(), prepare)
+        pipeline.start()
+        await asyncio.sleep(0)
+
+        assert await pipeline.take() is None
+        assert prepared == 0
+
+    asyncio.run(main())
+
+
+def test_npc_turn_pipeline_counts_hits_and_misses():
+    async def main():
+        async def prepare():
+            await asyncio.sleep(0.01)
+            return _create_turn()
+
+        pipeline = NpcTurnPipeline(NpcTurnPipeline.Config(enabled=True), prepare)
+
+        pipeline.start()
+        turn = await pipeline.take()
+        assert turn is not None
+        assert turn.actor_pick_response.actor_to_act.name == 'Fargoth'
+
+        # Taken turns are not reused.
+        assert await pipeline.take() is None
+
+        pipeline.start()
+        pipeline.invalidate('story_item')
+        assert await pipeline.take() is None
+
+        pipeline.start()
+        pipeline.start()
+        assert await pipeline.take() is not None
+
+        # Nothing to discard.
+        pipeline.invalidate('player_says')
+
+        stats = pipeline.get_stats()
+        assert stats.hits == 2
+        assert stats.misses == {'story_item': 1, 'restarted': 1}
+
+    asyncio.run(main())
+
+
+def test_npc_turn_pipeline_discards_turn_while_it_is_awaited():
+    async def main():
+        async def prepare():
+            await asyncio.sleep(1.0)
+            return _create_turn()
+
+        pipeline = NpcTurnPipeline(NpcTurnPipeline.Config(enabled=True), prepare)
+        pipeline.start()
+
+        async def player_says():
+            await asyncio.sleep(0.01)
+            pipeline.invalidate('player_says')
+
+        invalidation = asyncio.create_task(player_says())
+        turn: Optional[NpcTurn] = await asyncio.wait_for(pipeline.take(), 0.5)
+        await invalidation
+
+        assert turn is None
+        assert pipeline.get_stats().misses == {'player_says': 1}
+
+    asyncio.run(main())
+
+
+def test_npc_turn_pipeline_counts_failed_preparation():
+    async def main():
+        async def prepare() -> Optional[NpcTurn]:
+            raise Exception("LLM is down")
+
+        pipeline = NpcTurnPipeline(NpcTurnPipeline.Config(enabled=True), prepare)
+        pipeline.start()
+
+        assert await pipeline.take() is None
+        assert pipeline.get_stats().misses == {'failed': 1}
+
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from eventbus.data.actor_ref import ActorRef
+from game.service.player_services.player_intention_analyzer import PlayerIntentionAnalyzer
+from game.service.player_services.player_intention_classifier import PlayerIntentionClassifier
+from llm.backend.dummy import DummyLlmBackend
+from llm.system import LlmSystem
+
+_TARGET = ActorRef(ref_id='fargoth00000000', type='npc', name='Fargoth', female=False)
+_TOPICS = ["задания", "вступить в Гильдию магов", "слухи"]
+
+
+def test_classifier_decides_clear_cases_and_defers_the_rest():
+    classifier = PlayerIntentionClassifier()
+
+    assert classifier.classify("Замолчите все!", [], _TARGET) == ('intent', ['npc_shut_up'])
+    assert classifier.classify("Хватит драться!", [], _TARGET) == ('intent', ['npc_stop_combat'])
+    assert classifier.classify("Не ходи за мной.", [], _TARGET) == ('intent', ['npc_stop_follow'])
+    assert classifier.classify("О чем можно поговорить предметно?", _TOPICS, _TARGET) == ('intent', ['list_available_dialog_topics'])
+    assert classifier.classify("Давай предметно про задание", _TOPICS, _TARGET) == ('intent', ['trigger_dialog_topic:задания'])
+    assert classifier.classify("Что скажете, болваны?", [], None) == ('intent', ['npc_sheogorath_mad'])
+
+    assert classifier.classify("Какая сегодня погода?", _TOPICS, _TARGET) == ('none', ['none'])
+
+    # Looks intent-like, only the LLM can tell.
+    assert classifier.classify("Он ушел молча.", [], _TARGET).decision == 'unsure'
+    assert classifier.classify("Хочу предметно обсудить следующее распоряжение", _TOPICS, _TARGET).decision == 'unsure'
+    # The cue word and a short common prefix ('пред') are not a topic match.
+    assert classifier.classify("Я хочу предметно обсудить слухи", ["предсказания", "задания"], None).decision == 'unsure'
+    assert classifier.classify("Хочу предметно обсудить задачи", ["задания", "задачи гильдии"], _TARGET).decision == 'unsure'
+    # A negated command is not a command.
+    assert classifier.classify("Я не хочу молчать об этом", [], _TARGET).decision == 'unsure'
+    assert classifier.classify("Не молчи!", [], _TARGET).decision == 'unsure'
+
+
+def test_classifier_on_evaluation_set():
+    path = Path(__file__).resolve().parents[1] / "benchmarks" / "player_intents.jsonl"
+    with open(path, 'r', encoding='utf-8') as f:
+        samples = [json.loads(line) for line in f if len(line.strip()) > 0]
+
+    classifier = PlayerIntentionClassifier()
+    wrong: list[str] = []
+    for sample in samples:
+        result = classifier.classify(sample['text'], sample.get('topics', []), _TARGET if sample.get('target', True) else None)
+        if result.decision == 'unsure':
+            continue
+
+        predicted = set(filter(lambda l: l != 'none', result.lines))
+        if predicted != set(sample['expected']):
+            wrong.append(sample['text'])
+
+    assert wrong == []
+
+
+def test_analyzer_skips_llm_when_local_classifier_is_sure():
+    async def main():
+        llm = LlmSystem(LlmSystem.Config(system=LlmSystem.Config.Dummy(type='dummy', dummy=DummyLlmBackend.Config())))
+        analyzer = PlayerIntentionAnalyzer(PlayerIntentionAnalyzer.Config(local_classifier=True), llm)
+
+        response = await analyzer.analyze_player_intention("Заткнитесь!", [], _TARGET)
+        assert response.npc_shut_up
+
+        response = await analyzer.analyze_player_intention("Давай предметно о слухах", _TOPICS, _TARGET)
+        assert response.trigger_dialog_topic == "слухи"
+
+        response = await analyzer.analyze_player_intention("Как дела?", [], _TARGET)
+        assert response == PlayerIntentionAnalyzer.Response()
+
+        response = await analyzer.analyze_player_intention("Я видел драку у таверны", [], _TARGET)
+        assert response == PlayerIntentionAnalyzer.Response()
+
+        assert analyzer.local_decisions == {'intent': 2, 'none': 1, 'unsure': 1}
+
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+
+from game.service.player_services.player_intention_analyzer import PlayerIntentionAnalyzer
+from game.service.player_services.player_speech_speculator import PlayerSpeechSpeculator
+
+
+class _FakeAnalyzer:
+    def __init__(self) -> None:
+        self.texts: list[str] = []
+
+    async def analyze(self, text: str):
+        self.texts.append(text)
+        await asyncio.sleep(0.05)
+        return PlayerIntentionAnalyzer.Response(npc_shut_up='замолчи' in text)
+
+
+def _create(analyzer: _FakeAnalyzer, **kwargs):
+    config = PlayerSpeechSpeculator.Config(enabled=True, stable_sec=0.05, **kwargs)
+    return PlayerSpeechSpeculator(config, analyzer.analyze)
+
+
+def test_player_speech_speculator_uses_result_for_matching_final_text():
+    async def main():
+        analyzer = _FakeAnalyzer()
+        speculator = _create(analyzer)
+
+        speculator.on_partial_text("все")
+        speculator.on_partial_text("все замолчи")
+        await asyncio.sleep(0.02)
+        speculator.on_partial_text("все замолчите")
+        await asyncio.sleep(0.1)
+
+        # Only the partial text which stayed the same for stable_sec was analyzed.
+        assert analyzer.texts == ["все замолчите"]
+
+        response = await speculator.take("Все замолчите!")
+        assert response is not None and response.npc_shut_up
+        assert speculator.get_stats().hits == 1
+
+        # The result is used once.
+        assert await speculator.take("Все замолчите!") is None
+
+    asyncio.run(main())
+
+
+def test_player_speech_speculator_discards_result_for_different_final_text():
+    async def main():
+        analyzer = _FakeAnalyzer()
+        speculator = _create(analyzer, similarity_threshold=0.8)
+
+        speculator.on_partial_text("как пройти")
+        await asyncio.sleep(0.07)
+
+        assert await speculator.take("как пройти к гильдии магов") is None
+        assert speculator.get_stats().misses == {'mismatch': 1}
+
+    asyncio.run(main())
+
+
+def test_player_speech_speculator_skips_short_and_disabled():
+    async def main():
+        analyzer = _FakeAnalyzer()
+
+        speculator = _create(analyzer, min_words=3)
+        speculator.on_partial_text("привет там")
+        await asyncio.sleep(0.1)
+        assert await speculator.take("привет там") is None
+
+        disabled = PlayerSpeechSpeculator(PlayerSpeechSpeculator.Config(stable_sec=0.0), analyzer.analyze)
+        disabled.on_partial_text("привет как дела")
+        await asyncio.sleep(0.05)
+        assert await disabled.take("привет как дела") is None
+
+        assert analyzer.texts == []
+
+    asyncio.run(main())
+
+
+def test_player_speech_speculator_similarity():
+    assert PlayerSpeechSpeculator.get_similarity("Привет", "привет") == 1.0
+    assert PlayerSpeechSpeculator.get_similarity("привет", "пока") < 0.5
@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+
+from eventbus.data.id_with_name import IdWithName
+from eventbus.data.player_data_fast import PlayerDataFast
+from eventbus.data.position import Position
+from eventbus.event import Event
+from eventbus.event_data.event_data_rpc import EventDataRpc
+from eventbus.rpc import Rpc
+
+
+class FakeEventBus:
+    def __init__(self) -> None:
+        self.handlers = []
+        self.produced: list[Event] = []
+        self._next_event_id = 1
+
+    def register_handler(self, handler, types=None):
+        self.handlers.append(handler)
+
+    def produce_event(self, event: Event):
+        event.event_id = self._next_event_id
+        self._next_event_id = self._next_event_id + 1
+        self.produced.append(event)
+
+    async def reply(self, request: Event, data):
+        response = Event(data=data)
+        response.response_to_event_id = request.event_id
+        for h in self.handlers:
+            await h(response)
+
+
+def _player_data_fast() -> PlayerDataFast:
+    return PlayerDataFast(
+        health_normalized=1.0,
+        position=Position(x=0, y=0, z=0),
+        cell=IdWithName(id='Seyda Neen', name='Сейда Нин'),
+        in_dialog=False,
+        weapon_drawn=False,
+        gold=10
+    )
+
+
+def test_rpc_call_resolves_as_soon_as_response_arrives():
+    async def run():
+        bus = FakeEventBus()
+        rpc = Rpc(Rpc.Config(max_wait_time_sec=5), bus)  # type: ignore
+
+        request = EventDataRpc.IsRefValidRequest(type='is_ref_valid_request', ref_id='ref_1')
+        call = asyncio.create_task(rpc._call(Event(data=request)))
+        await asyncio.sleep(0)
+
+        assert len(bus.produced) == 1
+        await bus.reply(bus.produced[0], EventDataRpc.IsRefValidResponse(type='is_ref_valid_response', is_valid=True))
+
+        response = await asyncio.wait_for(call, timeout=0.01)
+        assert response.data.type == 'is_ref_valid_response'
+        assert rpc._request_event_id_to_response_future == {}
+
+    asyncio.run(run())
+
+
+def test_rpc_call_timeout_cleans_up_pending_future():
+    async def run():
+        bus = FakeEventBus()
+        rpc = Rpc(Rpc.Config(max_wait_time_sec=0.01), bus)  # type: ignore
+
+        with pytest.raises(Exception, match="RPC call timeout"):
+            await rpc.get_env()
+
+        assert rpc._request_event_id_to_response_future == {}
+
+        # Late response must not resurrect the finished call.
+        await bus.reply(bus.produced[0], EventDataRpc.IsRefValidResponse(type='is_ref_valid_response', is_valid=True))
+        assert rpc._request_event_id_to_response_future == {}
+
+    asyncio.run(run())
+
+
+def test_rpc_get_npcs_data_sends_one_batched_request():
+    async def run():
+        bus = FakeEventBus()
+        rpc = Rpc(Rpc.Config(max_wait_time_sec=5), bus)  # type: ignore
+
+        call = asyncio.create_task(rpc.get_npcs_data(['npc_1', 'npc_2']))
+        await asyncio.sleep(0)
+
+        assert len(bus.produced) == 1
+        request = bus.produced[0]
+        assert request.data.type == 'get_npcs_request'
+        assert request.data.npc_ref_ids == ['npc_1', 'npc_2']
+
+        await bus.reply(request, EventDataRpc.GetNpcsResponse(type='get_npcs_response', npcs_data=[]))
+        assert await call == []
+
+    asyncio.run(run())
+
+
+async def _settle():
+    # Shared calls are sent from their own task, one more loop iteration away.
+    for _ in range(0, 3):
+        await asyncio.sleep(0)
+
+
+def test_identical_concurrent_rpc_calls_share_one_round_trip():
+    async def run():
+        bus = FakeEventBus()
+        rpc = Rpc(Rpc.Config(max_wait_time_sec=5), bus)  # type: ignore
+
+        calls = [asyncio.create_task(rpc.get_local_player_fast()) for _ in range(0, 3)]
+        other = asyncio.create_task(rpc.get_env())
+        await _settle()
+
+        assert [e.data.type for e in bus.produced] == ['get_local_player_fast_request', 'get_env_request']
+        await bus.reply(bus.produced[0], EventDataRpc.GetLocalPlayerFastResponse(
+            type='get_local_player_fast_response', player_data_fast=_player_data_fast()))
+
+        results = await asyncio.wait_for(asyncio.gather(*calls), timeout=0.1)
+        assert all(r is results[0] for r in results)
+        assert rpc._request_key_to_shared_call.keys() == {bus.produced[1].data.model_dump_json()}
+
+        other.cancel()
+
+        # Without TTL the next call goes to the game again.
+        next_call = asyncio.create_task(rpc.get_local_player_fast())
+        await _settle()
+        assert len(bus.produced) == 3
+        next_call.cancel()
+
+    asyncio.run(run())
+
+
+def test_rpc_response_is_reused_within_ttl():
+    async def run():
+        bus = FakeEventBus()
+        rpc = Rpc(Rpc.Config(max_wait_time_sec=5, cache_ttl_sec={'get_actors_nearby_request': 60}), bus)  # type: ignore
+
+        def request(actor_ref_id: str):
+            return EventDataRpc.GetActorsNearbyRequest(
+                type='get_actors_nearby_request', actor_ref_id=actor_ref_id, radius_ingame=100.0, test_line_of_sight=True)
+
+        call = asyncio.create_task(rpc.get_actors_nearby(request('player')))
+        await _settle()
+        await bus.reply(bus.produced[0], EventDataRpc.GetActorsNearbyResponse(type='get_actors_nearby_response', actors=[]))
+        first = await asyncio.wait_for(call, timeout=0.1)
+
+        assert await asyncio.wait_for(rpc.get_actors_nearby(request('player')), timeout=0.1) is first
+        assert len(bus.produced) == 1
+
+        # Different payload is a different request.
+        other = asyncio.create_task(rpc.get_actors_nearby(request('npc_1')))
+        await _settle()
+        assert len(bus.produced) == 2
+        other.cancel()
+
+    asyncio.run(run())
+
+
+def test_expired_rpc_responses_are_dropped_without_being_asked_again():
+    async def run():
+        bus = FakeEventBus()
+        rpc = Rpc(Rpc.Config(max_wait_time_sec=5, cache_ttl_sec={'get_actors_nearby_request': 0.5}), bus)  # type: ignore
+
+        # Every actor is queried once, as NPCs come and go.
+        for i in range(0, 20):
+            call = asyncio.create_task(rpc.get_actors_nearby(EventDataRpc.GetActorsNearbyRequest(
+                type='get_actors_nearby_request', actor_ref_id=f"npc_{i}", radius_ingame=100.0, test_line_of_sight=True)))
+            await _settle()
+            await bus.reply(bus.produced[-1], EventDataRpc.GetActorsNearbyResponse(type='get_actors_nearby_response', actors=[]))
+            await asyncio.wait_for(call, timeout=0.1)
+
+        assert len(rpc._request_key_to_cached_response) == 20
+
+        await asyncio.sleep(0.6)
+        assert len(rpc._request_key_to_cached_response) == 0
+
+    asyncio.run(run())
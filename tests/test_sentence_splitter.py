@@ -0,0 +1,40 @@
+from game.service.util.sentence_splitter import SentenceSplitter
+
+
+def _split(deltas: list[str], min_chars: int = 1):
+    splitter = SentenceSplitter(min_chars)
+    sentences: list[str] = []
+    for delta in deltas:
+        sentences.extend(splitter.add(delta))
+    rest = splitter.flush()
+    if rest is not None:
+        sentences.append(rest)
+    return sentences
+
+
+def test_sentence_splitter_cuts_streamed_text_at_sentence_ends():
+    text = "Привет, чужеземец! Как дела? Я слышал... что-то странное. Пока"
+    expected = ["Привет, чужеземец!", "Как дела?", "Я слышал...", "что-то странное.", "Пока"]
+
+    assert _split([text]) == expected
+    # The same sentences however the text is cut into deltas.
+    assert _split(list(text)) == expected
+    assert _split([(' ' if i > 0 else '') + w for (i, w) in enumerate(text.split(' '))]) == expected
+    assert _split([text[:20], text[20:41], text[41:]]) == expected
+
+
+def test_sentence_splitter_keeps_brackets_numbers_and_quotes_together():
+    assert _split(["(Я сказал Fargoth. Тихо.) Уходи. Цена 3.5 дрейка. «Стой!» Ладно"]) == [
+        "(Я сказал Fargoth. Тихо.) Уходи.",
+        "Цена 3.5 дрейка.",
+        "«Стой!»",
+        "Ладно",
+    ]
+
+
+def test_sentence_splitter_joins_short_sentences():
+    assert _split(["Да. Нет. Конечно, я помогу тебе. Ну."], min_chars=10) == [
+        "Да. Нет. Конечно, я помогу тебе.",
+        "Ну.",
+    ]
+    assert _split(["   "]) == []
@@ -0,0 +1,110 @@
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from eventbus.data.actor_ref import ActorRef
+from eventbus.data.env_data import _AshFallData
+from eventbus.data.id_with_name import IdWithName
+from eventbus.event import Event
+from game.data.player import Player
+from game.data.story import Story
+from game.service.player_services.player_provider import PlayerProvider
+from game.service.providers.env_provider import EnvProvider
+from sample_traffic import sample_env_data, sample_player_data
+
+
+class FakeConsumer:
+    def __init__(self) -> None:
+        self.handlers = []
+
+    def register_handler(self, handler, types=None):
+        self.handlers.append(handler)
+
+    async def push(self, json_payload: str):
+        event = Event.model_validate_json(json_payload)
+        for h in self.handlers:
+            await h(event)
+
+
+def test_player_state_delta_merges_only_sent_fields():
+    async def run():
+        player_data = sample_player_data(random.Random(1))
+        player_data.weapon = IdWithName(id='iron dagger', name='Железный кинжал')
+        player_data.gold = 10
+        player = Player(
+            actor_ref=ActorRef(ref_id=player_data.ref_id, type='player', name=player_data.name, female=player_data.female),
+            player_data=player_data,
+            personal_story=Story()
+        )
+
+        consumer = FakeConsumer()
+        provider = PlayerProvider(None, player, consumer)  # type: ignore
+        assert provider._get_fast_poll_interval() == PlayerProvider.FAST_POLL_INTERVAL_SEC
+
+        health_before = player_data.health_normalized
+        await consumer.push('{"data": {"type": "player_state_delta", "gold": 25, "weapon_drawn": true, "cleared": ["weapon"]}}')
+
+        assert player.player_data.gold == 25
+        assert player.player_data.weapon_drawn
+        assert player.player_data.weapon is None
+        assert player.player_data.health_normalized == health_before
+        assert provider._get_fast_poll_interval() == PlayerProvider.FAST_POLL_FALLBACK_INTERVAL_SEC
+
+    asyncio.run(run())
+
+
+def test_env_state_delta_merges_into_env():
+    async def run():
+        env_data = sample_env_data(random.Random(1))
+        env_data.current_hour = 9.0
+        consumer = FakeConsumer()
+        provider = EnvProvider(env_data, None, consumer)  # type: ignore
+
+        await consumer.push('{"data": {"type": "env_state_delta", "current_hour": 9.5, "current_weather": "Rain"}}')
+
+        assert provider.env.current_hour == 9.5
+        assert provider.env.current_weather == 'Rain'
+        assert provider.now().game_time.hour == 9.5
+        assert provider._get_poll_interval() == EnvProvider.POLL_FALLBACK_INTERVAL_SEC
+
+    asyncio.run(run())
+
+
+def test_polling_is_back_to_normal_without_fresh_deltas_or_with_ashfall():
+    async def run():
+        env_data = sample_env_data(random.Random(1))
+        player_data = sample_player_data(random.Random(1))
+        player = Player(
+            actor_ref=ActorRef(ref_id=player_data.ref_id, type='player', name=player_data.name, female=player_data.female),
+            player_data=player_data,
+            personal_story=Story()
+        )
+
+        consumer = FakeConsumer()
+        env_provider = EnvProvider(env_data, None, consumer)  # type: ignore
+        player_provider = PlayerProvider(None, player, consumer)  # type: ignore
+
+        # Empty deltas only tell that the game is still pushing them.
+        await consumer.push('{"data": {"type": "env_state_delta"}}')
+        await consumer.push('{"data": {"type": "player_state_delta"}}')
+        assert env_provider._get_poll_interval() == EnvProvider.POLL_FALLBACK_INTERVAL_SEC
+        assert player_provider._get_fast_poll_interval() == PlayerProvider.FAST_POLL_FALLBACK_INTERVAL_SEC
+
+        env_provider._last_delta_at = env_provider._last_delta_at - EnvProvider.DELTA_TIMEOUT_SEC - 1  # type: ignore
+        player_provider._last_delta_at = player_provider._last_delta_at - PlayerProvider.DELTA_TIMEOUT_SEC - 1  # type: ignore
+        assert env_provider._get_poll_interval() == EnvProvider.POLL_INTERVAL_SEC
+        assert player_provider._get_fast_poll_interval() == PlayerProvider.FAST_POLL_INTERVAL_SEC
+
+        # Ashfall data is not in the deltas.
+        await consumer.push('{"data": {"type": "env_state_delta"}}')
+        env_provider.env.ashfall = _AshFallData.model_construct()
+        assert env_provider._get_poll_interval() == EnvProvider.POLL_INTERVAL_SEC
+
+    asyncio.run(run())
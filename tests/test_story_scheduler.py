@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+
+from game.service.scene.story_scheduler import StoryScheduler
+
+
+def test_story_scheduler_debounces_wakes_into_one_run():
+    async def main():
+        runs: list[float] = []
+
+        async def run():
+            runs.append(asyncio.get_event_loop().time())
+
+        scheduler = StoryScheduler(StoryScheduler.Config(debounce_sec=0.05, idle_timeout_sec=10.0), lambda: True, run)
+        scheduler.start()
+        await asyncio.sleep(0)
+
+        started_at = asyncio.get_event_loop().time()
+        scheduler.wake('story_item')
+        scheduler.wake('scene_unlocked')
+        scheduler.wake('story_item')
+        await asyncio.sleep(0.2)
+
+        assert len(runs) == 1
+        assert 0.04 <= runs[0] - started_at < 0.2
+        assert scheduler.wakes == {'story_item': 2, 'scene_unlocked': 1}
+        assert scheduler.runs == 1
+
+    asyncio.run(main())
+
+
+def test_story_scheduler_runs_on_idle_timeout_and_respects_can_run():
+    async def main():
+        can_run = False
+        runs = 0
+
+        async def run():
+            nonlocal runs
+            runs = runs + 1
+
+        scheduler = StoryScheduler(StoryScheduler.Config(debounce_sec=0.0, idle_timeout_sec=0.05), lambda: can_run, run)
+        scheduler.start()
+
+        await asyncio.sleep(0.2)
+        assert runs == 0
+        assert scheduler.wakes[StoryScheduler.IDLE_REASON] >= 2
+
+        can_run = True
+        await asyncio.sleep(0.2)
+        assert runs >= 2
+
+    asyncio.run(main())
+
+
+def test_story_scheduler_keeps_wakes_from_a_running_step():
+    async def main():
+        runs = 0
+
+        async def run():
+            nonlocal runs
+            runs = runs + 1
+            if runs == 1:
+                # E.g. the NPC line is added to the story while the step is still running.
+                scheduler.wake('story_item')
+                assert scheduler.is_running
+
+        scheduler = StoryScheduler(StoryScheduler.Config(debounce_sec=0.0, idle_timeout_sec=10.0), lambda: True, run)
+        scheduler.start()
+        await asyncio.sleep(0)
+
+        scheduler.wake('player_says')
+        await asyncio.sleep(0.1)
+
+        assert runs == 2
+        assert not scheduler.is_running
+
+    asyncio.run(main())
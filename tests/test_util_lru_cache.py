@@ -0,0 +1,24 @@
+from util.lru_cache import LruCache
+
+
+def test_lru_cache_drops_least_recently_used_value():
+    cache: LruCache[str] = LruCache(2)
+
+    assert cache.get_or_create('a', lambda: "A") == "A"
+    assert cache.get_or_create('b', lambda: "B") == "B"
+    # 'a' is used again, so 'b' is the one dropped for 'c'.
+    assert cache.get_or_create('a', lambda: "new A") == "A"
+    assert cache.get_or_create('c', lambda: "C") == "C"
+
+    assert cache.get_or_create('b', lambda: "new B") == "new B"
+    assert cache.get_or_create('c', lambda: "new C") == "C"
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 4, 2)
+
+
+def test_lru_cache_of_zero_size_keeps_nothing():
+    cache: LruCache[str] = LruCache(0)
+
+    assert cache.get_or_create('a', lambda: "A") == "A"
+    assert cache.get_or_create('a', lambda: "new A") == "new A"
+    assert len(cache) == 0